@@ -91,7 +91,7 @@ resource "aws_lb_target_group" "app" {
     unhealthy_threshold = 3
     timeout             = 5
     interval            = 30
-    path                = "/health"
+    path                = "/ready" # ウォームアップ完了後にトラフィックを受ける
     matcher             = "200"
   }
 
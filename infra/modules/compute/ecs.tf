@@ -123,6 +123,14 @@ resource "aws_ecs_task_definition" "app" {
         {
           name  = "ENVIRONMENT"
           value = var.environment
+        },
+        {
+          name  = "WARMUP_TIMEOUT_SECONDS"
+          value = tostring(var.warmup_timeout_seconds)
+        },
+        {
+          name  = "UNIVERSE_ENABLED"
+          value = tostring(var.universe_enabled)
         }
       ]
 
@@ -151,6 +159,10 @@ resource "aws_ecs_service" "app" {
   desired_count   = var.ecs_desired_count
   launch_type     = "FARGATE"
 
+  # /ready はウォームアップが終わるまで 503 を返すため、打ち切りまでの時間 +
+  # healthy_threshold 回分のヘルスチェック間隔は異常とみなさない
+  health_check_grace_period_seconds = var.warmup_timeout_seconds + 90
+
   network_configuration {
     subnets          = var.private_subnet_ids
     security_groups  = [aws_security_group.app.id]
@@ -87,6 +87,18 @@ variable "ecs_desired_count" {
   default     = 1
 }
 
+variable "warmup_timeout_seconds" {
+  description = "起動時ウォームアップの打ち切り時間（秒）。ヘルスチェックの猶予期間もこれに合わせる"
+  type        = number
+  default     = 120
+}
+
+variable "universe_enabled" {
+  description = "ユニバース行列（スクリーニング API）を有効にし、コンテナ内でリフレッシャーを動かすか"
+  type        = bool
+  default     = false
+}
+
 variable "container_image" {
   description = "コンテナイメージ URI"
   type        = string
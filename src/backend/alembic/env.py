@@ -32,6 +32,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.base import Base  # noqa: E402
 import models.stock  # noqa: F401, E402
 import models.macro  # noqa: F401, E402
+import models.news  # noqa: F401, E402
+import models.sentiment  # noqa: F401, E402
+import models.data_version  # noqa: F401, E402
 
 target_metadata = Base.metadata
 
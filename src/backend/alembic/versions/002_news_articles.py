@@ -0,0 +1,68 @@
+"""news articles
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # news_articles テーブル
+    op.create_table(
+        "news_articles",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("url_hash", sa.String(length=64), nullable=False),
+        sa.Column("url", sa.String(length=2000), nullable=False),
+        sa.Column("title", sa.String(length=1000), nullable=False),
+        sa.Column("source", sa.String(length=200), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("published_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(summary, ''))",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("url_hash"),
+    )
+    op.create_index(
+        "ix_news_articles_search_vector",
+        "news_articles",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index("ix_news_articles_published_id", "news_articles", ["published_at", "id"])
+
+    # news_article_stocks テーブル（記事 ⇔ 銘柄）
+    op.create_table(
+        "news_article_stocks",
+        sa.Column("article_id", sa.Integer(), nullable=False),
+        sa.Column("stock_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["article_id"], ["news_articles.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("article_id", "stock_id"),
+    )
+    op.create_index("ix_news_article_stocks_stock_id", "news_article_stocks", ["stock_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("news_article_stocks")
+    op.drop_table("news_articles")
@@ -0,0 +1,37 @@
+"""stock price count
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 株価件数のキャッシュカラム（株価取り込み時に加算する）
+    op.add_column(
+        "stocks",
+        sa.Column("price_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # 既存データの件数を反映
+    op.execute(
+        """
+        UPDATE stocks SET price_count = counts.n
+        FROM (SELECT stock_id, count(*) AS n FROM stock_prices GROUP BY stock_id) AS counts
+        WHERE stocks.id = counts.stock_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("stocks", "price_count")
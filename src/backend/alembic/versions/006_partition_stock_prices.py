@@ -0,0 +1,154 @@
+"""partition stock_prices by year
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 既存データがない場合に作成するパーティションの開始年
+FIRST_YEAR = 2000
+# 現在の年から何年先までパーティションを作っておくか（それ以降は DEFAULT に入る）
+YEARS_AHEAD = 2
+
+_COLUMNS = "id, stock_id, price_date, open, high, low, close, volume, adjusted_close, created_at, updated_at"
+
+# 年単位のパーティションを作成する（DEFAULT に入っていた該当年の行は移し替える）
+_ENSURE_PARTITION = """
+CREATE OR REPLACE FUNCTION stock_prices_ensure_partition(p_year integer) RETURNS void AS $$
+DECLARE
+    part text := format('stock_prices_y%s', p_year);
+    lower_bound date := make_date(p_year, 1, 1);
+    upper_bound date := make_date(p_year + 1, 1, 1);
+BEGIN
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    -- 同じ年の取り込みが並行しても CREATE TABLE が重複しないよう、年ごとのロックを取って確認し直す
+    PERFORM pg_advisory_xact_lock(hashtext('stock_prices_' || p_year));
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE stock_prices INCLUDING DEFAULTS)', part);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM stock_prices_default '
+        'WHERE price_date >= %L AND price_date < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        lower_bound, upper_bound, part
+    );
+    EXECUTE format(
+        'ALTER TABLE stock_prices ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        part, lower_bound, upper_bound
+    );
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    # 既存テーブルを退避（インデックス・制約名は新しいテーブルで使うため改名する）
+    op.execute("ALTER TABLE stock_prices RENAME TO stock_prices_unpartitioned")
+    op.execute("ALTER INDEX stock_prices_pkey RENAME TO stock_prices_unpartitioned_pkey")
+    op.execute("ALTER INDEX uq_stock_price_date RENAME TO uq_stock_price_date_unpartitioned")
+    op.execute("DROP INDEX ix_stock_prices_stock_date")
+    op.execute("ALTER SEQUENCE stock_prices_id_seq OWNED BY NONE")
+
+    # 年単位の RANGE パーティション（主キー・一意制約にはパーティションキーを含める必要がある）
+    op.execute(
+        """
+        CREATE TABLE stock_prices (
+            id integer NOT NULL DEFAULT nextval('stock_prices_id_seq'),
+            stock_id integer NOT NULL REFERENCES stocks (id) ON DELETE CASCADE,
+            price_date date NOT NULL,
+            open numeric(12, 4) NOT NULL,
+            high numeric(12, 4) NOT NULL,
+            low numeric(12, 4) NOT NULL,
+            close numeric(12, 4) NOT NULL,
+            volume bigint NOT NULL,
+            adjusted_close numeric(12, 4),
+            created_at timestamp with time zone NOT NULL DEFAULT now(),
+            updated_at timestamp with time zone NOT NULL DEFAULT now(),
+            CONSTRAINT stock_prices_pkey PRIMARY KEY (id, price_date),
+            CONSTRAINT uq_stock_price_date UNIQUE (stock_id, price_date)
+        ) PARTITION BY RANGE (price_date)
+        """
+    )
+    op.execute("ALTER SEQUENCE stock_prices_id_seq OWNED BY stock_prices.id")
+    op.execute("CREATE TABLE stock_prices_default PARTITION OF stock_prices DEFAULT")
+
+    op.execute(_ENSURE_PARTITION)
+    op.execute(
+        f"""
+        SELECT stock_prices_ensure_partition(y)
+        FROM generate_series(
+            LEAST(
+                {FIRST_YEAR},
+                (SELECT extract(year FROM min(price_date))::integer FROM stock_prices_unpartitioned)
+            ),
+            extract(year FROM now())::integer + {YEARS_AHEAD}
+        ) AS y
+        """
+    )
+
+    op.execute(
+        f"INSERT INTO stock_prices ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM stock_prices_unpartitioned"
+    )
+    op.execute("DROP TABLE stock_prices_unpartitioned")
+
+    # インデックスはデータ投入後に作成する（親に作成すると全パーティションに作られる）
+    # 銘柄 × 期間の範囲スキャンを Index Only Scan にするカバリングインデックス
+    op.execute(
+        """
+        CREATE INDEX ix_stock_prices_stock_date ON stock_prices (stock_id, price_date)
+        INCLUDE (open, high, low, close, volume, adjusted_close)
+        """
+    )
+    # 全銘柄を対象にした日付範囲の検索用（日付順に追記されるため BRIN が小さく効く）
+    op.execute("CREATE INDEX ix_stock_prices_date_brin ON stock_prices USING brin (price_date)")
+    op.execute("ANALYZE stock_prices")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE stock_prices RENAME TO stock_prices_partitioned")
+    op.execute("ALTER INDEX stock_prices_pkey RENAME TO stock_prices_partitioned_pkey")
+    op.execute("ALTER INDEX uq_stock_price_date RENAME TO uq_stock_price_date_partitioned")
+    op.execute("ALTER INDEX ix_stock_prices_stock_date RENAME TO ix_stock_prices_stock_date_partitioned")
+    op.execute("ALTER SEQUENCE stock_prices_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE stock_prices (
+            id integer NOT NULL DEFAULT nextval('stock_prices_id_seq'),
+            stock_id integer NOT NULL REFERENCES stocks (id) ON DELETE CASCADE,
+            price_date date NOT NULL,
+            open numeric(12, 4) NOT NULL,
+            high numeric(12, 4) NOT NULL,
+            low numeric(12, 4) NOT NULL,
+            close numeric(12, 4) NOT NULL,
+            volume bigint NOT NULL,
+            adjusted_close numeric(12, 4),
+            created_at timestamp with time zone NOT NULL DEFAULT now(),
+            updated_at timestamp with time zone NOT NULL DEFAULT now(),
+            CONSTRAINT stock_prices_pkey PRIMARY KEY (id),
+            CONSTRAINT uq_stock_price_date UNIQUE (stock_id, price_date)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE stock_prices_id_seq OWNED BY stock_prices.id")
+    op.execute(
+        f"INSERT INTO stock_prices ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM stock_prices_partitioned"
+    )
+    op.execute("DROP TABLE stock_prices_partitioned")
+    op.execute("DROP FUNCTION stock_prices_ensure_partition(integer)")
+    op.create_index("ix_stock_prices_stock_date", "stock_prices", ["stock_id", "price_date"])
@@ -0,0 +1,98 @@
+"""stock price float columns
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_PRICE_COLUMNS = ("open", "high", "low", "close", "adjusted_close")
+
+# 生成列を除いた列（生成列には INSERT できないため、移し替えは列を明示する）
+_COLUMNS = (
+    "id, stock_id, price_date, open, high, low, close, volume, adjusted_close, "
+    "created_at, updated_at"
+)
+
+
+def _ensure_partition(like_options: str, insert: str) -> str:
+    """006 の stock_prices_ensure_partition を LIKE のオプションと移し替えの INSERT を変えて作り直す SQL"""
+    return f"""
+CREATE OR REPLACE FUNCTION stock_prices_ensure_partition(p_year integer) RETURNS void AS $$
+DECLARE
+    part text := format('stock_prices_y%s', p_year);
+    lower_bound date := make_date(p_year, 1, 1);
+    upper_bound date := make_date(p_year + 1, 1, 1);
+BEGIN
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    -- 同じ年の取り込みが並行しても CREATE TABLE が重複しないよう、年ごとのロックを取って確認し直す
+    PERFORM pg_advisory_xact_lock(hashtext('stock_prices_' || p_year));
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE stock_prices {like_options})', part);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM stock_prices_default '
+        'WHERE price_date >= %L AND price_date < %L RETURNING *) '
+        '{insert}',
+        lower_bound, upper_bound, part
+    );
+    EXECUTE format(
+        'ALTER TABLE stock_prices ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        part, lower_bound, upper_bound
+    );
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    # 分析用の float8 列（Numeric の元の値は監査用にそのまま残す）
+    # 生成列の追加はテーブル全体を書き換えるため、データ量が多い環境ではメンテナンス時間帯に実行する
+    for column in _PRICE_COLUMNS:
+        op.execute(
+            f"ALTER TABLE stock_prices ADD COLUMN {column}_f double precision "
+            f"GENERATED ALWAYS AS (CAST({column} AS double precision)) STORED"
+        )
+
+    # カバリングインデックスは分析で読む float8 列を含める
+    op.execute("DROP INDEX ix_stock_prices_stock_date")
+    op.execute(
+        """
+        CREATE INDEX ix_stock_prices_stock_date ON stock_prices (stock_id, price_date)
+        INCLUDE (open_f, high_f, low_f, close_f, volume, adjusted_close_f)
+        """
+    )
+    op.execute("ANALYZE stock_prices")
+
+    # 以降に作るパーティションにも生成列を持たせる（親の生成列と一致しないと ATTACH できない）
+    op.execute(
+        _ensure_partition(
+            "INCLUDING DEFAULTS INCLUDING GENERATED",
+            f"INSERT INTO %I ({_COLUMNS}) SELECT {_COLUMNS} FROM moved",
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(_ensure_partition("INCLUDING DEFAULTS", "INSERT INTO %I SELECT * FROM moved"))
+    op.execute("DROP INDEX ix_stock_prices_stock_date")
+    for column in _PRICE_COLUMNS:
+        op.execute(f"ALTER TABLE stock_prices DROP COLUMN {column}_f")
+    op.execute(
+        """
+        CREATE INDEX ix_stock_prices_stock_date ON stock_prices (stock_id, price_date)
+        INCLUDE (open, high, low, close, volume, adjusted_close)
+        """
+    )
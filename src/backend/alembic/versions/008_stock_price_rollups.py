@@ -0,0 +1,72 @@
+"""stock price rollups
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # stock_price_rollups テーブル（週足・月足。以降は取り込み時に services.rollup が更新する）
+    op.create_table(
+        "stock_price_rollups",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("stock_id", sa.Integer(), nullable=False),
+        sa.Column("granularity", sa.String(length=10), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("first_date", sa.Date(), nullable=False),
+        sa.Column("last_date", sa.Date(), nullable=False),
+        sa.Column("open", sa.Numeric(precision=12, scale=4), nullable=False),
+        sa.Column("high", sa.Numeric(precision=12, scale=4), nullable=False),
+        sa.Column("low", sa.Numeric(precision=12, scale=4), nullable=False),
+        sa.Column("close", sa.Numeric(precision=12, scale=4), nullable=False),
+        sa.Column("volume", sa.BigInteger(), nullable=False),
+        sa.Column("day_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        # 一意制約のインデックスが銘柄 × 粒度 × 期間の範囲スキャンを兼ねる
+        sa.UniqueConstraint("stock_id", "granularity", "period_start", name="uq_stock_price_rollup"),
+    )
+
+    # 既存の日足から週足（月曜始まり）・月足を作る
+    for granularity in ("week", "month"):
+        op.execute(
+            f"""
+            INSERT INTO stock_price_rollups (
+                stock_id, granularity, period_start, first_date, last_date,
+                open, high, low, close, volume, day_count
+            )
+            SELECT
+                stock_id,
+                '{granularity}',
+                date_trunc('{granularity}', price_date)::date,
+                min(price_date),
+                max(price_date),
+                (array_agg(open ORDER BY price_date))[1],
+                max(high),
+                min(low),
+                (array_agg(close ORDER BY price_date DESC))[1],
+                sum(volume),
+                count(*)
+            FROM stock_prices
+            GROUP BY stock_id, date_trunc('{granularity}', price_date)
+            """
+        )
+    op.execute("ANALYZE stock_price_rollups")
+
+
+def downgrade() -> None:
+    op.drop_table("stock_price_rollups")
@@ -0,0 +1,35 @@
+"""news trigram search
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 日本語の記事は単語が空白で区切られず to_tsvector('simple', ...) ではほぼ一致しないため、
+    # タイトル + 要約の部分一致（ILIKE）を pg_trgm の GIN インデックスで検索する
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE news_articles ADD COLUMN search_text text "
+        "GENERATED ALWAYS AS (title || ' ' || summary) STORED"
+    )
+    op.execute(
+        "CREATE INDEX ix_news_articles_search_text ON news_articles "
+        "USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX ix_news_articles_search_text")
+    op.execute("ALTER TABLE news_articles DROP COLUMN search_text")
@@ -0,0 +1,134 @@
+"""
+動的マイクロバッチング
+同時に届いた推論リクエストを最大 N 件 / 最大 M ミリ秒まとめ、1 回のバッチ推論で処理する。
+"""
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher[T, R]:
+    """
+    インプロセスの推論キュー。
+
+    submit() された要素を溜め、max_batch_size 件に達するか最初の要素から max_wait_ms 経過した時点で
+    process_batch をワーカースレッドで 1 回呼び出し、各呼び出し元の Future に結果を返す。
+    推論中に届いた要素は次のバッチにまとめられる。
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[list[T]], Sequence[R]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size は 1 以上を指定してください")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._has_items: asyncio.Event | None = None
+        self._full: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def submit(self, item: T) -> R:
+        """要素を投入し、バッチ推論の結果を待つ"""
+        loop = self._ensure_worker()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((item, future))
+        self._has_items.set()  # type: ignore[union-attr]
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()  # type: ignore[union-attr]
+        return await future
+
+    async def submit_many(self, items: Sequence[T]) -> list[R]:
+        """複数要素を投入し、投入順に結果を返す"""
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    async def close(self) -> None:
+        """ワーカーを停止する（未処理の要素はキャンセル）"""
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+
+    def _ensure_worker(self) -> asyncio.AbstractEventLoop:
+        """実行中のイベントループ上でワーカーを起動する（ループが変わった場合は作り直す）"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._fail_pending(RuntimeError("推論ワーカーが停止しました"))
+            self._loop = loop
+            self._has_items = asyncio.Event()
+            self._full = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+            self._worker.add_done_callback(self._on_worker_done)
+        return loop
+
+    def _on_worker_done(self, worker: asyncio.Task) -> None:
+        """ワーカーが止まったら、溜まっている要素の呼び出し元にエラーを返す"""
+        if worker is not self._worker:
+            return
+        error = None if worker.cancelled() else worker.exception()
+        logger.error("推論ワーカーが停止しました: %r", error)
+        self._fail_pending(RuntimeError(f"推論ワーカーが停止しました: {error!r}"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        pending, self._pending = self._pending, []
+        for _, future in pending:
+            if not future.done():
+                # 閉じた別のイベントループの Future は待っている呼び出し元がいない
+                with contextlib.suppress(RuntimeError):
+                    future.set_exception(error)
+
+    async def _run(self) -> None:
+        assert self._has_items is not None and self._full is not None
+        while True:
+            await self._has_items.wait()
+
+            # バッチが埋まるか待ち時間の上限まで待つ
+            if len(self._pending) < self.max_batch_size:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._full.wait(), self.max_wait)
+
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+            if len(self._pending) < self.max_batch_size:
+                self._full.clear()
+            if not self._pending:
+                self._has_items.clear()
+
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if batch:
+                await self._process(batch)
+
+    async def _process(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = await asyncio.to_thread(self.process_batch, items)
+            if len(results) != len(items):
+                raise RuntimeError(f"バッチ結果の件数が一致しません: {len(results)} != {len(items)}")
+        except Exception as e:
+            logger.warning("バッチ推論エラー: size=%d, %s", len(items), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # ワーカーのキャンセル等。処理中の要素の呼び出し元を待たせたままにしない
+            for _, future in batch:
+                future.cancel()
+            raise
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,228 @@
+"""
+マクロ指標の as-of パネル
+月次（CPI）・四半期（GDP）・日次（USD/JPY）など頻度の異なるマクロ指標を取引日のカレンダーに
+そろえ、予測の特徴量として株価に結合できる形にする。
+
+- 各取引日には、その日までに公表済み（観測日 + publication_lag_days）の最新の値を使う
+  （pandas.merge_asof の backward。公表前の値を使わないため学習時の先読みにならない）
+- パネルはプロセス内にキャッシュし、銘柄ごとに作り直さない
+- 指標のデータバージョン（core.data_version）が変わった系列だけを DB から読み直し、取引日が
+  増えた場合は増えた日付だけを計算して追加する
+- FRED の改定値は最新の値で上書きされるため、公表時点の値（ヴィンテージ）までは再現しない
+"""
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from collectors.macro import MACRO_INDICATORS, load_macro_observations
+from core.data_version import get_data_versions, macro_scope
+from core.metrics import record_cache
+from core.tracing import span
+from models.stock import StockPrice
+
+logger = logging.getLogger(__name__)
+
+# 変化率の特徴量の期間（取引日数。約 3 か月）
+CHANGE_PERIODS = 63
+
+# 株価の期間のうち公表済みの値がある日の割合がこれ未満の列は特徴量に使わない
+# （取り込み前の期間が長い指標の列を残すと、欠損値を含む行の削除でほとんどの行が消える）
+MIN_FEATURE_COVERAGE = 0.8
+
+
+def align_as_of(
+    calendar: pd.DatetimeIndex,
+    observations: pd.DataFrame,
+    publication_lag_days: int = 0,
+) -> np.ndarray:
+    """
+    観測値を取引日のカレンダーにそろえる（各日はその日までに公表済みの最新の値、なければ NaN）。
+
+    Args:
+        calendar: 取引日（昇順）
+        observations: date / value の列を持つ観測値（欠損値は公表されなかったものとして除く）
+        publication_lag_days: 観測日から公表までの日数
+
+    Returns:
+        np.ndarray: カレンダーと同じ長さの float64 配列
+    """
+    obs = observations.dropna(subset=["value"])
+    if obs.empty or calendar.empty:
+        return np.full(len(calendar), np.nan)
+    published = pd.DataFrame(
+        {
+            "published": pd.to_datetime(obs["date"]) + pd.Timedelta(days=publication_lag_days),
+            "value": obs["value"].to_numpy(dtype="float64"),
+        }
+    ).sort_values("published", kind="stable")
+    merged = pd.merge_asof(
+        pd.DataFrame({"date": calendar.astype("datetime64[ns]")}),
+        published.astype({"published": "datetime64[ns]"}),
+        left_on="date",
+        right_on="published",
+        direction="backward",
+    )
+    return merged["value"].to_numpy(dtype="float64")
+
+
+def observation_matrix(
+    observations: pd.DataFrame,
+    keys: list[str],
+    fill: bool = True,
+) -> pd.DataFrame:
+    """
+    観測値を観測日の和集合を軸にした行列にする（公表ラグは考慮しない。表示向け）。
+
+    Args:
+        observations: collectors.macro.load_macro_observations の結果
+        keys: 列にする指標キー（この順に並べる。観測値のない指標はすべて欠損値）
+        fill: 観測のない日を直前の観測値で埋めるか
+
+    Returns:
+        pd.DataFrame: 観測日（date）をインデックス、指標キーを列とした float64 の DataFrame
+    """
+    matrix = observations.pivot(index="date", columns="key", values="value").reindex(columns=keys)
+    if fill:
+        matrix = matrix.ffill()
+    return matrix
+
+
+def _with_changes(levels: pd.DataFrame) -> pd.DataFrame:
+    """各指標の水準に、CHANGE_PERIODS 取引日前からの変化率（<key>_change）の列を加える"""
+    changes = levels.pct_change(CHANGE_PERIODS, fill_method=None).add_suffix("_change")
+    return pd.concat([levels, changes], axis=1)
+
+
+class MacroPanelCache:
+    """
+    as-of パネルのプロセス内キャッシュ。
+
+    系列ごとの観測値とデータバージョン、取引日のカレンダーを持ち、変わった部分だけを更新する。
+    """
+
+    def __init__(self, keys: list[str] | None = None):
+        self.keys = keys or list(MACRO_INDICATORS)
+        self.calendar = pd.DatetimeIndex([], name="date")
+        self.observations: dict[str, pd.DataFrame] = {}
+        self.versions: dict[str, int] = {}
+        self.levels = pd.DataFrame(index=self.calendar)
+        self.panel = pd.DataFrame(index=self.calendar)
+        self._lock = asyncio.Lock()
+
+    async def _new_trading_days(self, db: AsyncSession) -> pd.DatetimeIndex:
+        """キャッシュ済みのカレンダーより後の取引日（いずれかの銘柄に株価がある日）"""
+        stmt = select(StockPrice.price_date).distinct().order_by(StockPrice.price_date)
+        if len(self.calendar):
+            stmt = stmt.where(StockPrice.price_date > self.calendar[-1].date())
+        result = await db.execute(stmt)
+        return pd.DatetimeIndex(pd.to_datetime(list(result.scalars())), name="date")
+
+    async def get(self, db: AsyncSession) -> pd.DataFrame:
+        """
+        最新のパネルを返す（取引日インデックス × 指標の水準と変化率）。
+
+        一度も取り込んでいない指標の列は含めない。返す DataFrame は呼び出し側で変更しないこと。
+        """
+        async with self._lock:
+            scopes = {key: macro_scope(key) for key in self.keys}
+            current = await get_data_versions(db, list(scopes.values()))
+            versions = {key: current[scope] for key, scope in scopes.items()}
+            changed = [key for key in self.keys if versions[key] != self.versions.get(key)]
+            new_days = await self._new_trading_days(db)
+            if not changed and new_days.empty:
+                record_cache("macro_panel", hit=True)
+                return self.panel
+            record_cache("macro_panel", hit=False)
+
+            with span("macro_panel.update", changed=len(changed), new_days=len(new_days)):
+                self._update(
+                    await load_macro_observations(db, changed) if changed else None,
+                    changed,
+                    new_days,
+                )
+            self.versions = versions
+            return self.panel
+
+    def _update(
+        self,
+        observations: pd.DataFrame | None,
+        changed: list[str],
+        new_days: pd.DatetimeIndex,
+    ) -> None:
+        if observations is not None:
+            for key in changed:
+                self.observations[key] = observations.loc[observations["key"] == key]
+
+        # 取引日が増えた分は、変わっていない系列も増えた日付だけを計算する
+        levels = self.levels
+        if not new_days.empty:
+            added = pd.DataFrame(
+                {
+                    key: align_as_of(new_days, obs, MACRO_INDICATORS[key]["publication_lag_days"])
+                    for key, obs in self.observations.items()
+                    if key not in changed
+                },
+                index=new_days,
+            )
+            self.calendar = self.calendar.append(new_days)
+            levels = pd.concat([levels, added]).reindex(self.calendar)
+
+        # データが変わった系列はカレンダー全体を計算し直す
+        for key in changed:
+            levels[key] = align_as_of(
+                self.calendar, self.observations[key], MACRO_INDICATORS[key]["publication_lag_days"]
+            )
+
+        # 一度も取り込んでいない（値がない）指標は列に含めない
+        columns = [key for key in self.keys if key in levels and levels[key].notna().any()]
+        self.levels = levels
+        self.panel = _with_changes(levels[columns].rename_axis("date"))
+        logger.info(
+            "マクロパネルを更新: days=%d, columns=%s, changed=%s",
+            len(self.calendar),
+            columns,
+            changed,
+        )
+
+
+_panel_cache = MacroPanelCache()
+
+
+async def get_macro_panel(db: AsyncSession) -> pd.DataFrame:
+    """全マクロ指標の as-of パネル（プロセス内キャッシュ。指標の取り込み・取引日の追加で更新）"""
+    return await _panel_cache.get(db)
+
+
+def invalidate_macro_panel() -> None:
+    """パネルのキャッシュを破棄する（次の取得で作り直す）"""
+    global _panel_cache
+    _panel_cache = MacroPanelCache()
+
+
+def join_macro_features(
+    index: pd.Index, panel: pd.DataFrame, min_coverage: float = MIN_FEATURE_COVERAGE
+) -> pd.DataFrame:
+    """
+    株価のインデックス（日付）にパネルを as-of で結合した特徴量を返す。
+
+    Args:
+        index: 株価の DataFrame のインデックス（date / DatetimeIndex。昇順）
+        panel: get_macro_panel の結果
+        min_coverage: 値のある日の割合がこれ未満の列は除く
+
+    Returns:
+        pd.DataFrame: index と同じインデックスで、列名に "macro_" を付けた特徴量
+    """
+    if panel.empty or len(index) == 0:
+        return pd.DataFrame(index=index)
+    dates = pd.DatetimeIndex(pd.to_datetime(index)).astype("datetime64[ns]")
+    aligned = panel.reindex(dates, method="ffill")
+    aligned.index = index
+    # 未公表の期間を後の値で埋めると先読みになるため、埋めずに列ごと除く
+    aligned = aligned.loc[:, aligned.notna().mean() >= min_coverage]
+    return aligned.add_prefix("macro_")
+
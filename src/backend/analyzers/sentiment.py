@@ -1,36 +1,270 @@
 """
 センチメント分析モジュール
 ニュース記事のテキストから感情スコア（Positive/Negative/Neutral）を算出する。
+
+推論バックエンドは Settings.sentiment_backend で切り替える:
+- "transformers": PyTorch（FP32）
+- "onnx": ONNX Runtime（ONNX へエクスポートし、動的 int8 量子化したモデル）
 """
+import asyncio
 import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from analyzers.batching import MicroBatcher
+from analyzers.sentiment_cache import SentimentCache
+from core.config import get_settings
+from core.lazy import lazy_import
+from core.metrics import FINBERT_SECONDS
 
-# transformers はサイズが大きいため、インポート時にエラーハンドリングするか、遅延ロードする
-try:
-    from transformers import pipeline
-except ImportError:
-    pipeline = None
+# transformers はサイズが大きいため、初回のモデルロード時にインポートする
+transformers = lazy_import("transformers")
 
 logger = logging.getLogger(__name__)
 
-# 金融特化のセンチメント分析モデル
-MODEL_NAME = "ProsusAI/finbert"
+# 空文字列に対する結果（モデルを呼ばない）
+_EMPTY_RESULT = {"label": "neutral", "score": 0.0}
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class SentimentBackend(ABC):
+    """推論バックエンドの基底クラス（トークナイザーとラベルは共通）"""
+
+    name = "base"
+
+    def __init__(self, model_name: str, max_length: int = 512):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.tokenizer = transformers.AutoTokenizer.from_pretrained(model_name)
+        config = transformers.AutoConfig.from_pretrained(model_name)
+        self.labels = [config.id2label[i] for i in range(config.num_labels)]
+
+    def tokenize(self, texts: list[str]) -> dict[str, np.ndarray]:
+        """テキストをトークン化する（最長に合わせてパディング、max_length で切り詰め）"""
+        return self.tokenizer(
+            texts,
+            truncation=True,
+            max_length=self.max_length,
+            padding=True,
+            return_tensors="np",
+        )
+
+    def encode_windows(self, windows: list[list[int]]) -> dict[str, np.ndarray]:
+        """トークン済みのウィンドウに特殊トークンを付与し、パディングしたバッチを作る"""
+        rows = [self.tokenizer.build_inputs_with_special_tokens(w) for w in windows]
+        width = max(len(r) for r in rows)
+        input_ids = np.full((len(rows), width), self.tokenizer.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(rows), width), dtype=np.int64)
+        for i, row in enumerate(rows):
+            input_ids[i, : len(row)] = row
+            attention_mask[i, : len(row)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+    @abstractmethod
+    def predict_proba(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """
+        ラベルごとの確率を返す。
+
+        Returns:
+            np.ndarray: shape (batch, len(labels))
+        """
+
+
+class TransformersBackend(SentimentBackend):
+    """PyTorch（transformers）バックエンド"""
+
+    name = "transformers"
+
+    def __init__(self, model_name: str, max_length: int = 512):
+        super().__init__(model_name, max_length)
+        self.model = transformers.AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+
+    def predict_proba(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        import torch
+
+        with torch.inference_mode():
+            logits = self.model(
+                input_ids=torch.from_numpy(input_ids.astype(np.int64)),
+                attention_mask=torch.from_numpy(attention_mask.astype(np.int64)),
+            ).logits
+        return _softmax(logits.float().numpy())
+
+
+class OnnxBackend(SentimentBackend):
+    """ONNX Runtime バックエンド（初回にエクスポート・量子化したモデルをディスクに保存して再利用）"""
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        onnx_dir: str | Path,
+        intra_op_threads: int = 0,
+        quantize: bool = True,
+        max_length: int = 512,
+    ):
+        super().__init__(model_name, max_length)
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("onnxruntime ライブラリがインストールされていません") from e
+
+        model_path = self._ensure_model(Path(onnx_dir), quantize)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        logger.info("ONNX モデルをロードしました: %s", model_path)
+
+    def _ensure_model(self, onnx_dir: Path, quantize: bool) -> Path:
+        """ONNX モデル（必要なら int8 量子化版）を作成してパスを返す"""
+        export_dir = onnx_dir / re.sub(r"[^\w.-]", "_", self.model_name)
+        export_dir.mkdir(parents=True, exist_ok=True)
+        fp32_path = export_dir / "model.onnx"
+        int8_path = export_dir / "model.int8.onnx"
+
+        if not fp32_path.exists():
+            self._export(fp32_path)
+
+        if not quantize:
+            return fp32_path
+
+        if not int8_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info("ONNX モデルを動的 int8 量子化: %s", int8_path)
+            tmp_path = int8_path.with_suffix(f".{os.getpid()}.tmp")
+            quantize_dynamic(str(fp32_path), str(tmp_path), weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        return int8_path
+
+    def _export(self, path: Path) -> None:
+        """PyTorch モデルを ONNX にエクスポートする"""
+        import torch
+
+        logger.info("ONNX へエクスポート: %s -> %s", self.model_name, path)
+        model = transformers.AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        model.eval()
+        dummy = self.tokenize(["export"])
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with torch.inference_mode():
+            torch.onnx.export(
+                model,
+                (
+                    torch.from_numpy(dummy["input_ids"].astype(np.int64)),
+                    torch.from_numpy(dummy["attention_mask"].astype(np.int64)),
+                ),
+                str(tmp_path),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"},
+                },
+                opset_version=14,
+            )
+        os.replace(tmp_path, path)
+
+    def predict_proba(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        (logits,) = self.session.run(
+            ["logits"],
+            {
+                "input_ids": input_ids.astype(np.int64),
+                "attention_mask": attention_mask.astype(np.int64),
+            },
+        )
+        return _softmax(logits)
+
+
+def split_windows(token_ids: list[int], size: int, overlap: int) -> list[list[int]]:
+    """
+    トークン列を重なりのあるウィンドウに分割する（最後のウィンドウは末尾まで含む）。
+
+    Args:
+        token_ids: 特殊トークンを含まないトークン ID 列
+        size: ウィンドウの最大トークン数
+        overlap: 隣接ウィンドウの重なりトークン数
+    """
+    if size <= 0:
+        raise ValueError("size は 1 以上を指定してください")
+    if not 0 <= overlap < size:
+        raise ValueError("overlap は 0 以上 size 未満を指定してください")
+    step = size - overlap
+    windows = []
+    for start in range(0, len(token_ids), step):
+        windows.append(token_ids[start : start + size])
+        if start + size >= len(token_ids):
+            break
+    return windows
+
+
+def aggregate_windows(probs: np.ndarray, lengths: list[int]) -> np.ndarray:
+    """ウィンドウごとの確率をトークン数で重み付け平均する"""
+    weights = np.asarray(lengths, dtype=np.float64)
+    return (probs * weights[:, None]).sum(axis=0) / weights.sum()
+
+
+def create_backend(name: str, model_name: str) -> SentimentBackend:
+    """設定に応じた推論バックエンドを作成する"""
+    settings = get_settings()
+    if name == "onnx":
+        return OnnxBackend(
+            model_name,
+            onnx_dir=settings.sentiment_onnx_dir,
+            intra_op_threads=settings.sentiment_onnx_intra_op_threads,
+            quantize=settings.sentiment_onnx_quantize,
+        )
+    if name == "transformers":
+        return TransformersBackend(model_name)
+    raise ValueError(f"不明なセンチメント分析バックエンド: '{name}'")
 
 
 class SentimentAnalyzer:
     """センチメント分析クラス"""
 
-    _pipeline = None
+    _backend: SentimentBackend | None = None
+    _batcher: MicroBatcher[str, dict] | None = None
+    _document_batcher: MicroBatcher[str, dict] | None = None
+    _cache: SentimentCache | None = None
 
     @classmethod
-    def get_pipeline(cls):
-        """パイプラインのシングルトン取得（初回ロード時にモデルをダウンロードするため時間がかかる）"""
-        if cls._pipeline is None:
-            if pipeline is None:
-                raise ImportError("transformers ライブラリがインストールされていません")
-            logger.info("センチメント分析モデルのロード開始: %s", MODEL_NAME)
-            cls._pipeline = pipeline("sentiment-analysis", model=MODEL_NAME)
+    def model_version(cls) -> str:
+        """キャッシュキーに含めるモデルバージョン（量子化の有無で結果が変わるためバックエンドを含む）"""
+        settings = get_settings()
+        backend = settings.sentiment_backend
+        if backend == "onnx" and settings.sentiment_onnx_quantize:
+            backend = "onnx-int8"
+        return f"{settings.sentiment_model}:{backend}"
+
+    @classmethod
+    def get_backend(cls) -> SentimentBackend:
+        """推論バックエンドのシングルトン取得（初回ロード時にモデルをダウンロードするため時間がかかる）"""
+        if cls._backend is None:
+            settings = get_settings()
+            logger.info(
+                "センチメント分析モデルのロード開始: %s (backend=%s)",
+                settings.sentiment_model,
+                settings.sentiment_backend,
+            )
+            cls._backend = create_backend(settings.sentiment_backend, settings.sentiment_model)
             logger.info("センチメント分析モデルのロード完了")
-        return cls._pipeline
+        return cls._backend
 
     @classmethod
     def analyze(cls, text: str) -> dict:
@@ -40,11 +274,150 @@ class SentimentAnalyzer:
         Returns:
             dict: {label: "positive"|"negative"|"neutral", score: float}
         """
-        if not text:
-            return {"label": "neutral", "score": 0.0}
+        return cls.analyze_batch([text])[0]
+
+    @classmethod
+    def analyze_batch(cls, texts: list[str]) -> list[dict]:
+        """
+        複数テキストのセンチメントを 1 回のバッチ推論で分析する。
+
+        Returns:
+            list[dict]: texts と同じ順序の分析結果
+        """
+        results: list[dict] = [_EMPTY_RESULT] * len(texts)
+        targets = [(i, text) for i, text in enumerate(texts) if text]
+        if not targets:
+            return results
+
+        backend = cls.get_backend()
+        # BERT の上限（max_length トークン）を超える部分は切り詰める。全文を評価する場合は analyze_document
+        encoded = backend.tokenize([text for _, text in targets])
+        with FINBERT_SECONDS.time():
+            probs = backend.predict_proba(encoded["input_ids"], encoded["attention_mask"])
+        for (i, _), row in zip(targets, probs, strict=True):
+            best = int(row.argmax())
+            results[i] = {"label": backend.labels[best], "score": float(row[best])}
+        return results
+
+    @classmethod
+    def analyze_document(cls, text: str) -> dict:
+        """
+        長文（プレスリリース・決算要約など）全体のセンチメントを分析する。
+
+        1 回だけトークン化して重なりのあるトークンウィンドウに分割し、全ウィンドウを 1 回の
+        バッチ推論にかけたうえでトークン数で重み付け平均した確率から判定する。
+
+        Returns:
+            dict: {label, score, windows}
+        """
+        return cls.analyze_documents([text])[0]
+
+    @classmethod
+    def analyze_documents(cls, texts: list[str]) -> list[dict]:
+        """
+        複数の長文をまとめて分析する（全文書の全ウィンドウを 1 回のバッチ推論にかける）。
+
+        Returns:
+            list[dict]: texts と同じ順序の {label, score, windows}
+        """
+        results: list[dict] = [{**_EMPTY_RESULT, "windows": 0}] * len(texts)
+        targets = [(i, text) for i, text in enumerate(texts) if text]
+        if not targets:
+            return results
+
+        settings = get_settings()
+        backend = cls.get_backend()
+        token_ids = backend.tokenizer(
+            [text for _, text in targets], add_special_tokens=False
+        )["input_ids"]
+        # [CLS] / [SEP] 分を差し引いたウィンドウ長
+        size = backend.max_length - backend.tokenizer.num_special_tokens_to_add()
+        documents = [
+            (i, split_windows(ids, size, settings.sentiment_document_overlap_tokens))
+            for (i, _), ids in zip(targets, token_ids, strict=True)
+            if ids
+        ]
+        windows = [w for _, doc_windows in documents for w in doc_windows]
+        if not windows:
+            return results
+
+        with FINBERT_SECONDS.time():
+            probs = backend.predict_proba(**backend.encode_windows(windows))
+
+        offset = 0
+        for i, doc_windows in documents:
+            doc_probs = aggregate_windows(
+                probs[offset : offset + len(doc_windows)], [len(w) for w in doc_windows]
+            )
+            offset += len(doc_windows)
+            best = int(doc_probs.argmax())
+            results[i] = {
+                "label": backend.labels[best],
+                "score": float(doc_probs[best]),
+                "windows": len(doc_windows),
+            }
+        return results
+
+    @classmethod
+    def get_document_batcher(cls) -> MicroBatcher[str, dict]:
+        """長文モードの推論キューのシングルトン取得（同時に届いた文書のウィンドウをまとめて推論する）"""
+        if cls._document_batcher is None:
+            settings = get_settings()
+            cls._document_batcher = MicroBatcher(
+                cls.analyze_documents,
+                max_batch_size=settings.sentiment_document_batch_max_size,
+                max_wait_ms=settings.sentiment_batch_max_wait_ms,
+            )
+        return cls._document_batcher
 
-        pipe = cls.get_pipeline()
-        # テキストが長すぎる場合は切り詰める（BERTの制限）
-        truncated_text = text[:512]
-        result = pipe(truncated_text)[0]
-        return {"label": result["label"], "score": result["score"]}
+    @classmethod
+    async def analyze_document_cached(cls, db: AsyncSession | None, text: str) -> dict:
+        """analyze_document の結果をセンチメントキャッシュ経由で返す（推論は長文モードの推論キュー経由）"""
+        results = await cls.get_cache().get_many(
+            db,
+            [text],
+            f"{cls.model_version()}:document",
+            cls.get_document_batcher().submit_many,
+        )
+        return results[0]
+
+    @classmethod
+    def get_batcher(cls) -> MicroBatcher[str, dict]:
+        """同時リクエストをまとめる推論キューのシングルトン取得"""
+        if cls._batcher is None:
+            settings = get_settings()
+            cls._batcher = MicroBatcher(
+                cls.analyze_batch,
+                max_batch_size=settings.sentiment_batch_max_size,
+                max_wait_ms=settings.sentiment_batch_max_wait_ms,
+            )
+        return cls._batcher
+
+    @classmethod
+    async def analyze_async(cls, text: str) -> dict:
+        """推論キュー経由でセンチメントを分析する（同時リクエストは 1 回のバッチ推論にまとめられる）"""
+        return await cls.get_batcher().submit(text)
+
+    @classmethod
+    async def analyze_many_async(cls, texts: list[str]) -> list[dict]:
+        """推論キュー経由で複数テキストのセンチメントを分析する"""
+        return list(await asyncio.gather(*(cls.analyze_async(text) for text in texts)))
+
+    @classmethod
+    def get_cache(cls) -> SentimentCache:
+        """スコアキャッシュのシングルトン取得"""
+        if cls._cache is None:
+            cls._cache = SentimentCache(max_size=get_settings().sentiment_cache_size)
+        return cls._cache
+
+    @classmethod
+    async def analyze_cached(cls, db: AsyncSession | None, texts: list[str]) -> list[dict]:
+        """
+        キャッシュ（プロセス内 LRU → sentiment_scores テーブル）を引き、ミスしたテキストだけ推論する。
+
+        Returns:
+            list[dict]: texts と同じ順序の {label, score}
+        """
+        return await cls.get_cache().get_many(
+            db, texts, cls.model_version(), cls.analyze_many_async
+        )
@@ -0,0 +1,136 @@
+"""
+センチメントスコアキャッシュ
+正規化テキスト + モデルバージョンのハッシュをキーに、プロセス内 LRU と sentiment_scores テーブルの
+2 段でキャッシュする。どちらにもないテキストだけをモデルで推論する。
+"""
+import hashlib
+import logging
+import re
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.metrics import record_cache
+from models.sentiment import SentimentScore
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """キャッシュキー用にテキストを正規化する（NFKC + 空白の統一）"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def content_hash(text: str, model_version: str) -> str:
+    """正規化テキストとモデルバージョンからキャッシュキーを作成する"""
+    raw = f"{model_version}\0{normalize_text(text)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SentimentCache:
+    """プロセス内 LRU + DB のセンチメントスコアキャッシュ"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._lru: OrderedDict[str, dict] = OrderedDict()
+
+    def _lru_get(self, key: str) -> dict | None:
+        value = self._lru.get(key)
+        if value is not None:
+            self._lru.move_to_end(key)
+        return value
+
+    def _lru_put(self, key: str, value: dict) -> None:
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    async def get_many(
+        self,
+        db: AsyncSession | None,
+        texts: list[str],
+        model_version: str,
+        resolve_misses: Callable[[list[str]], Awaitable[list[dict]]],
+    ) -> list[dict]:
+        """
+        テキストのセンチメントをキャッシュから解決し、ミスしたものだけ resolve_misses で推論する。
+
+        DB の参照・保存は SAVEPOINT 内で行い、失敗した場合はその分だけ巻き戻してログを出し、
+        プロセス内 LRU とモデルのみで処理を続ける（呼び出し側の未コミットの変更は残る）。
+
+        Args:
+            db: データベースセッション（None の場合は LRU のみ使用）
+            texts: 分析対象テキスト
+            model_version: モデルバージョン（変更するとキャッシュは無効になる）
+            resolve_misses: ミスしたテキストを推論する関数（入力と同じ順序で結果を返す）
+
+        Returns:
+            list[dict]: texts と同じ順序の {label, score}
+        """
+        keys = [content_hash(text, model_version) for text in texts]
+        resolved: dict[str, dict] = {}
+
+        for key in keys:
+            value = self._lru_get(key)
+            if value is not None:
+                resolved[key] = value
+
+        # LRU にないものは 1 クエリでまとめて DB から取得する
+        missing = list(dict.fromkeys(k for k in keys if k not in resolved))
+        if missing and db is not None:
+            try:
+                # 失敗しても呼び出し側のトランザクション（未コミットの変更）を巻き込まないよう SAVEPOINT 内で行う
+                async with db.begin_nested():
+                    result = await db.execute(
+                        select(
+                            SentimentScore.content_hash, SentimentScore.label, SentimentScore.score
+                        )
+                        .where(SentimentScore.model_version == model_version)
+                        .where(SentimentScore.content_hash.in_(missing))
+                    )
+                    rows = result.all()
+            except Exception as e:
+                logger.warning("センチメントキャッシュ参照失敗（モデルで推論）: %s", e)
+                db = None
+            else:
+                for key, label, score in rows:
+                    resolved[key] = {"label": label, "score": score}
+                    self._lru_put(key, resolved[key])
+
+        # 残りをモデルで推論（同一テキストは 1 回だけ）
+        miss_texts: dict[str, str] = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key not in resolved:
+                miss_texts.setdefault(key, text)
+
+        record_cache("sentiment", hit=True, count=len(keys) - len(miss_texts))
+        record_cache("sentiment", hit=False, count=len(miss_texts))
+
+        if miss_texts:
+            outputs = await resolve_misses(list(miss_texts.values()))
+            new_rows = []
+            for key, output in zip(miss_texts, outputs, strict=True):
+                value = {"label": output["label"], "score": float(output["score"])}
+                resolved[key] = value
+                self._lru_put(key, value)
+                new_rows.append({"content_hash": key, "model_version": model_version, **value})
+
+            if db is not None:
+                try:
+                    async with db.begin_nested():
+                        await db.execute(
+                            insert(SentimentScore)
+                            .values(new_rows)
+                            .on_conflict_do_nothing(constraint="uq_sentiment_hash_model")
+                        )
+                except Exception as e:
+                    logger.warning("センチメントキャッシュ保存失敗: %s", e)
+
+        return [resolved[key] for key in keys]
@@ -3,15 +3,41 @@
 pandas-ta を使用して各種テクニカル指標を計算する。
 """
 import logging
+import time
+from collections import OrderedDict
 from datetime import date
 from decimal import Decimal
 
 import pandas as pd
-import pandas_ta as ta
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.stock import Stock, StockPrice
+from core.config import get_settings
+from core.data_version import get_data_version, prices_scope
+from core.lazy import lazy_import
+from core.metrics import PANDAS_TA_SECONDS, record_cache
+from core.tracing import span
+from models.stock import Stock
+from services.price_cache import load_cached_price_frame
+from services.rollup import load_rollup_frame
+
+# pandas-ta はインポートが重いため初回計算時にロードする
+ta = lazy_import("pandas_ta")
+
+# 指標計算結果のプロセス内キャッシュ: (ticker, limit, granularity, 株価のデータバージョン)
+# → (計算時刻, DataFrame)。別プロセス（他のワーカー・コレクター）の取り込みもバージョンで無効になる
+_indicator_cache: OrderedDict[tuple[str, int, str, int], tuple[float, pd.DataFrame]] = (
+    OrderedDict()
+)
+
+
+def invalidate_indicator_cache(ticker: str | None = None) -> None:
+    """指標キャッシュを破棄する（ticker 指定時はその銘柄のみ）"""
+    if ticker is None:
+        _indicator_cache.clear()
+        return
+    for key in [k for k in _indicator_cache if k[0] == ticker]:
+        del _indicator_cache[key]
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +46,8 @@ async def calculate_technical_indicators(
     db: AsyncSession,
     ticker: str,
     limit: int = 365,
+    use_cache: bool = True,
+    granularity: str = "day",
 ) -> pd.DataFrame:
     """
     指定された銘柄の株価データを取得し、テクニカル指標を計算して DataFrame として返す。
@@ -27,48 +55,76 @@ async def calculate_technical_indicators(
     Args:
         db: データベースセッション
         ticker: 銘柄コード
-        limit: 計算に使用する過去データの件数（少なすぎると指標が計算できない場合がある）
+        limit: 計算に使用する直近のデータの件数（少なすぎると指標が計算できない場合がある）
+        use_cache: プロセス内キャッシュ（株価のデータバージョンごと。INDICATOR_CACHE_TTL_SECONDS）を使うか
+        granularity: 足の粒度（"day" / "week" / "month"。週足・月足はロールアップから読む）
 
     Returns:
         pd.DataFrame: テクニカル指標が付与された DataFrame
     """
+    settings = get_settings()
+    with span(
+        "technical.indicators", ticker=ticker, limit=limit, granularity=granularity
+    ) as current:
+        if use_cache:
+            version = await get_data_version(db, prices_scope(ticker))
+            key = (ticker, limit, granularity, version)
+            cached = _indicator_cache.get(key)
+            if cached and time.monotonic() - cached[0] < settings.indicator_cache_ttl_seconds:
+                _indicator_cache.move_to_end(key)
+                record_cache("indicators", hit=True)
+                if current is not None:
+                    current.set_attribute("cache.hit", True)
+                return cached[1].copy()
+            record_cache("indicators", hit=False)
+        if current is not None:
+            current.set_attribute("cache.hit", False)
+
+        df = await _calculate_technical_indicators(db, ticker, limit, granularity)
+
+    if use_cache and not df.empty:
+        _indicator_cache[key] = (time.monotonic(), df.copy())
+        while len(_indicator_cache) > settings.indicator_cache_max_entries:
+            _indicator_cache.popitem(last=False)
+    return df
+
+
+async def _calculate_technical_indicators(
+    db: AsyncSession,
+    ticker: str,
+    limit: int,
+    granularity: str = "day",
+) -> pd.DataFrame:
+    """DB から株価データを取得してテクニカル指標を計算する（キャッシュなし）"""
     # 銘柄の存在確認
-    result = await db.execute(select(Stock).where(Stock.ticker == ticker))
-    stock = result.scalar_one_or_none()
-    if not stock:
+    result = await db.execute(select(Stock.id).where(Stock.ticker == ticker))
+    stock_id = result.scalar_one_or_none()
+    if stock_id is None:
         raise ValueError(f"銘柄 '{ticker}' が見つかりません")
 
     # 株価データ取得（日付昇順）
     # pandas-ta は時系列順のデータを期待するため昇順
-    price_result = await db.execute(
-        select(StockPrice)
-        .where(StockPrice.stock_id == stock.id)
-        .order_by(StockPrice.price_date.asc())
-        .limit(limit * 2)  # 移動平均などを計算するために少し多めに取得
-    )
-    prices = price_result.scalars().all()
-
-    if not prices:
+    # 日足は株価カラムキャッシュ（PRICE_CACHE_DIR）の列ファイルをコピーせずに読む。キャッシュが無効なら
+    # float8 列をカバリングインデックス（ix_stock_prices_stock_date）から読み、Decimal の変換を省く
+    # 週足・月足は日足を集計せず、取り込み時に更新しているロールアップを読む
+    # 移動平均などを計算するために少し多めに、直近の足から取得
+    if granularity == "day":
+        df = await load_cached_price_frame(db, ticker, stock_id, limit=limit * 2, latest=True)
+    else:
+        df = await load_rollup_frame(db, stock_id, granularity, limit=limit * 2, latest=True)
+
+    if df.empty:
         logger.warning("株価データがありません: ticker=%s", ticker)
         return pd.DataFrame()
 
-    # DataFrame に変換
-    data = [
-        {
-            "date": p.price_date,
-            "open": float(p.open),
-            "high": float(p.high),
-            "low": float(p.low),
-            "close": float(p.close),
-            "volume": float(p.volume),
-        }
-        for p in prices
-    ]
-    df = pd.DataFrame(data)
-    df.set_index("date", inplace=True)
-
     # --- テクニカル指標の計算 ---
+    with PANDAS_TA_SECONDS.time(), span("technical.pandas_ta", rows=len(df)):
+        df = add_indicators(df)
+    return df
+
 
+def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """株価の DataFrame に pandas-ta でテクニカル指標の列を追加する"""
     # 1. 移動平均線 (SMA)
     df["SMA_20"] = ta.sma(df["close"], length=20)
     df["SMA_50"] = ta.sma(df["close"], length=50)
@@ -4,12 +4,15 @@ API ルーター集約
 """
 from fastapi import APIRouter
 
-from api.v1 import analysis, health, macro, news, stocks
+from api.v1 import analysis, export, health, macro, news, realtime, screening, stocks
 
 router = APIRouter(prefix="/api/v1")
 
 router.include_router(health.router, tags=["ヘルスチェック"])
 router.include_router(stocks.router, tags=["銘柄"])
 router.include_router(analysis.router, tags=["分析・予測"])
+router.include_router(screening.router, tags=["スクリーニング"])
 router.include_router(news.router, tags=["ニュース"])
 router.include_router(macro.router, tags=["マクロ経済指標"])
+router.include_router(export.router, tags=["エクスポート"])
+router.include_router(realtime.router, tags=["リアルタイム配信"])
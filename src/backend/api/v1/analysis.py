@@ -1,62 +1,94 @@
 """
 分析・予測 API エンドポイント
 """
-import pandas as pd
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from analyzers.macro_panel import get_macro_panel
 from analyzers.sentiment import SentimentAnalyzer
 from analyzers.technical import calculate_technical_indicators
-from core.database import get_db
+from core.config import get_settings
+from core.data_version import prices_scope
+from core.database import get_db, get_read_db
+from core.response_cache import cached_response
+from core.serialization import dataframe_to_columnar_json, dataframe_to_records_json
 from predictors.price_predictor import PricePredictor
+from predictors.registry import booster_name, get_booster
 from schemas.analysis import (
+    TECHNICAL_COLUMNS,
     PredictionResponse,
+    SentimentBatchRequest,
+    SentimentBatchResponse,
+    SentimentDocumentRequest,
+    SentimentDocumentResponse,
     SentimentRequest,
     SentimentResponse,
     TechnicalIndicators,
+    TechnicalIndicatorsColumnar,
 )
+from schemas.stock import GRANULARITY_DESCRIPTION, Granularity
+from services.realtime import PREDICTION, get_broker
+from services.warmup import record_ticker_request
 
 router = APIRouter(prefix="/analysis")
 
 
-@router.get("/{ticker}/technical", response_model=list[TechnicalIndicators])
+@router.get(
+    "/{ticker}/technical",
+    response_model=list[TechnicalIndicators] | TechnicalIndicatorsColumnar,
+)
 async def get_technical_indicators(
+    request: Request,
     ticker: str,
     days: int = 30,
-    db: AsyncSession = Depends(get_db),
-) -> list[dict]:
-    """テクニカル指標を取得する（直近 N 日分）"""
-    try:
-        df = await calculate_technical_indicators(db, ticker, limit=days + 100)
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    format: Literal["records", "columnar"] = Query(
+        "records", description="records: 日ごとのオブジェクト配列 / columnar: 項目ごとの配列"
+    ),
+    granularity: Granularity = Query("day", description=GRANULARITY_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    テクニカル指標を取得する（直近 N 本分。週足・月足では days は足の本数）。
+
+    株価の取り込みまで内容が変わらないため、ETag 付きでキャッシュする（If-None-Match で 304）。
+    """
 
-    if df.empty:
-        return []
+    async def build() -> bytes:
+        try:
+            df = await calculate_technical_indicators(
+                db, ticker, limit=days + 100, granularity=granularity
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
 
-    # 直近 N 日分のみ返す
-    recent_df = df.tail(days)
-    result = []
-    for date_idx, row in recent_df.iterrows():
-        # NaN を None に変換
-        row_dict = row.where(pd.notnull(row), None).to_dict()
-        row_dict["date"] = date_idx  # index (date) を含める
-        result.append(row_dict)
+        # 直近 N 日分のみ返す（NaN は列単位で null として書き出す）
+        recent_df = df.tail(days)
+        if format == "columnar":
+            return dataframe_to_columnar_json(recent_df, TECHNICAL_COLUMNS)
+        return dataframe_to_records_json(recent_df, TECHNICAL_COLUMNS)
 
-    return result
+    response = await cached_response(
+        request, db, prices_scope(ticker), list[TechnicalIndicators], build
+    )
+    # 存在しない銘柄は build の 404 で抜けるため、参照回数に数えない
+    record_ticker_request(ticker)
+    return response
 
 
 @router.post("/sentiment", response_model=SentimentResponse)
 async def analyze_sentiment(
     request: SentimentRequest,
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
-    """テキストのセンチメント分析を行う"""
+    """テキストのセンチメント分析を行う（分析済みのテキストはキャッシュから返す）"""
     try:
-        result = SentimentAnalyzer.analyze(request.text)
+        result = (await SentimentAnalyzer.analyze_cached(db, [request.text]))[0]
     except ImportError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+        raise HTTPException(status_code=503, detail=str(e)) from e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"分析エラー: {e}")
+        raise HTTPException(status_code=500, detail=f"分析エラー: {e}") from e
 
     return {
         "text": request.text,
@@ -65,33 +97,91 @@ async def analyze_sentiment(
     }
 
 
+@router.post("/sentiment/batch", response_model=SentimentBatchResponse)
+async def analyze_sentiment_batch(
+    request: SentimentBatchRequest,
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """複数テキストのセンチメント分析をまとめて行う（最大 500 件、キャッシュは 1 クエリで解決）"""
+    try:
+        results = await SentimentAnalyzer.analyze_cached(db, request.texts)
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"分析エラー: {e}") from e
+
+    return {
+        "results": [
+            {"text": text, "label": result["label"], "score": result["score"]}
+            for text, result in zip(request.texts, results, strict=True)
+        ]
+    }
+
+
+@router.post("/sentiment/document", response_model=SentimentDocumentResponse)
+async def analyze_sentiment_document(
+    request: SentimentDocumentRequest,
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """長文全体のセンチメント分析を行う（重なりのあるトークンウィンドウをまとめて推論）"""
+    try:
+        result = await SentimentAnalyzer.analyze_document_cached(db, request.text)
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"分析エラー: {e}") from e
+
+    return {"label": result["label"], "score": result["score"]}
+
+
 @router.post("/{ticker}/predict", response_model=PredictionResponse)
 async def predict_price(
     ticker: str,
     target_days: int = 30,
+    granularity: Granularity = Query("day", description=GRANULARITY_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
-    """株価予測を行う（簡易版: その場で直近データを使って学習・予測）"""
-    # 本来は定期バッチで学習済みモデルを使うが、ここではデモとしてオンデマンド学習する
+    """
+    株価予測を行う（簡易版: その場で直近データを使って学習・予測）。
+
+    1〜12 か月先のような長期の予測は granularity=week / month で週足・月足から学習できる。
+    """
+    # 学習済みモデルが登録されていればそれを使い、なければオンデマンド学習する
     try:
-        df = await calculate_technical_indicators(db, ticker, limit=1000)
+        df = await calculate_technical_indicators(
+            db, ticker, limit=1000, granularity=granularity
+        )
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    record_ticker_request(ticker)
 
     if df.empty or len(df) < 100:
         raise HTTPException(
             status_code=400,
-            detail="予測に必要な十分なデータがありません（最低100日分）",
+            detail="予測に必要な十分なデータがありません（最低100本分）",
         )
 
-    predictor = PricePredictor()
+    model = get_booster(booster_name(ticker, target_days, granularity))
+    # 登録済みモデルはマクロ指標なしの特徴量で学習しているため、パネルはオンデマンド学習でだけ使う
+    macro_panel = None
+    if model is None and get_settings().predictor_macro_features:
+        macro_panel = await get_macro_panel(db)
+    predictor = PricePredictor(granularity, macro_panel=macro_panel)
+    predictor.model = model
     try:
-        # 学習（直近データを使って）
-        predictor.train(df, target_days=target_days)
+        if predictor.model is None:
+            # 学習（直近データを使って）
+            predictor.train(df, target_days=target_days)
         # 予測
         predicted_return = predictor.predict(df, target_days=target_days)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"予測エラー: {e}")
+        raise HTTPException(status_code=500, detail=f"予測エラー: {e}") from e
+
+    get_broker().publish(
+        ticker,
+        PREDICTION,
+        {"target_days": target_days, "predicted_return": predicted_return},
+    )
 
     return {
         "ticker": ticker,
@@ -0,0 +1,64 @@
+"""
+一括エクスポートエンドポイント
+"""
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.database import get_read_db, get_read_session_factory
+from models.stock import Stock
+from services.export import FORMATS, export_prices
+
+router = APIRouter(prefix="/export")
+
+
+@router.get("/prices")
+async def export_stock_prices(
+    tickers: list[str] = Query(
+        ..., description="銘柄コード（複数指定可。カンマ区切りも可）", examples=["7203.T,AAPL"]
+    ),
+    start: date | None = Query(None, description="開始日（含む）"),
+    end: date | None = Query(None, description="終了日（含む）"),
+    format: Literal["ndjson", "arrow", "parquet"] = Query("ndjson"),
+    chunk_size: int = Query(10000, ge=100, le=100000, description="1 回に読み出す行数"),
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+) -> StreamingResponse:
+    """
+    複数銘柄の株価履歴を NDJSON / Arrow IPC ストリーム / Parquet で一括ダウンロードする。
+
+    サーバーサイドカーソルから chunk_size 行ずつ書き出すため、件数によらずメモリ使用量は一定。
+    並びは銘柄ごと（銘柄 ID 順。銘柄コード順ではない）に日付の昇順。
+    """
+    ticker_list = list(
+        dict.fromkeys(t.strip() for value in tickers for t in value.split(",") if t.strip())
+    )
+    if not ticker_list:
+        raise HTTPException(status_code=400, detail="tickers を指定してください")
+    if len(ticker_list) > 500:
+        raise HTTPException(status_code=400, detail="tickers は 500 件までです")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start は end 以前の日付を指定してください")
+
+    result = await db.execute(select(Stock.id, Stock.ticker).where(Stock.ticker.in_(ticker_list)))
+    tickers = dict(result.all())
+    found = set(tickers.values())
+    missing = [t for t in ticker_list if t not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"銘柄が見つかりません: {', '.join(missing)}")
+
+    try:
+        content = export_prices(session_factory, tickers, format, start, end, chunk_size)
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    media_type, extension = FORMATS[format]
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="prices.{extension}"'},
+    )
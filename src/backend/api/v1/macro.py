@@ -1,22 +1,30 @@
 """
 マクロ経済指標エンドポイント（DB 保存）
 """
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from analyzers.macro_panel import observation_matrix
 from collectors.macro import (
     fetch_and_save_macro_indicator,
     get_saved_macro_data,
     list_available_indicators,
+    load_macro_observations,
     MACRO_INDICATORS,
 )
 from core.config import get_settings
-from core.database import get_db
+from core.data_version import macro_scope
+from core.database import get_db, get_read_db
+from core.response_cache import cached_response
+from core.serialization import dataframe_to_columnar_json
 from schemas.macro import (
     MacroDataPoint,
     MacroIndicatorFetchRequest,
     MacroIndicatorFetchResponse,
     MacroIndicatorListResponse,
     MacroIndicatorResponse,
+    MacroPanelResponse,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -32,6 +40,45 @@ async def get_available_indicators() -> dict:
     return {"indicators": indicators}
 
 
+@router.get("/panel", response_model=MacroPanelResponse)
+async def get_macro_indicator_panel(
+    request: Request,
+    keys: list[str] = Query(
+        ..., description="指標キー（複数指定可。カンマ区切りも可）", examples=["cpi,fed_rate,usdjpy"]
+    ),
+    start: date | None = Query(None, description="開始日（含む、観測日で判定）"),
+    fill: bool = Query(True, description="観測のない日を直前の観測値で埋める"),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    複数のマクロ指標を観測日の和集合を軸にそろえた列ごとの配列で返す。
+
+    全指標を 1 クエリで読み出してサーバー側でそろえる（ダッシュボードの指標ごとの取得と結合を省く）。
+    いずれかの指標の取り込みまで内容が変わらないため、ETag 付きでキャッシュする（If-None-Match で 304）。
+    """
+    key_list = list(
+        dict.fromkeys(k.strip() for value in keys for k in value.split(",") if k.strip())
+    )
+    if not key_list:
+        raise HTTPException(status_code=400, detail="keys を指定してください")
+    unknown = [key for key in key_list if key not in MACRO_INDICATORS]
+    if unknown:
+        available = ", ".join(MACRO_INDICATORS.keys())
+        raise HTTPException(
+            status_code=400,
+            detail=f"不明な指標: '{', '.join(unknown)}'。利用可能: {available}",
+        )
+
+    async def build() -> bytes:
+        observations = await load_macro_observations(db, key_list, start=start)
+        matrix = observation_matrix(observations, key_list, fill=fill)
+        return dataframe_to_columnar_json(matrix, key_list)
+
+    return await cached_response(
+        request, db, [macro_scope(key) for key in key_list], MacroPanelResponse, build
+    )
+
+
 @router.post("/{indicator_key}/fetch", response_model=MacroIndicatorFetchResponse)
 async def fetch_macro_data(
     indicator_key: str,
@@ -69,11 +116,16 @@ async def fetch_macro_data(
 
 @router.get("/{indicator_key}", response_model=MacroIndicatorResponse)
 async def get_macro_indicator(
+    request: Request,
     indicator_key: str,
     limit: int = 120,
-    db: AsyncSession = Depends(get_db),
-) -> dict:
-    """保存済みのマクロ指標データを取得する"""
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    保存済みのマクロ指標データを取得する。
+
+    指標の取り込みまで内容が変わらないため、ETag 付きでキャッシュする（If-None-Match で 304）。
+    """
     indicator = MACRO_INDICATORS.get(indicator_key)
     if not indicator:
         available = ", ".join(MACRO_INDICATORS.keys())
@@ -82,20 +134,25 @@ async def get_macro_indicator(
             detail=f"不明な指標: '{indicator_key}'。利用可能: {available}",
         )
 
-    try:
-        records = await get_saved_macro_data(db, indicator_key, limit=limit)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    async def build() -> dict:
+        try:
+            records = await get_saved_macro_data(db, indicator_key, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    data = [
-        MacroDataPoint(indicator_date=r.indicator_date, value=r.value)
-        for r in records
-    ]
+        data = [
+            MacroDataPoint(indicator_date=r.indicator_date, value=r.value)
+            for r in records
+        ]
 
-    return {
-        "indicator": indicator_key,
-        "name": indicator["name"],
-        "series_id": indicator["series_id"],
-        "data": data,
-        "total": len(data),
-    }
+        return {
+            "indicator": indicator_key,
+            "name": indicator["name"],
+            "series_id": indicator["series_id"],
+            "data": data,
+            "total": len(data),
+        }
+
+    return await cached_response(
+        request, db, macro_scope(indicator_key), MacroIndicatorResponse, build
+    )
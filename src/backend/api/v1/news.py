@@ -1,30 +1,55 @@
 """
-ニュース取得エンドポイント（逐次取得、DB 保存なし）
+ニュース取得エンドポイント（DB 保存済み記事の全文検索）
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from collectors.news import fetch_news
+from core.database import get_db
 from schemas.news import NewsResponse
+from services.news_store import save_articles, search_news
 
 router = APIRouter(prefix="/news")
 
+# 未蓄積のクエリをライブ取得する際の取得件数（保存分を含む）
+_LIVE_FETCH_ITEMS = 100
+
 
 @router.get("/{query}", response_model=NewsResponse)
 async def get_news(
     query: str,
-    max_items: int = 10,
+    max_items: int = Query(10, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
-    """ニュースを取得する（逐次、DB 保存なし）"""
+    """
+    保存済みのニュースを検索する（未蓄積のクエリはライブ取得して保存する）。
+
+    ライブ取得した記事は保存後に同じ検索で引き直すため、1 ページ目も 2 ページ目以降と同じ並びと
+    カーソルで返す。
+    """
     try:
-        articles = await fetch_news(query, max_items=max_items)
-    except Exception as e:
-        raise HTTPException(
-            status_code=502,
-            detail=f"ニュースの取得に失敗しました: {e}",
-        )
+        articles, next_cursor = await search_news(db, query, limit=max_items, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if not articles and cursor is None:
+        try:
+            live_articles = await fetch_news(query, max_items=_LIVE_FETCH_ITEMS)
+        except Exception as e:
+            raise HTTPException(
+                status_code=502,
+                detail=f"ニュースの取得に失敗しました: {e}",
+            ) from e
+        await save_articles(db, live_articles)
+        articles, next_cursor = await search_news(db, query, limit=max_items)
+        if not articles:
+            # 検索語をタイトル・要約に含まない記事だけが返った場合は、辿れないため 1 ページだけ返す
+            articles = live_articles[:max_items]
 
     return {
         "query": query,
         "articles": articles,
         "total": len(articles),
+        "next_cursor": next_cursor,
     }
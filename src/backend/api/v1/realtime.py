@@ -0,0 +1,52 @@
+"""
+リアルタイム配信エンドポイント（Server-Sent Events）
+"""
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from core.config import get_settings
+from services.realtime import event_stream, get_broker
+
+router = APIRouter(prefix="/realtime")
+
+settings = get_settings()
+
+
+@router.get("/stream")
+async def stream_updates(
+    tickers: list[str] = Query(
+        ..., description="購読する銘柄コード（複数指定可。カンマ区切りも可）", examples=["7203.T,AAPL"]
+    ),
+) -> StreamingResponse:
+    """
+    銘柄の更新を Server-Sent Events で配信する。
+
+    イベント:
+    - bar: 新しく保存された足（{"ticker", "bars": [...]}）
+    - indicators: 新しい足を反映した最新のテクニカル指標
+    - prediction: 新しい予測結果
+    - resync: 配信が追いつかずイベントを破棄した（REST で取り直す）
+    """
+    ticker_list = list(
+        dict.fromkeys(t.strip() for value in tickers for t in value.split(",") if t.strip())
+    )
+    if not ticker_list:
+        raise HTTPException(status_code=400, detail="tickers を指定してください")
+    if len(ticker_list) > 100:
+        raise HTTPException(status_code=400, detail="tickers は 100 件までです")
+
+    # ストリーム開始後は 503 を返せないため、レスポンスを返す前に購読者を登録する
+    broker = get_broker()
+    try:
+        subscriber = broker.add(ticker_list)
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return StreamingResponse(
+        event_stream(broker, subscriber, settings.realtime_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # ストリームが始まらずに終わった場合も購読を解除する
+        background=BackgroundTask(broker.remove, subscriber),
+    )
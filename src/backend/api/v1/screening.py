@@ -0,0 +1,53 @@
+"""
+銘柄スクリーニングエンドポイント
+"""
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query
+
+from schemas.analysis import ScreeningResponse
+from services.screening import screen_universe
+from services.universe import get_universe
+
+router = APIRouter(prefix="/screening")
+
+
+@router.get("", response_model=ScreeningResponse)
+async def screen_stocks(
+    rsi_min: float | None = Query(None, ge=0, le=100, description="RSI_14 の下限（含む）"),
+    rsi_max: float | None = Query(None, ge=0, le=100, description="RSI_14 の上限（含む）"),
+    above_sma_200: bool | None = Query(
+        None, description="true: 終値が SMA_200 より上 / false: 下の銘柄"
+    ),
+    min_volume: float | None = Query(None, ge=0, description="最新の出来高の下限（含む）"),
+    limit: int = Query(50, ge=1, le=1000, description="返す件数の上限（銘柄コード順）"),
+) -> dict:
+    """
+    アクティブな全銘柄を最新のテクニカル指標で絞り込む。
+
+    リフレッシャー（python -m services.universe）が共有メモリに置いたユニバース行列を読むため、
+    銘柄ごとに DB を読まず、uvicorn のワーカー数が増えてもユニバースのコピーは 1 組だけ。
+    指標はリフレッシャーの更新間隔（UNIVERSE_REFRESH_INTERVAL_SECONDS）だけ遅れる。
+    """
+    matrix = get_universe()
+    if matrix is None:
+        raise HTTPException(
+            status_code=503,
+            detail=(
+                "ユニバース行列が利用できません"
+                "（UNIVERSE_ENABLED とリフレッシャーを確認してください）"
+            ),
+        )
+    total, results = screen_universe(
+        matrix,
+        rsi_min=rsi_min,
+        rsi_max=rsi_max,
+        above_sma_200=above_sma_200,
+        min_volume=min_volume,
+        limit=limit,
+    )
+    return {
+        "version": matrix.version,
+        "as_of": pd.Timestamp(matrix.dates[-1]).date() if len(matrix.dates) else None,
+        "total": total,
+        "results": results,
+    }
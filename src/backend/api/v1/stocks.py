@@ -1,14 +1,21 @@
 """
 銘柄 CRUD + 株価データエンドポイント
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, null, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from collectors.stock_price import fetch_and_save_stock_prices
-from core.database import get_db
-from models.stock import Stock, StockPrice
+from collectors.stock_price import after_prices_committed, fetch_and_save_stock_prices
+from core.data_version import prices_scope
+from core.database import get_db, get_read_db
+from core.pagination import decode_cursor, encode_cursor, keyset_page
+from core.response_cache import cached_response
+from models.stock import Stock, StockPrice, StockPriceRollup
 from schemas.stock import (
+    GRANULARITY_DESCRIPTION,
+    Granularity,
     StockCreate,
     StockListResponse,
     StockPriceFetchRequest,
@@ -21,26 +28,57 @@ from schemas.stock import (
 router = APIRouter(prefix="/stocks")
 
 
+def _parse_cursor(cursor: str | None, key: str) -> tuple[str | None, bool]:
+    """カーソルからキー値と方向（prev なら True）を取り出す（不正なら 400）"""
+    if cursor is None:
+        return None, False
+    try:
+        values = decode_cursor(cursor)
+        value, direction = values[key], values["dir"]
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="不正なカーソルです") from e
+    if direction not in ("next", "prev"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="不正なカーソルです")
+    return value, direction == "prev"
+
+
 @router.get("", response_model=StockListResponse)
 async def list_stocks(
-    skip: int = 0,
-    limit: int = 50,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None, description="前回レスポンスの next_cursor / prev_cursor"),
+    include_total: bool = Query(False, description="アクティブ銘柄の総数を返すか"),
+    db: AsyncSession = Depends(get_read_db),
 ) -> dict:
-    """銘柄一覧を取得する"""
-    count_result = await db.execute(select(func.count(Stock.id)))
-    total = count_result.scalar_one()
-
-    result = await db.execute(
-        select(Stock)
-        .where(Stock.is_active.is_(True))
-        .order_by(Stock.ticker)
-        .offset(skip)
-        .limit(limit)
+    """銘柄一覧を取得する（ティッカー順のキーセットページネーション）"""
+    ticker_after, backward = _parse_cursor(cursor, "ticker")
+
+    stmt = select(Stock).where(Stock.is_active.is_(True))
+    if ticker_after is not None:
+        stmt = stmt.where(Stock.ticker < ticker_after if backward else Stock.ticker > ticker_after)
+    order = Stock.ticker.desc() if backward else Stock.ticker
+    result = await db.execute(stmt.order_by(order).limit(limit + 1))
+
+    stocks, next_cursor, prev_cursor = keyset_page(
+        list(result.scalars().all()),
+        limit,
+        backward,
+        lambda stock, direction: encode_cursor({"ticker": stock.ticker, "dir": direction}),
+        has_cursor=cursor is not None,
     )
-    stocks = result.scalars().all()
 
-    return {"stocks": stocks, "total": total}
+    total = None
+    if include_total:
+        count_result = await db.execute(
+            select(func.count(Stock.id)).where(Stock.is_active.is_(True))
+        )
+        total = count_result.scalar_one()
+
+    return {
+        "stocks": stocks,
+        "total": total,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
 
 
 @router.post("", response_model=StockResponse, status_code=status.HTTP_201_CREATED)
@@ -49,8 +87,8 @@ async def create_stock(
     db: AsyncSession = Depends(get_db),
 ) -> Stock:
     """銘柄を登録する"""
-    existing = await db.execute(select(Stock).where(Stock.ticker == stock_in.ticker))
-    if existing.scalar_one_or_none():
+    existing = await db.execute(select(Stock.id).where(Stock.ticker == stock_in.ticker))
+    if existing.scalar_one_or_none() is not None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"銘柄 '{stock_in.ticker}' は既に登録されています",
@@ -66,7 +104,7 @@ async def create_stock(
 @router.get("/{ticker}", response_model=StockResponse)
 async def get_stock(
     ticker: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Stock:
     """銘柄の詳細を取得する"""
     result = await db.execute(select(Stock).where(Stock.ticker == ticker))
@@ -91,55 +129,111 @@ async def fetch_stock_prices(
     period = request.period if request else "1y"
 
     try:
-        saved_count = await fetch_and_save_stock_prices(db, ticker, period)
+        saved = await fetch_and_save_stock_prices(db, ticker, period)
+        # 配信・キャッシュの破棄はコミットした足だけを対象にする
+        await db.commit()
     except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"株価データの取得に失敗しました: {e}",
-        )
+        ) from e
+    await after_prices_committed(db, saved)
 
     return {
         "ticker": ticker,
-        "saved_count": saved_count,
-        "message": f"{saved_count}件の株価データを保存しました",
+        "saved_count": saved.count,
+        "message": f"{saved.count}件の株価データを保存しました",
     }
 
 
 @router.get("/{ticker}/prices", response_model=StockPriceListResponse)
 async def get_stock_prices(
+    request: Request,
     ticker: str,
-    skip: int = 0,
-    limit: int = 365,
-    db: AsyncSession = Depends(get_db),
-) -> dict:
-    """保存済みの株価データを取得する"""
-    # 銘柄の存在確認
-    stock_result = await db.execute(select(Stock).where(Stock.ticker == ticker))
-    stock = stock_result.scalar_one_or_none()
-
-    if not stock:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"銘柄 '{ticker}' が見つかりません",
+    limit: int = Query(365, ge=1, le=5000),
+    cursor: str | None = Query(None, description="前回レスポンスの next_cursor / prev_cursor"),
+    granularity: Granularity = Query("day", description=GRANULARITY_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    保存済みの株価データを取得する（日付降順のキーセットページネーション）。
+
+    週足・月足は日足を集計せず、取り込み時に更新しているロールアップを読む
+    （20 年分の月足は約 5,000 行ではなく 240 行の読み出しになる）。
+
+    株価の取り込みまで内容が変わらないため、ETag 付きでキャッシュする（If-None-Match で 304）。
+    """
+    date_before, backward = _parse_cursor(cursor, "price_date")
+    try:
+        date_before = date.fromisoformat(date_before) if date_before is not None else None
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="不正なカーソルです") from e
+
+    async def build() -> dict:
+        # 銘柄の存在確認（ID と取り込み時に更新している件数のみ取得）
+        stock_result = await db.execute(
+            select(Stock.id, Stock.price_count).where(Stock.ticker == ticker)
+        )
+        stock_row = stock_result.one_or_none()
+
+        if stock_row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"銘柄 '{ticker}' が見つかりません",
+            )
+        stock_id, total = stock_row
+
+        # 株価データ取得（表示は日付降順。prev は昇順に取得して並べ直す）
+        if granularity == "day":
+            price_date = StockPrice.price_date
+            stmt = select(StockPrice).where(StockPrice.stock_id == stock_id)
+        else:
+            # ロールアップは期間の開始日を price_date として StockPriceResponse の形で返す
+            price_date = StockPriceRollup.period_start
+            conditions = (
+                StockPriceRollup.stock_id == stock_id,
+                StockPriceRollup.granularity == granularity,
+            )
+            stmt = select(
+                StockPriceRollup.id,
+                price_date.label("price_date"),
+                StockPriceRollup.open,
+                StockPriceRollup.high,
+                StockPriceRollup.low,
+                StockPriceRollup.close,
+                StockPriceRollup.volume,
+                null().label("adjusted_close"),
+            ).where(*conditions)
+            count_result = await db.execute(
+                select(func.count()).select_from(StockPriceRollup).where(*conditions)
+            )
+            total = count_result.scalar_one()
+        if date_before is not None:
+            stmt = stmt.where(price_date > date_before if backward else price_date < date_before)
+        order = price_date if backward else price_date.desc()
+        result = await db.execute(stmt.order_by(order).limit(limit + 1))
+        rows = result.scalars().all() if granularity == "day" else result.all()
+
+        prices, next_cursor, prev_cursor = keyset_page(
+            list(rows),
+            limit,
+            backward,
+            lambda price, direction: encode_cursor(
+                {"price_date": price.price_date.isoformat(), "dir": direction}
+            ),
+            has_cursor=cursor is not None,
         )
 
-    # 件数取得
-    count_result = await db.execute(
-        select(func.count(StockPrice.id)).where(StockPrice.stock_id == stock.id)
-    )
-    total = count_result.scalar_one()
-
-    # 株価データ取得（日付降順）
-    result = await db.execute(
-        select(StockPrice)
-        .where(StockPrice.stock_id == stock.id)
-        .order_by(StockPrice.price_date.desc())
-        .offset(skip)
-        .limit(limit)
-    )
-    prices = result.scalars().all()
-
-    return {"ticker": ticker, "prices": prices, "total": total}
+        return {
+            "ticker": ticker,
+            "prices": prices,
+            "total": total,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        }
 
+    return await cached_response(
+        request, db, prices_scope(ticker), StockPriceListResponse, build
+    )
@@ -0,0 +1 @@
+"""benchmarks パッケージ — 性能計測スクリプト（python -m benchmarks.<name> で実行）"""
@@ -0,0 +1,114 @@
+"""
+DB 接続の負荷試験
+sessions: 設定された DB に対して、get_db 相当（プライマリ + COMMIT）と get_read_db 相当
+          （DATABASE_READ_URL のレプリカ、COMMIT なし）のセッションで同じ読み取りを並行実行し、
+          スループット・レイテンシを比較する。DB_POOL_SIZE などの設定値の比較にも使う。
+http:     起動済みの API に同時接続で GET を送り続ける（レプリカの有無・プール設定を変えた
+          インスタンス同士の比較用）。DB の差を見るときは RESPONSE_CACHE_ENABLED=false で起動する。
+
+使い方:
+    python -m benchmarks.db_load sessions --ticker AAPL --requests 2000 --concurrency 50
+    python -m benchmarks.db_load http --url http://localhost:8000/api/v1/stocks/AAPL/prices \\
+        --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+import httpx
+from sqlalchemy import select
+
+from core.database import async_session, engine, read_engine, read_session
+from models.stock import Stock, StockPrice
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float]:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98]}
+
+
+async def _run(
+    label: str, one: Callable[[], Awaitable[None]], requests: int, concurrency: int
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def timed() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await one()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    p = _percentiles(latencies)
+    print(
+        f"{label:<10} {requests / elapsed:8.1f} req/s  "
+        f"p50={p['p50']:7.1f}ms  p95={p['p95']:7.1f}ms  p99={p['p99']:7.1f}ms"
+    )
+
+
+async def sessions(ticker: str, limit: int, requests: int, concurrency: int) -> None:
+    stmt = (
+        select(StockPrice)
+        .join(Stock, Stock.id == StockPrice.stock_id)
+        .where(Stock.ticker == ticker)
+        .order_by(StockPrice.price_date.desc())
+        .limit(limit)
+    )
+
+    async def primary() -> None:
+        # get_db: 読み取りのみでも COMMIT の往復がある
+        async with async_session() as session:
+            (await session.execute(stmt)).scalars().all()
+            await session.commit()
+
+    async def replica() -> None:
+        # get_read_db: レプリカに接続し、COMMIT しない
+        async with read_session() as session:
+            (await session.execute(stmt)).scalars().all()
+
+    # 接続の確立を計測から除外する
+    await _run("warmup", replica, concurrency, concurrency)
+    await _run("get_db", primary, requests, concurrency)
+    await _run("read_db", replica, requests, concurrency)
+    if read_engine is engine:
+        print("（DATABASE_READ_URL 未設定のため read_db もプライマリに接続しています）")
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+async def http(url: str, requests: int, concurrency: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+
+        async def one() -> None:
+            (await client.get(url)).raise_for_status()
+
+        await _run("warmup", one, concurrency, concurrency)
+        await _run("http", one, requests, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    sessions_parser = commands.add_parser("sessions")
+    sessions_parser.add_argument("--ticker", default="AAPL")
+    sessions_parser.add_argument("--limit", type=int, default=100)
+    http_parser = commands.add_parser("http")
+    http_parser.add_argument("--url", required=True)
+    for sub in (sessions_parser, http_parser):
+        sub.add_argument("--requests", type=int, default=2000)
+        sub.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "sessions":
+        asyncio.run(sessions(args.ticker, args.limit, args.requests, args.concurrency))
+    else:
+        asyncio.run(http(args.url, args.requests, args.concurrency))
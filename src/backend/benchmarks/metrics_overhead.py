@@ -0,0 +1,105 @@
+"""
+メトリクス計測のオーバーヘッド計測
+PrometheusMiddleware と SQLAlchemy のイベントを付けた場合・付けない場合の 1 回あたりの処理時間を比較する。
+ノイズを抑えるため、計測を交互に --rounds 回繰り返して最小値を採る。
+
+使い方:
+    python -m benchmarks.metrics_overhead --iterations 20000 --rounds 5
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from core.metrics import PANDAS_TA_SECONDS, PrometheusMiddleware, instrument_engine
+
+
+async def _endpoint(request):
+    return PlainTextResponse("ok")
+
+
+def _app():
+    return Starlette(routes=[Route("/items/{item_id}", _endpoint)])
+
+
+async def _call(app, iterations: int) -> float:
+    """ASGI アプリを直接呼び出し、1 リクエストあたりの時間（µs）を返す"""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/items/1",
+        "raw_path": b"/items/1",
+        "root_path": "",
+        "scheme": "http",
+        "query_string": b"",
+        "headers": [],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _queries(instrumented: bool, iterations: int) -> float:
+    """SQLite で SELECT を実行し、1 文あたりの時間（µs）を返す"""
+    engine = create_engine("sqlite://")
+    if instrumented:
+        instrument_engine(engine)
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            conn.execute(statement)
+        return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _observe(iterations: int) -> float:
+    """Histogram.time() 1 回あたりの時間（µs）"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with PANDAS_TA_SECONDS.time():
+            pass
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _report(label: str, unit: str, plain: list[float], measured: list[float]) -> None:
+    best_plain, best_measured = min(plain), min(measured)
+    print(
+        f"{label:<8} plain={best_plain:7.2f}µs  instrumented={best_measured:7.2f}µs  "
+        f"overhead={best_measured - best_plain:6.2f}µs/{unit}"
+    )
+
+
+def main(iterations: int, rounds: int) -> None:
+    http_plain, http_measured, sql_plain, sql_measured, timer = [], [], [], [], []
+    for _ in range(rounds):
+        http_plain.append(asyncio.run(_call(_app(), iterations)))
+        http_measured.append(asyncio.run(_call(PrometheusMiddleware(_app()), iterations)))
+        sql_plain.append(_queries(False, iterations))
+        sql_measured.append(_queries(True, iterations))
+        timer.append(_observe(iterations))
+
+    _report("HTTP", "req", http_plain, http_measured)
+    _report("SQL", "stmt", sql_plain, sql_measured)
+    print(f"{'timer':<8} {min(timer):7.2f}µs/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    main(args.iterations, args.rounds)
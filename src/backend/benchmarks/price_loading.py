@@ -0,0 +1,130 @@
+"""
+株価の読み出し・シリアライズ性能計測
+Numeric 列（Decimal）を行ごとに float() で変換する従来の経路と、float8 列を DataFrame / NumPy 配列に
+そのまま載せる経路のスループットを比較する。
+
+- 既定ではメモリ上に作った行（ドライバーが返す形のタプル）を使い、Python 側の変換コストを比べる
+- --ticker を指定すると設定された DB からその銘柄の株価を読み、ドライバーのデコードも含めて比べる
+
+使い方:
+    python -m benchmarks.price_loading --rows 1000000
+    python -m benchmarks.price_loading --ticker AAPL
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import orjson
+import pandas as pd
+from sqlalchemy import select
+
+from core.database import read_engine, read_session
+from core.serialization import dataframe_to_columnar_json
+from models.stock import Stock, StockPrice
+from services.price_loader import price_rows_to_frame
+
+COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def _decimal_frame(rows: list[tuple]) -> pd.DataFrame:
+    """従来の経路: Decimal を行ごとに float() で変換して DataFrame にする"""
+    data = [
+        {
+            "date": r[0],
+            "open": float(r[1]),
+            "high": float(r[2]),
+            "low": float(r[3]),
+            "close": float(r[4]),
+            "volume": float(r[5]),
+        }
+        for r in rows
+    ]
+    df = pd.DataFrame(data)
+    df.set_index("date", inplace=True)
+    return df
+
+
+def _decimal_json(rows: list[tuple]) -> bytes:
+    """従来の API と同じく Decimal を文字列にしてレコード配列の JSON にする"""
+    return orjson.dumps(
+        [
+            {"date": r[0], "open": r[1], "high": r[2], "low": r[3], "close": r[4], "volume": r[5]}
+            for r in rows
+        ],
+        default=str,
+    )
+
+
+def _synthetic_rows(count: int) -> tuple[list[tuple], list[tuple]]:
+    """同じ値の Decimal 版と float 版の行を作る（日付は 20 年分を繰り返す = 複数銘柄分に相当）"""
+    rng = np.random.default_rng(0)
+    closes = np.round(100 + rng.standard_normal(count).cumsum(), 4)
+    start = date(1990, 1, 1)
+    float_rows = [
+        (start + timedelta(days=i % 7300), c - 0.5, c + 1.0, c - 1.0, c, 1000 + i % 500)
+        for i, c in enumerate(closes.tolist())
+    ]
+    decimal_rows = [
+        (d, *(Decimal(f"{v:.4f}") for v in values), volume)
+        for d, *values, volume in float_rows
+    ]
+    return decimal_rows, float_rows
+
+
+async def _database_rows(ticker: str) -> tuple[list[tuple], list[tuple]]:
+    """DB から Numeric 列と float8 列をそれぞれ読み出す（読み出し時間も表示する）"""
+    async with read_session() as db:
+        stock_id = (await db.execute(select(Stock.id).where(Stock.ticker == ticker))).scalar_one()
+        result = []
+        for label, columns in (
+            ("numeric", [StockPrice.open, StockPrice.high, StockPrice.low, StockPrice.close]),
+            ("float8", [StockPrice.open_f, StockPrice.high_f, StockPrice.low_f, StockPrice.close_f]),
+        ):
+            stmt = (
+                select(StockPrice.price_date, *columns, StockPrice.volume)
+                .where(StockPrice.stock_id == stock_id)
+                .order_by(StockPrice.price_date)
+            )
+            start = time.perf_counter()
+            rows = [tuple(r) for r in (await db.execute(stmt)).all()]
+            _report(f"fetch {label}", len(rows), time.perf_counter() - start)
+            result.append(rows)
+    await read_engine.dispose()
+    return result[0], result[1]
+
+
+def _report(label: str, rows: int, seconds: float) -> None:
+    print(f"{label:<20} {seconds * 1000:9.1f}ms  {rows / seconds / 1e6:7.2f}M rows/s")
+
+
+def _timed(label: str, rows: int, func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    _report(label, rows, time.perf_counter() - start)
+    return value
+
+
+def main(rows: int, ticker: str | None) -> None:
+    if ticker:
+        decimal_rows, float_rows = asyncio.run(_database_rows(ticker))
+    else:
+        decimal_rows, float_rows = _synthetic_rows(rows)
+    count = len(float_rows)
+
+    _timed("load decimal", count, _decimal_frame, decimal_rows)
+    frame = _timed("load float", count, price_rows_to_frame, float_rows, COLUMNS)
+    _timed("json decimal", count, _decimal_json, decimal_rows)
+    _timed("json columnar", count, dataframe_to_columnar_json, frame, COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--ticker", default=None)
+    args = parser.parse_args()
+    main(args.rows, args.ticker)
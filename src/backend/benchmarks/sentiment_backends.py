@@ -0,0 +1,79 @@
+"""
+センチメント分析バックエンドの性能計測
+PyTorch（transformers）と ONNX Runtime（int8 量子化）のバッチ推論レイテンシと RSS を比較する。
+バックエンドごとに別プロセスで計測し、ピーク RSS が互いに影響しないようにする。
+
+使い方:
+    python -m benchmarks.sentiment_backends --batch-size 16 --iterations 20
+    python -m benchmarks.sentiment_backends --backend onnx --threads 2
+"""
+import argparse
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.sentiment_batching import SAMPLE_TEXTS
+
+
+def _rss_mb() -> float:
+    """プロセスのピーク RSS（MB）"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_single(backend_name: str, model: str, batch_size: int, iterations: int, threads: int) -> None:
+    from core.config import get_settings
+
+    settings = get_settings()
+    settings.sentiment_onnx_intra_op_threads = threads
+
+    from analyzers.sentiment import create_backend
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    backend = create_backend(backend_name, model)
+    load_seconds = time.perf_counter() - start
+
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(batch_size)]
+    encoded = backend.tokenize(texts)
+    backend.predict_proba(encoded["input_ids"], encoded["attention_mask"])  # ウォームアップ
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        backend.predict_proba(encoded["input_ids"], encoded["attention_mask"])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(
+        f"{backend_name:<13} load={load_seconds:6.1f}s  "
+        f"batch={batch_size}  median={statistics.median(latencies):8.1f}ms  "
+        f"max={max(latencies):8.1f}ms  "
+        f"rss_peak={_rss_mb():7.0f}MB (+{_rss_mb() - rss_before:.0f}MB)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=["transformers", "onnx"], default=None)
+    parser.add_argument("--model", default="ProsusAI/finbert")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_single(args.backend, args.model, args.batch_size, args.iterations, args.threads)
+    else:
+        for name in ("transformers", "onnx"):
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.sentiment_backends",
+                    "--backend", name,
+                    "--model", args.model,
+                    "--batch-size", str(args.batch_size),
+                    "--iterations", str(args.iterations),
+                    "--threads", str(args.threads),
+                ],
+                check=True,
+            )
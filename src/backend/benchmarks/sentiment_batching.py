@@ -0,0 +1,70 @@
+"""
+センチメント分析のバッチング性能計測
+単一テキスト推論（従来の analyze）と推論キュー（analyze_async）のスループット・レイテンシを比較する。
+
+使い方:
+    python -m benchmarks.sentiment_batching --requests 512 --concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from analyzers.sentiment import SentimentAnalyzer
+
+SAMPLE_TEXTS = [
+    "Quarterly earnings beat analyst expectations on strong demand.",
+    "The company cut its full-year guidance citing weak orders.",
+    "Shares were little changed ahead of the central bank decision.",
+    "Regulators opened an investigation into the accounting practices.",
+    "Record buyback program announced alongside a dividend increase.",
+]
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float]:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98]}
+
+
+async def _run(label: str, analyze, texts: list[str], concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(text: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await analyze(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(t) for t in texts))
+    elapsed = time.perf_counter() - start
+
+    p = _percentiles(latencies)
+    print(
+        f"{label:<10} {len(texts) / elapsed:8.1f} req/s  "
+        f"p50={p['p50']:7.1f}ms  p95={p['p95']:7.1f}ms  p99={p['p99']:7.1f}ms"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(requests)]
+
+    # モデルロードを計測から除外する
+    SentimentAnalyzer.analyze(SAMPLE_TEXTS[0])
+
+    async def single(text: str) -> dict:
+        # 従来の経路: リクエストごとに 1 件ずつ推論（スレッドプールで実行）
+        return await asyncio.to_thread(SentimentAnalyzer.analyze, text)
+
+    await _run("single", single, texts, concurrency)
+    await _run("batched", SentimentAnalyzer.analyze_async, texts, concurrency)
+    await SentimentAnalyzer.get_batcher().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,217 @@
+"""
+外部 API レスポンスキャッシュ
+コレクター共通のディスクキャッシュ。URL + パラメータをキーに、パース済みの結果を保存する。
+
+- ソースごとに TTL を設定し、TTL 内はネットワークにアクセスしない
+- TTL 切れ後は ETag / Last-Modified による条件付きリクエストで再検証する（304 なら再パース不要）
+- 同一キーへの同時リクエストは 1 回の取得にまとめる
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from core.config import get_settings
+from core.metrics import observe_external, record_cache
+from core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """キャッシュエントリ（パース済みの値 + 再検証用ヘッダー）"""
+
+    value: Any
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class ResponseCache:
+    """ディスクベースのレスポンスキャッシュ"""
+
+    def __init__(self, cache_dir: str | Path, ttls: dict[str, float]):
+        self.cache_dir = Path(cache_dir)
+        self.ttls = ttls
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def make_key(source: str, url: str, params: dict | None = None) -> str:
+        """URL + パラメータからキャッシュキーを作成する（API キー等が平文で残らないようハッシュ化）"""
+        raw = json.dumps([url, sorted((params or {}).items())], default=str)
+        return f"{source}-{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> CacheEntry | None:
+        """キャッシュエントリを読み込む（存在しない・壊れている場合は None）"""
+        try:
+            with self._path(key).open(encoding="utf-8") as f:
+                return CacheEntry(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("キャッシュ読み込み失敗: key=%s, %s", key, e)
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """キャッシュエントリを書き込む（一時ファイル経由でアトミックに置き換え）"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(asdict(entry), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("キャッシュ書き込み失敗: key=%s, %s", key, e)
+
+    async def fetch(
+        self,
+        client: httpx.AsyncClient,
+        source: str,
+        url: str,
+        parse: Callable[[httpx.Response], Any],
+        params: dict | None = None,
+    ) -> Any:
+        """
+        キャッシュを経由して GET し、パース済みの結果を返す。
+
+        Args:
+            client: HTTP クライアント
+            source: データソース名（TTL の選択に使用。例: "news", "macro"）
+            url: リクエスト URL
+            parse: レスポンスをキャッシュ可能な値（JSON シリアライズ可能）に変換する関数
+            params: クエリパラメータ
+
+        Returns:
+            Any: parse の戻り値（キャッシュヒット時はキャッシュ済みの値）
+        """
+        key = self.make_key(source, url, params)
+
+        entry = self.get(key)
+        if entry and time.time() - entry.fetched_at < self.ttls.get(source, 0):
+            logger.debug("キャッシュヒット: source=%s, key=%s", source, key)
+            record_cache(f"http_{source}", hit=True)
+            return entry.value
+        record_cache(f"http_{source}", hit=False)
+
+        # 同一キーの取得が進行中であれば結果を共有する
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._revalidate(client, source, key, url, parse, params, entry)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # 待機者がいない場合の "exception was never retrieved" を抑制
+            future.exception()
+            raise
+        finally:
+            # キャンセル（BaseException）で抜けた場合も待機者を起こす
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    async def _revalidate(
+        self,
+        client: httpx.AsyncClient,
+        source: str,
+        key: str,
+        url: str,
+        parse: Callable[[httpx.Response], Any],
+        params: dict | None,
+        entry: CacheEntry | None,
+    ) -> Any:
+        """上流に（条件付きで）問い合わせてキャッシュを更新する"""
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            with observe_external(source), span("http.get", source=source, url=url) as current:
+                response = await client.get(url, params=params, headers=headers)
+                if current is not None:
+                    current.set_attribute("http.status_code", response.status_code)
+            if response.status_code == 304 and entry:
+                logger.debug("キャッシュ再検証 (304): source=%s, key=%s", source, key)
+                entry.fetched_at = time.time()
+                self.set(key, entry)
+                return entry.value
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            # レート制限・一時的な障害時は期限切れのキャッシュで応答する
+            if entry:
+                logger.warning("上流エラーのため期限切れキャッシュを使用: source=%s, %s", source, e)
+                return entry.value
+            raise
+
+        value = parse(response)
+        self.set(
+            key,
+            CacheEntry(
+                value=value,
+                fetched_at=time.time(),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            ),
+        )
+        return value
+
+
+_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache | None:
+    """コレクター共通のキャッシュインスタンスを返す（無効化されている場合は None）"""
+    global _cache
+    settings = get_settings()
+    if not settings.http_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = ResponseCache(
+            settings.http_cache_dir,
+            ttls={
+                "news": settings.news_cache_ttl_seconds,
+                "macro": settings.macro_cache_ttl_seconds,
+            },
+        )
+    return _cache
+
+
+async def cached_get(
+    client: httpx.AsyncClient,
+    source: str,
+    url: str,
+    parse: Callable[[httpx.Response], Any],
+    params: dict | None = None,
+) -> Any:
+    """キャッシュが有効ならキャッシュ経由で、無効なら直接 GET してパース結果を返す"""
+    cache = get_response_cache()
+    if cache is not None:
+        return await cache.fetch(client, source, url, parse, params=params)
+
+    with observe_external(source), span("http.get", source=source, url=url) as current:
+        response = await client.get(url, params=params)
+        if current is not None:
+            current.set_attribute("http.status_code", response.status_code)
+    response.raise_for_status()
+    return parse(response)
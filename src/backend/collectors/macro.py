@@ -1,15 +1,19 @@
 """
 マクロ経済指標取得モジュール
 FRED API からマクロ経済指標を取得して DB に保存する。
+API レスポンスは collectors.http_cache でキャッシュする。
 """
 import logging
 from datetime import date, datetime
 from decimal import Decimal
 
 import httpx
+import pandas as pd
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from collectors.http_cache import cached_get
+from core.data_version import bump_data_version, macro_scope
 from models.macro import MacroIndicator
 
 logger = logging.getLogger(__name__)
@@ -18,13 +22,15 @@ logger = logging.getLogger(__name__)
 FRED_API_URL = "https://api.stlouisfed.org/fred/series/observations"
 
 # 主要な経済指標のシリーズ ID
+# publication_lag_days: 観測日（FRED の日付。月次・四半期は期間の初日）から公表されるまでのおおよその日数。
+# 予測の特徴量では公表前の値を使わないよう、観測日にこの日数を足した日から値を使う（analyzers.macro_panel）
 MACRO_INDICATORS = {
-    "cpi": {"series_id": "CPIAUCSL", "name": "消費者物価指数（CPI）"},
-    "fed_rate": {"series_id": "FEDFUNDS", "name": "フェデラルファンド金利"},
-    "gdp": {"series_id": "GDP", "name": "GDP（名目）"},
-    "unemployment": {"series_id": "UNRATE", "name": "失業率"},
-    "sp500": {"series_id": "SP500", "name": "S&P 500"},
-    "usdjpy": {"series_id": "DEXJPUS", "name": "USD/JPY 為替レート"},
+    "cpi": {"series_id": "CPIAUCSL", "name": "消費者物価指数（CPI）", "publication_lag_days": 45},
+    "fed_rate": {"series_id": "FEDFUNDS", "name": "フェデラルファンド金利", "publication_lag_days": 32},
+    "gdp": {"series_id": "GDP", "name": "GDP（名目）", "publication_lag_days": 120},
+    "unemployment": {"series_id": "UNRATE", "name": "失業率", "publication_lag_days": 35},
+    "sp500": {"series_id": "SP500", "name": "S&P 500", "publication_lag_days": 1},
+    "usdjpy": {"series_id": "DEXJPUS", "name": "USD/JPY 為替レート", "publication_lag_days": 7},
 }
 
 
@@ -65,11 +71,13 @@ async def fetch_and_save_macro_indicator(
     }
 
     async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(FRED_API_URL, params=params)
-        response.raise_for_status()
-
-    data = response.json()
-    observations = data.get("observations", [])
+        observations = await cached_get(
+            client,
+            "macro",
+            FRED_API_URL,
+            lambda response: response.json().get("observations", []),
+            params=params,
+        )
 
     # 既存データの日付を取得（重複防止）
     existing_result = await db.execute(
@@ -100,6 +108,7 @@ async def fetch_and_save_macro_indicator(
 
     if saved_count > 0:
         await db.flush()
+        await bump_data_version(db, macro_scope(indicator_key))
 
     logger.info("マクロ指標保存完了: %s, 新規=%d件", name, saved_count)
     return saved_count
@@ -125,6 +134,44 @@ async def get_saved_macro_data(
     return list(result.scalars().all())
 
 
+async def load_macro_observations(
+    db: AsyncSession,
+    indicator_keys: list[str],
+    start: date | None = None,
+) -> pd.DataFrame:
+    """
+    複数の指標の保存済みデータを 1 クエリで読み出す。
+
+    Args:
+        db: データベースセッション
+        indicator_keys: 指標キーのリスト
+        start: 開始日（含む、観測日で判定）
+
+    Returns:
+        pd.DataFrame: key / date / value（float64、欠損は NaN）の列を持つ観測日昇順の DataFrame
+    """
+    unknown = [key for key in indicator_keys if key not in MACRO_INDICATORS]
+    if unknown:
+        available = ", ".join(MACRO_INDICATORS.keys())
+        raise ValueError(f"不明な指標: '{', '.join(unknown)}'。利用可能: {available}")
+
+    keys_by_series = {MACRO_INDICATORS[key]["series_id"]: key for key in indicator_keys}
+    stmt = (
+        select(MacroIndicator.series_id, MacroIndicator.indicator_date, MacroIndicator.value)
+        .where(MacroIndicator.series_id.in_(keys_by_series))
+        .order_by(MacroIndicator.indicator_date)
+    )
+    if start is not None:
+        stmt = stmt.where(MacroIndicator.indicator_date >= start)
+    result = await db.execute(stmt)
+    df = pd.DataFrame.from_records(
+        result.all(), columns=["key", "date", "value"], coerce_float=True
+    )
+    df["key"] = df["key"].map(keys_by_series)
+    df["value"] = df["value"].astype("float64")
+    return df
+
+
 async def list_available_indicators() -> list[dict]:
     """利用可能なマクロ経済指標の一覧を返す"""
     return [
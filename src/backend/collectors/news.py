@@ -1,6 +1,7 @@
 """
 ニュース取得モジュール
 RSS フィードからニュースを逐次取得する（DB 保存なし）。
+パース済みの記事リストは collectors.http_cache でキャッシュする。
 """
 import logging
 from datetime import datetime
@@ -8,6 +9,8 @@ from datetime import datetime
 import feedparser
 import httpx
 
+from collectors.http_cache import cached_get
+
 logger = logging.getLogger(__name__)
 
 # Google News RSS（日本語版）
@@ -29,14 +32,22 @@ async def fetch_news(query: str, max_items: int = 10) -> list[dict]:
 
     url = GOOGLE_NEWS_RSS_URL.format(query=query)
 
+    # フィード全体をパースしてキャッシュし、件数の違うリクエストでも共有する
     async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
+        all_articles = await cached_get(client, "news", url, _parse_feed)
+
+    articles = all_articles[:max_items]
+
+    logger.info("ニュース取得完了: query=%s, %d件", query, len(articles))
+    return articles
+
 
+def _parse_feed(response: httpx.Response) -> list[dict]:
+    """RSS レスポンスを記事リストに変換する"""
     feed = feedparser.parse(response.text)
 
     articles = []
-    for entry in feed.entries[:max_items]:
+    for entry in feed.entries:
         published = None
         if hasattr(entry, "published_parsed") and entry.published_parsed:
             published = datetime(*entry.published_parsed[:6]).isoformat()
@@ -48,6 +59,4 @@ async def fetch_news(query: str, max_items: int = 10) -> list[dict]:
             "published_at": published,
             "summary": entry.get("summary", ""),
         })
-
-    logger.info("ニュース取得完了: query=%s, %d件", query, len(articles))
     return articles
@@ -3,24 +3,50 @@
 Yahoo Finance (yfinance) から株価データを取得して DB に保存する。
 """
 import logging
+from dataclasses import dataclass, field
 from datetime import date
 
-import yfinance as yf
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from analyzers.technical import invalidate_indicator_cache
+from core.data_version import bump_data_version, prices_scope
+from core.lazy import lazy_import
+from core.metrics import observe_external
+from core.tracing import span
 from models.stock import Stock, StockPrice
+from services.price_cache import append_price_bars
+from services.realtime import publish_price_update
+from services.rollup import apply_bars_to_rollups
+
+# yfinance はインポートが重いため初回取得時にロードする
+yf = lazy_import("yfinance")
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SavedPrices:
+    """取り込み結果（コミット後の後処理に渡す）"""
+
+    ticker: str
+    bars: list[dict] = field(default_factory=list)
+    version: int | None = None
+
+    @property
+    def count(self) -> int:
+        return len(self.bars)
+
+
 async def fetch_and_save_stock_prices(
     db: AsyncSession,
     ticker: str,
     period: str = "1y",
-) -> int:
+) -> SavedPrices:
     """
-    Yahoo Finance から株価データを取得して DB に保存する。
+    Yahoo Finance から株価データを取得して DB に保存する（コミットは呼び出し側）。
+
+    キャッシュの更新と購読者への配信は、コミット後に after_prices_committed で行う。
 
     Args:
         db: データベースセッション
@@ -28,32 +54,33 @@ async def fetch_and_save_stock_prices(
         period: 取得期間（"1mo", "3mo", "6mo", "1y", "2y", "5y", "max"）
 
     Returns:
-        int: 新規保存した件数
+        SavedPrices: 新規保存した足と、更新後のデータバージョン
     """
     # 銘柄の存在確認
-    result = await db.execute(select(Stock).where(Stock.ticker == ticker))
-    stock = result.scalar_one_or_none()
-    if not stock:
+    result = await db.execute(select(Stock.id).where(Stock.ticker == ticker))
+    stock_id = result.scalar_one_or_none()
+    if stock_id is None:
         raise ValueError(f"銘柄 '{ticker}' が登録されていません。先に銘柄を登録してください")
 
     logger.info("株価データ取得開始: ticker=%s, period=%s", ticker, period)
 
     # yfinance でデータ取得（同期処理）
     yf_ticker = yf.Ticker(ticker)
-    df = yf_ticker.history(period=period)
+    with observe_external("yfinance"), span("yfinance.history", ticker=ticker, period=period):
+        df = yf_ticker.history(period=period)
 
     if df.empty:
         logger.warning("株価データが取得できませんでした: ticker=%s", ticker)
-        return 0
+        return SavedPrices(ticker)
 
     # 既存データの日付を取得（重複防止）
     existing_result = await db.execute(
-        select(StockPrice.price_date).where(StockPrice.stock_id == stock.id)
+        select(StockPrice.price_date).where(StockPrice.stock_id == stock_id)
     )
     existing_dates: set[date] = {row[0] for row in existing_result.all()}
 
     # 新規データのみ保存
-    saved_count = 0
+    new_bars: list[dict] = []
     for idx, row in df.iterrows():
         price_date = idx.date()  # type: ignore[union-attr]
 
@@ -61,7 +88,7 @@ async def fetch_and_save_stock_prices(
             continue
 
         price = StockPrice(
-            stock_id=stock.id,
+            stock_id=stock_id,
             price_date=price_date,
             open=round(float(row["Open"]), 4),
             high=round(float(row["High"]), 4),
@@ -70,10 +97,59 @@ async def fetch_and_save_stock_prices(
             volume=int(row["Volume"]),
         )
         db.add(price)
-        saved_count += 1
+        new_bars.append(
+            {
+                "date": price_date,
+                "open": float(price.open),
+                "high": float(price.high),
+                "low": float(price.low),
+                "close": float(price.close),
+                "volume": price.volume,
+            }
+        )
 
+    saved = SavedPrices(ticker, new_bars)
+    saved_count = saved.count
     if saved_count > 0:
+        await _ensure_partitions(db, {bar["date"].year for bar in new_bars})
         await db.flush()
+        await db.execute(
+            update(Stock)
+            .where(Stock.id == stock_id)
+            .values(price_count=Stock.price_count + saved_count)
+        )
+        # 新しい日足が属する週・月のロールアップ行だけを更新
+        await apply_bars_to_rollups(db, stock_id, new_bars)
+        saved.version = await bump_data_version(db, prices_scope(ticker))
 
     logger.info("株価データ保存完了: ticker=%s, 新規=%d件", ticker, saved_count)
-    return saved_count
+    return saved
+
+
+async def _ensure_partitions(db: AsyncSession, years: set[int]) -> None:
+    """
+    足の年のパーティションを作っておく（PostgreSQL のみ）。
+
+    マイグレーション時点で作るのは数年先までのため、それ以降の年の足が DEFAULT パーティションに
+    溜まらないよう、挿入前に stock_prices_ensure_partition を呼ぶ（作成済みなら何もしない。
+    未作成の年は年ごとのアドバイザリロックを取ってから作るため、並行した取り込みでも重複しない）。
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for year in sorted(years):
+        await db.execute(select(func.stock_prices_ensure_partition(year)))
+
+
+async def after_prices_committed(db: AsyncSession, saved: SavedPrices) -> None:
+    """
+    取り込みのコミット後の後処理（株価カラムキャッシュへの追記・指標キャッシュの破棄・購読者への配信）。
+
+    コミット前に行うと、ロールバックされた足をキャッシュに残したり配信したりする。
+    """
+    if not saved.bars:
+        return
+    # 分析用の列ファイルは末尾に追記するだけで最新になる
+    await append_price_bars(saved.ticker, saved.bars, saved.version)
+    invalidate_indicator_cache(saved.ticker)
+    # 購読中のクライアントへ新しい足と最新の指標を配信
+    await publish_price_update(db, saved.ticker, saved.bars)
@@ -0,0 +1,46 @@
+"""
+データバージョン管理
+コレクターがデータを保存するたびにスコープのバージョンを加算し、読み取り API は
+そのバージョンをレスポンスキャッシュと ETag のキーに使う（TTL ではなく取り込みで無効化される）。
+"""
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.data_version import DataVersion
+
+
+def prices_scope(ticker: str) -> str:
+    """銘柄の株価（とそこから計算する指標）のスコープ"""
+    return f"prices:{ticker}"
+
+
+def macro_scope(indicator_key: str) -> str:
+    """マクロ指標系列のスコープ"""
+    return f"macro:{indicator_key}"
+
+
+async def get_data_version(db: AsyncSession, scope: str) -> int:
+    """スコープの現在のバージョン（一度も取り込んでいなければ 0）"""
+    result = await db.execute(select(DataVersion.version).where(DataVersion.scope == scope))
+    return result.scalar_one_or_none() or 0
+
+
+async def get_data_versions(db: AsyncSession, scopes: list[str]) -> dict[str, int]:
+    """複数スコープの現在のバージョンを 1 クエリで取得する（取り込みがなければ 0）"""
+    result = await db.execute(
+        select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(scopes))
+    )
+    versions = dict(result.all())
+    return {scope: versions.get(scope, 0) for scope in scopes}
+
+
+async def bump_data_version(db: AsyncSession, scope: str) -> int:
+    """スコープのバージョンを 1 加算し、加算後のバージョンを返す（行がなければ作成）"""
+    dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+    stmt = dialect.insert(DataVersion).values(scope=scope, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.scope],
+        set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+    ).returning(DataVersion.version)
+    return (await db.execute(stmt)).scalar_one()
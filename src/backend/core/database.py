@@ -1,26 +1,55 @@
 """
 データベース接続管理
 SQLAlchemy エンジンとセッションファクトリを提供する。
+
+DATABASE_READ_URL を設定すると、読み取り専用のエンドポイント（get_read_db）はレプリカに接続する。
 """
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from core.config import get_settings
+from core.metrics import InstrumentedQueuePool, instrument_engine
 
 settings = get_settings()
 
-# asyncpg 用に postgresql:// → postgresql+asyncpg:// に変換
-_database_url = settings.database_url.replace(
-    "postgresql://", "postgresql+asyncpg://"
-)
 
-engine = create_async_engine(
-    _database_url,
-    echo=settings.debug,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
+def _create_engine(url: str) -> AsyncEngine:
+    """プール設定・asyncpg の接続設定を適用したエンジンを作成する"""
+    # asyncpg 用に postgresql:// → postgresql+asyncpg:// に変換
+    url = url.replace("postgresql://", "postgresql+asyncpg://")
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg://"):
+        connect_args = {
+            # asyncpg 自身のキャッシュと SQLAlchemy 側のキャッシュの両方に同じ件数を使う
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "command_timeout": settings.db_command_timeout,
+        }
+    created = create_async_engine(
+        url,
+        echo=settings.debug,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
+        connect_args=connect_args,
+    )
+    instrument_engine(created.sync_engine)
+    return created
+
+
+engine = _create_engine(settings.database_url)
+# レプリカ未設定なら書き込み用と同じエンジン（接続プールも共有）を使う
+read_engine = (
+    _create_engine(settings.database_read_url) if settings.database_read_url else engine
 )
 
 async_session = async_sessionmaker(
@@ -28,6 +57,26 @@ async_session = async_sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False,
 )
+read_session = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    FastAPI 依存性注入用のセッションファクトリを提供する。
+
+    レスポンスのストリーミング中に DB を読み続けるエンドポイント用（get_db のセッションは
+    レスポンス送信前に閉じられるため、ストリーム内で自前のセッションを開く）。
+    """
+    return async_session
+
+
+def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    """get_session_factory の読み取り専用版（レプリカに接続する）"""
+    return read_session
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -39,3 +88,14 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI 依存性注入用の読み取り専用 DB セッションを提供する。
+
+    レプリカに接続し、COMMIT の往復を省く（トランザクションはセッションを閉じるときにロールバックされる）。
+    書き込みを行うエンドポイントでは使わないこと。
+    """
+    async with read_session() as session:
+        yield session
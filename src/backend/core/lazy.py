@@ -0,0 +1,57 @@
+"""
+遅延インポート
+起動時間とメモリを抑えるため、重いライブラリ（transformers, pandas-ta, lightgbm, scikit-learn,
+yfinance 等）は属性への初回アクセス時にインポートする。
+"""
+import importlib
+import importlib.util
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """属性への初回アクセス時に実体をインポートするモジュールプロキシ"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    try:
+                        module = importlib.import_module(self.__name__)
+                    except ImportError as e:
+                        raise ImportError(
+                            f"{self.__name__} ライブラリがインストールされていません"
+                        ) from e
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    @property
+    def is_loaded(self) -> bool:
+        """実体がインポート済みかどうか"""
+        return self.__dict__["_lazy_module"] is not None
+
+
+def lazy_import(name: str) -> LazyModule:
+    """モジュールを遅延インポートするプロキシを返す"""
+    return LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """モジュールがインストールされているか（インポートせずに）確認する"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,169 @@
+"""
+Prometheus メトリクス
+/metrics で公開する。ホットパスの計測コストを抑えるため、
+
+- ラベル付きの子メトリクスは可能な限りモジュール読み込み時に解決しておく（.labels() の辞書引きを省く）
+- リクエスト計測は BaseHTTPMiddleware ではなく素の ASGI ミドルウェアで行う
+- ルートはパスではなくテンプレート（/api/v1/stocks/{ticker}）でラベル付けし、系列数を有界にする
+
+オーバーヘッドは `python -m benchmarks.metrics_overhead` で確認できる。
+"""
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+__all__ = ["CONTENT_TYPE_LATEST", "generate_latest"]
+
+# 秒単位のバケット（1ms〜10s）
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# --- HTTP ---
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP リクエストの処理時間（ルートテンプレート別）",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+# --- DB ---
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL 文の実行時間（件数は _count）",
+    ["operation"],
+    buckets=_LATENCY_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "接続プールから接続を取得するまでの待ち時間",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+_DB_OPERATIONS = {
+    op: DB_QUERY_DURATION.labels(operation=op.lower())
+    for op in ("SELECT", "INSERT", "UPDATE", "DELETE")
+}
+_DB_OTHER = DB_QUERY_DURATION.labels(operation="other")
+
+# --- モデル・計算 ---
+MODEL_DURATION = Histogram(
+    "model_duration_seconds",
+    "指標計算・学習・推論の実行時間",
+    ["model", "operation"],
+    buckets=_LATENCY_BUCKETS,
+)
+PANDAS_TA_SECONDS = MODEL_DURATION.labels(model="pandas_ta", operation="indicators")
+LIGHTGBM_TRAIN_SECONDS = MODEL_DURATION.labels(model="lightgbm", operation="train")
+LIGHTGBM_PREDICT_SECONDS = MODEL_DURATION.labels(model="lightgbm", operation="predict")
+FINBERT_SECONDS = MODEL_DURATION.labels(model="finbert", operation="predict")
+
+# --- 外部 API ---
+EXTERNAL_API_DURATION = Histogram(
+    "external_api_duration_seconds",
+    "外部 API 呼び出しの所要時間",
+    ["source", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+# --- キャッシュ ---
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "キャッシュの参照回数",
+    ["cache", "result"],
+)
+
+
+@contextmanager
+def observe_external(source: str) -> Iterator[None]:
+    """外部 API 呼び出しの所要時間を成功 / 失敗別に記録する"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_API_DURATION.labels(source=source, outcome=outcome).observe(
+            time.perf_counter() - start
+        )
+
+
+def record_cache(cache: str, hit: bool, count: int = 1) -> None:
+    """キャッシュのヒット / ミスを記録する"""
+    if count:
+        CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc(count)
+
+
+# =============================================================================
+# DB
+# =============================================================================
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """接続の取得待ち時間を記録する接続プール"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # 実行ごとに作られる ExecutionContext に開始時刻を持たせる（conn.info の辞書操作より軽い）
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    histogram = _DB_OPERATIONS.get(statement.lstrip()[:6].upper(), _DB_OTHER)
+    histogram.observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """SQL 文の実行時間を計測するイベントを登録する（非同期エンジンは sync_engine を渡す）"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+
+class PrometheusMiddleware:
+    """リクエストの処理時間をルートテンプレート別に記録する ASGI ミドルウェア"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # ルーティング後は scope["route"] にマッチしたルートが入る（未マッチは 1 系列にまとめる）
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,66 @@
+"""
+ページネーション共通処理
+キーセットページネーション用の不透明カーソル（base64url エンコードした JSON）を扱う。
+"""
+import base64
+import json
+from collections.abc import Callable
+from typing import Any
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    """カーソル値を不透明な文字列にエンコードする"""
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """
+    カーソル文字列をデコードする。
+
+    Raises:
+        ValueError: 不正なカーソルの場合
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("不正なカーソルです") from e
+    if not isinstance(values, dict):
+        raise ValueError("不正なカーソルです")
+    return values
+
+
+def keyset_page(
+    rows: list[Any],
+    limit: int,
+    backward: bool,
+    cursor_of: Callable[[Any, str], str],
+    has_cursor: bool,
+) -> tuple[list[Any], str | None, str | None]:
+    """
+    limit + 1 件取得したキーセットクエリの結果から、1 ページ分と前後のカーソルを組み立てる。
+
+    後方（prev）ページは逆順で取得している前提で、表示順に並べ直して返す。
+
+    Args:
+        rows: limit + 1 件まで取得した行（取得方向の順）
+        limit: ページサイズ
+        backward: prev カーソルで前のページを取得したか
+        cursor_of: (行, "next" | "prev") からカーソルを作る関数
+        has_cursor: カーソル指定で取得したか（先頭ページでないか）
+
+    Returns:
+        tuple: (ページの行, next_cursor, prev_cursor)
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+        has_next, has_prev = has_cursor, has_more
+    else:
+        has_next, has_prev = has_more, has_cursor
+
+    next_cursor = cursor_of(rows[-1], "next") if rows and has_next else None
+    prev_cursor = cursor_of(rows[0], "prev") if rows and has_prev else None
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,181 @@
+"""
+リクエスト単位のプロファイリング（pyinstrument）
+本番の負荷下でしか再現しない遅さを調べるため、/api/v1 配下のリクエストをサンプリングプロファイラで計測する。
+
+- 手動: PROFILING_TOKEN を設定し、X-Profile: html|speedscope と X-Profile-Token ヘッダー
+  （またはクエリ ?profile=html&profile_token=...）を付けると、レスポンスの代わりにフレームグラフを返す
+- 自動: PROFILING_AUTO_SAMPLE_RATIO の割合でリクエストを計測し、PROFILING_SLOW_THRESHOLD_MS を
+  超えたものだけ PROFILING_DIR に保存する（同時に計測するのは 1 リクエストまで）
+
+ストリーミングのレスポンス（SSE 等）はレスポンスが終わるまで計測が続くため、手動での計測には向かない。
+"""
+import logging
+import random
+import re
+import secrets
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import orjson
+
+from core.config import get_settings
+from core.lazy import is_available, lazy_import
+
+# pyinstrument は計測する場合にのみロードする
+pyinstrument = lazy_import("pyinstrument")
+renderers = lazy_import("pyinstrument.renderers")
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+
+# 形式 → (メディアタイプ, 拡張子)
+FORMATS = {
+    "html": ("text/html; charset=utf-8", "html"),
+    "speedscope": ("application/json", "speedscope.json"),
+}
+
+
+def render(profiler, fmt: str) -> str:
+    """計測結果を HTML のフレームグラフ / speedscope の JSON にする"""
+    if fmt == "speedscope":
+        return profiler.output(renderer=renderers.SpeedscopeRenderer())
+    return profiler.output_html()
+
+
+def save_profile(directory: str | Path, name: str, fmt: str, content: str) -> Path:
+    """計測結果をファイルに保存する"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.{FORMATS[fmt][1]}"
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def _requested_format(scope) -> str | None:
+    """手動計測の指定（トークンが一致した場合のみ）から形式を返す"""
+    settings = get_settings()
+    if not settings.profiling_token:
+        return None
+    headers = dict(scope["headers"])
+    fmt = headers.get(b"x-profile", b"").decode("latin-1")
+    token = headers.get(b"x-profile-token", b"").decode("latin-1")
+    if not fmt and scope.get("query_string"):
+        query = parse_qs(scope["query_string"].decode("latin-1"))
+        fmt = query.get("profile", [""])[0]
+        token = token or query.get("profile_token", [""])[0]
+    if fmt not in FORMATS:
+        return None
+    # 一致しないトークンは指定がなかったものとして扱う（機能の有無を外部に明かさない）
+    if not secrets.compare_digest(token.encode(), settings.profiling_token.encode()):
+        return None
+    return fmt
+
+
+class ProfilingMiddleware:
+    """指定された / サンプリングされたリクエストを pyinstrument で計測する ASGI ミドルウェア"""
+
+    def __init__(self, app):
+        self.app = app
+        self._auto_running = False
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        fmt = _requested_format(scope)
+        if fmt is not None:
+            await self._profile_and_respond(scope, receive, send, fmt)
+            return
+
+        settings = get_settings()
+        if (
+            settings.profiling_auto_sample_ratio > 0
+            and not self._auto_running
+            and random.random() < settings.profiling_auto_sample_ratio
+            and is_available("pyinstrument")
+        ):
+            await self._profile_if_slow(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def _profiler(self):
+        return pyinstrument.Profiler(interval=get_settings().profiling_interval_ms / 1000)
+
+    async def _profile_and_respond(self, scope, receive, send, fmt: str) -> None:
+        """リクエストを計測し、元のレスポンスの代わりに計測結果を返す"""
+        if not is_available("pyinstrument"):
+            body = orjson.dumps({"detail": "pyinstrument ライブラリがインストールされていません"})
+            await _send_body(send, 503, "application/json", body)
+            return
+
+        status_code = 500
+
+        async def discard(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        profiler = self._profiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+        logger.info("プロファイル取得: %s %s (status=%d)", scope["method"], scope["path"], status_code)
+        body = render(profiler, fmt).encode()
+        await _send_body(
+            send, 200, FORMATS[fmt][0], body, [(b"x-profiled-status", str(status_code).encode())]
+        )
+
+    async def _profile_if_slow(self, scope, receive, send) -> None:
+        """リクエストを計測し、しきい値より遅かった場合だけ保存する"""
+        settings = get_settings()
+        self._auto_running = True
+        profiler = self._profiler()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            self._auto_running = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms < settings.profiling_slow_threshold_ms:
+            return
+
+        route = getattr(scope.get("route"), "path", scope["path"])
+        name = "{}_{}_{}_{}ms".format(
+            datetime.now().strftime("%Y%m%d-%H%M%S"),
+            scope["method"],
+            re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-"),
+            int(elapsed_ms),
+        )
+        fmt = settings.profiling_auto_format
+        try:
+            path = save_profile(settings.profiling_dir, name, fmt, render(profiler, fmt))
+        except OSError as e:
+            logger.warning("プロファイルの保存失敗: %s", e)
+            return
+        logger.info("遅いリクエストのプロファイルを保存: %.0fms, %s", elapsed_ms, path)
+
+
+async def _send_body(
+    send, status_code: int, media_type: str, body: bytes, headers: list | None = None
+) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", media_type.encode()),
+                (b"content-length", str(len(body)).encode()),
+                *(headers or []),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,173 @@
+"""
+読み取り API のレスポンスキャッシュ
+株価・指標・マクロ指標の GET レスポンスは、コレクターがデータを取り込んだときにしか変わらない。
+データバージョン（core.data_version）とリクエスト（パス + クエリ）から強い ETag を作り、
+
+- If-None-Match が一致すれば本体を作らずに 304 を返す
+- 一致しなければシリアライズ済みの本体をストア（プロセス内 LRU / Redis）から返す
+- ストアになければ本体を作ってストアに保存する
+
+ETag にバージョンが含まれるため、取り込み後の古いエントリは参照されなくなり LRU / TTL で消える。
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.data_version import get_data_version, get_data_versions
+from core.lazy import lazy_import
+from core.metrics import record_cache
+
+redis_asyncio = lazy_import("redis.asyncio")
+
+logger = logging.getLogger(__name__)
+
+# クライアントには保存を許可しつつ、毎回 ETag で再検証させる
+CACHE_CONTROL = "no-cache"
+
+
+class MemoryResponseStore:
+    """プロセス内 LRU ストア"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    async def set(self, key: str, body: bytes) -> None:
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisResponseStore:
+    """Redis ストア（複数ワーカー / 複数タスクでキャッシュを共有する）"""
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "response:"):
+        self._client = redis_asyncio.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, body: bytes) -> None:
+        await self._client.set(self.prefix + key, body, ex=self.ttl_seconds)
+
+
+_store: MemoryResponseStore | RedisResponseStore | None = None
+
+
+def get_response_store() -> MemoryResponseStore | RedisResponseStore | None:
+    """設定に応じたストアを返す（無効化されている場合は None）"""
+    global _store
+    settings = get_settings()
+    if not settings.response_cache_enabled:
+        return None
+    if _store is None:
+        if settings.response_cache_backend == "redis":
+            _store = RedisResponseStore(
+                settings.response_cache_redis_url, settings.response_cache_ttl_seconds
+            )
+        else:
+            _store = MemoryResponseStore(settings.response_cache_max_entries)
+    return _store
+
+
+def make_etag(request: Request, scope: str, version: int) -> str:
+    """スコープ・バージョン・パス・クエリ（とアプリのバージョン）から強い ETag を作る"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    raw = f"{get_settings().app_version}|{scope}|{version}|{request.url.path}|{query}"
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+async def cached_response(
+    request: Request,
+    db: AsyncSession,
+    scope: str | list[str],
+    response_model: Any,
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """
+    データバージョンをキーにレスポンスをキャッシュする。
+
+    Args:
+        request: リクエスト（パスとクエリをキーに含める）
+        db: データベースセッション（バージョンの取得に使う）
+        scope: データバージョンのスコープ（複数のデータを組み合わせる場合はリスト。いずれかの
+            取り込みでキャッシュが無効になる）
+        response_model: レスポンスの型（エンドポイントの response_model と同じもの）
+        build: キャッシュにない場合にレスポンス内容を作る関数（HTTPException はそのまま伝播）。
+            シリアライズ済みの JSON（bytes）を返した場合は検証せずにそのまま使う。
+            build 内でプロセス内キャッシュを使う場合は、そのキーにもデータバージョンを含めること
+            （別プロセスの取り込み後に古い内容が新しい ETag で保存されるため）
+
+    Returns:
+        Response: JSON 本体または 304
+    """
+    adapter = TypeAdapter(response_model)
+
+    def serialize(content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        # FastAPI の response_model と同じく検証してからエイリアスで出力する
+        return adapter.dump_json(
+            adapter.validate_python(content, from_attributes=True), by_alias=True
+        )
+
+    store = get_response_store()
+    if store is None:
+        return Response(serialize(await build()), media_type="application/json")
+
+    try:
+        if isinstance(scope, str):
+            version = await get_data_version(db, scope)
+        else:
+            # バージョンは加算しかしないため、合計はいずれかのスコープが進めば必ず変わる
+            version = sum((await get_data_versions(db, scope)).values())
+            scope = "+".join(sorted(scope))
+    except Exception as e:
+        # バージョンが取れなければキャッシュせずに返す（DB 障害時は本体の取得でも失敗する）
+        logger.warning("データバージョンの取得失敗（キャッシュなしで応答）: %s", e)
+        await db.rollback()
+        return Response(serialize(await build()), media_type="application/json")
+
+    etag = make_etag(request, scope, version)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        body = await store.get(etag)
+    except Exception as e:
+        logger.warning("レスポンスキャッシュの取得失敗: %s", e)
+        body = None
+
+    record_cache("response", hit=body is not None)
+    if body is None:
+        body = serialize(await build())
+        try:
+            await store.set(etag, body)
+        except Exception as e:
+            logger.warning("レスポンスキャッシュの保存失敗: %s", e)
+
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,56 @@
+"""
+DataFrame の高速 JSON シリアライズ
+行ごとの dict 化と Pydantic 検証を通さず、列単位で型をそろえて orjson で直接書き出す。
+orjson は NaN / Infinity を null として出力するため、欠損値の変換も列単位で済む。
+"""
+from datetime import date
+
+import numpy as np
+import orjson
+import pandas as pd
+
+
+def _select_columns(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """出力する列を順番どおりに float64 でそろえる（存在しない列はすべて欠損値）"""
+    return df.reindex(columns=columns).astype(np.float64)
+
+
+def _index_dates(df: pd.DataFrame) -> list:
+    """日付インデックスを ISO 形式（YYYY-MM-DD）で出力できる値の配列にする"""
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        return np.datetime_as_string(index.values, unit="D").tolist()
+    # DB から読んだ datetime.date のままなら orjson が YYYY-MM-DD で書き出す（文字列化を省く）
+    if len(index) and type(index[0]) is date:
+        return index.tolist()
+    return pd.DatetimeIndex(index).strftime("%Y-%m-%d").tolist()
+
+
+def dataframe_to_records_json(df: pd.DataFrame, columns: list[str], index_key: str = "date") -> bytes:
+    """
+    日付インデックスの DataFrame を行ごとのオブジェクト配列の JSON にする。
+
+    Args:
+        df: 日付インデックスの DataFrame
+        columns: 出力する列（この順で出力する）
+        index_key: インデックスを出力するキー
+
+    Returns:
+        bytes: `[{"date": "...", "<列>": 値 | null, ...}, ...]`
+    """
+    values = _select_columns(df, columns)
+    values.insert(0, index_key, _index_dates(df))
+    return orjson.dumps(values.to_dict(orient="records"))
+
+
+def dataframe_to_columnar_json(df: pd.DataFrame, columns: list[str], index_key: str = "date") -> bytes:
+    """
+    日付インデックスの DataFrame を列ごとの配列の JSON にする（チャート描画向けの小さいペイロード）。
+
+    Returns:
+        bytes: `{"date": ["...", ...], "<列>": [値 | null, ...], ...}`
+    """
+    values = _select_columns(df, columns)
+    payload: dict[str, object] = {index_key: _index_dates(df)}
+    payload.update({column: values[column].to_numpy() for column in columns})
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
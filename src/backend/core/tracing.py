@@ -0,0 +1,245 @@
+"""
+分散トレーシング（OpenTelemetry 互換）
+/predict などが遅いとき、DB 読み出し・指標計算・特徴量作成・学習・推論のどこで時間を使ったかを
+スパンで記録する。
+
+- TRACING_ENABLED=true かつ opentelemetry-sdk がインストールされている場合のみ有効
+  （無効時の span() は何もしない）
+- リクエストの X-Request-ID（32 桁の 16 進数または UUID）をトレース ID として引き継ぐ
+- エクスポート先はコンソール（標準出力）またはファイル（1 行 1 スパンの JSON）
+- サンプリング率は TRACING_SAMPLE_RATIO
+"""
+import functools
+import inspect
+import logging
+import re
+import secrets
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import get_settings
+from core.lazy import is_available
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+_tracer = None
+_provider = None
+
+_HEX32 = re.compile(r"^[0-9a-f]{32}$")
+
+
+def setup_tracing(*engines: Engine, exporter: Any = None) -> bool:
+    """
+    設定に応じてトレーサーを初期化する。
+
+    Args:
+        engines: SQL 文ごとのスパンを記録するエンジン（非同期エンジンは sync_engine を渡す）
+        exporter: 指定時は設定のエクスポート先の代わりに使い、スパンを同期的に書き出す（テスト用）
+
+    Returns:
+        bool: トレーシングが有効になったか
+    """
+    global _tracer, _provider
+    settings = get_settings()
+    if not settings.tracing_enabled:
+        return False
+    if not is_available("opentelemetry.sdk"):
+        logger.warning("opentelemetry-sdk がインストールされていないためトレーシングを無効化します")
+        return False
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SimpleSpanProcessor,
+    )
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if exporter is not None:
+        processor = SimpleSpanProcessor(exporter)
+    elif settings.tracing_exporter == "file":
+        path = Path(settings.tracing_file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        processor = BatchSpanProcessor(
+            ConsoleSpanExporter(
+                out=path.open("a", encoding="utf-8"),
+                formatter=lambda s: s.to_json(indent=None) + "\n",
+            )
+        )
+    else:
+        processor = BatchSpanProcessor(ConsoleSpanExporter())
+
+    # X-Request-ID から作った親コンテキストは「未サンプリング」として渡し、設定のサンプリング率で判定する
+    ratio = TraceIdRatioBased(settings.tracing_sample_ratio)
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.app_name}),
+        sampler=ParentBased(root=ratio, remote_parent_not_sampled=ratio),
+    )
+    _provider.add_span_processor(processor)
+    _tracer = _provider.get_tracer("stock-analyst")
+    for engine in engines:
+        instrument_engine(engine)
+    logger.info(
+        "トレーシング有効: exporter=%s, sample_ratio=%s",
+        "custom" if exporter is not None else settings.tracing_exporter,
+        settings.tracing_sample_ratio,
+    )
+    return True
+
+
+def shutdown_tracing() -> None:
+    """未送信のスパンを書き出してトレーサーを停止する"""
+    global _tracer, _provider
+    provider, _tracer, _provider = _provider, None, None
+    if provider is not None:
+        provider.shutdown()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """スパンを記録する（トレーシング無効時は何もしない）"""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def traced(name: str) -> Callable:
+    """関数全体をスパンで囲むデコレーター（同期・非同期関数の両方に使える）"""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_id_from_request_id(request_id: str | None) -> int | None:
+    """X-Request-ID をトレース ID（128 bit）に変換する（32 桁の 16 進数 / UUID 以外は None）"""
+    if not request_id:
+        return None
+    value = request_id.strip().lower().replace("-", "")
+    if not _HEX32.match(value) or int(value, 16) == 0:
+        return None
+    return int(value, 16)
+
+
+# =============================================================================
+# DB
+# =============================================================================
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _tracer is None or context is None:
+        return
+    context._trace_span = _tracer.start_span(
+        "db.query",
+        attributes={"db.system": conn.dialect.name, "db.statement": statement[:500]},
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    current = getattr(context, "_trace_span", None)
+    if current is not None:
+        current.end()
+
+
+def _handle_error(exception_context) -> None:
+    current = getattr(exception_context.execution_context, "_trace_span", None)
+    if current is not None:
+        current.record_exception(exception_context.original_exception)
+        current.end()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """SQL 文ごとのスパンを記録するイベントを登録する（登録済みなら何もしない）"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+
+class TracingMiddleware:
+    """リクエスト全体のスパンを記録し、X-Request-ID をトレース ID として引き継ぐ ASGI ミドルウェア"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        from opentelemetry import trace
+        from opentelemetry.trace import NonRecordingSpan, SpanContext, SpanKind, TraceFlags
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")
+        parent = None
+        trace_id = trace_id_from_request_id(request_id)
+        if trace_id is not None:
+            parent_span = NonRecordingSpan(
+                SpanContext(
+                    trace_id=trace_id,
+                    span_id=secrets.randbits(64) or 1,
+                    is_remote=True,
+                    trace_flags=TraceFlags(TraceFlags.DEFAULT),
+                )
+            )
+            parent = trace.set_span_in_context(parent_span)
+
+        status_code = 500
+        with _tracer.start_as_current_span(
+            f"HTTP {scope['method']}",
+            context=parent,
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as current:
+            response_id = request_id or format(current.get_span_context().trace_id, "032x")
+
+            async def send_wrapper(message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-request-id", response_id.encode("latin-1")),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    current.update_name(f"HTTP {scope['method']} {route}")
+                    current.set_attribute("http.route", route)
+                current.set_attribute("http.status_code", status_code)
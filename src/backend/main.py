@@ -1,13 +1,15 @@
 """
 Autonomous Stock Analyst - バックエンド API
 """
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 from collections.abc import AsyncGenerator
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
@@ -15,7 +17,13 @@ from slowapi.util import get_remote_address
 
 from api.router import router as api_router
 from core.config import get_settings
+from core.database import engine, read_engine
 from core.logging import get_logger, setup_logging
+from core.metrics import CONTENT_TYPE_LATEST, PrometheusMiddleware, generate_latest
+from core.profiling import ProfilingMiddleware
+from core.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from services.news_store import run_news_ingestion_loop
+from services.warmup import create_warmup_state, run_warmup, save_popularity
 
 settings = get_settings()
 logger = get_logger(__name__)
@@ -33,7 +41,34 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         settings.environment,
         settings.app_version,
     )
+    setup_tracing(engine.sync_engine, read_engine.sync_engine)
+
+    # バックグラウンドタスク
+    tasks: list[asyncio.Task] = []
+
+    # ウォームアップ（完了まで /ready は 503 を返す）
+    app.state.warmup = create_warmup_state()
+    if settings.warmup_enabled:
+        tasks.append(asyncio.create_task(run_warmup(app.state.warmup)))
+
+    if settings.news_ingestion_enabled:
+        tasks.append(
+            asyncio.create_task(
+                run_news_ingestion_loop(
+                    settings.news_ingestion_interval_seconds,
+                    max_items=settings.news_ingestion_max_items,
+                )
+            )
+        )
+
     yield
+
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    save_popularity(settings.warmup_popularity_file)
+    shutdown_tracing()
     logger.info("アプリケーション終了")
 
 
@@ -87,6 +122,16 @@ async def security_headers_middleware(request: Request, call_next):
     return response
 
 
+# プロファイリング（計測対象のリクエストだけ pyinstrument で計測する）
+app.add_middleware(ProfilingMiddleware)
+
+# トレーシング（X-Request-ID の引き継ぎとリクエスト全体のスパン）
+app.add_middleware(TracingMiddleware)
+
+# メトリクス（最も外側で計測するため最後に追加する）
+app.add_middleware(PrometheusMiddleware)
+
+
 # ルーター登録
 app.include_router(api_router)
 
@@ -107,6 +152,27 @@ async def health_check() -> dict:
     return {"status": "healthy", "version": settings.app_version}
 
 
+@app.get("/ready", include_in_schema=False)
+async def readiness_check() -> JSONResponse:
+    """レディネスチェック（ALB 用、ウォームアップ完了まで 503）"""
+    warmup = getattr(app.state, "warmup", None)
+    if warmup is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting"},
+        )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if warmup.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=warmup.to_dict(),
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus メトリクス"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/")
 async def root() -> dict:
     """ルートエンドポイント"""
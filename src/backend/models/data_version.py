@@ -0,0 +1,21 @@
+"""
+データバージョンモデル
+スコープ（"prices:<ticker>", "macro:<key>" 等）ごとに、データ取り込みのたびに加算する番号を持つ。
+読み取り API のレスポンスキャッシュと ETag のキーに使う。
+"""
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base, TimestampMixin
+
+
+class DataVersion(Base, TimestampMixin):
+    """スコープごとのデータバージョン"""
+
+    __tablename__ = "data_versions"
+
+    scope: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
+
+    def __repr__(self) -> str:
+        return f"<DataVersion(scope={self.scope}, version={self.version})>"
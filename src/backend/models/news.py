@@ -0,0 +1,73 @@
+"""
+ニュース記事モデル
+"""
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import Computed, DateTime, Index, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from models.base import Base, TimestampMixin
+from models.stock import Stock
+
+# 記事 ⇔ 銘柄の対応表
+news_article_stocks = sa.Table(
+    "news_article_stocks",
+    Base.metadata,
+    sa.Column(
+        "article_id",
+        sa.ForeignKey("news_articles.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    sa.Column(
+        "stock_id",
+        sa.ForeignKey("stocks.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    ),
+)
+
+
+class NewsArticle(Base, TimestampMixin):
+    """ニュース記事（URL ハッシュで重複排除）"""
+
+    __tablename__ = "news_articles"
+
+    __table_args__ = (
+        Index("ix_news_articles_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_news_articles_published_id", "published_at", "id"),
+        Index(
+            "ix_news_articles_search_text",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    url_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    url: Mapped[str] = mapped_column(String(2000), nullable=False)
+    title: Mapped[str] = mapped_column(String(1000), nullable=False)
+    source: Mapped[str] = mapped_column(String(200), nullable=False, default="")
+    summary: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    # 公開日時が取れない記事は取得日時で代用する（キーセットページネーションのため NOT NULL）
+    published_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # 全文検索用（タイトル + 要約）。空白で区切られた語（英語の記事など）向けの simple 構成
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(summary, ''))",
+            persisted=True,
+        ),
+    )
+    # 部分一致検索用（タイトル + 要約）。日本語は語が空白で区切られないため pg_trgm で検索する
+    search_text: Mapped[str] = mapped_column(
+        Text, Computed("title || ' ' || summary", persisted=True)
+    )
+
+    # リレーション
+    stocks: Mapped[list[Stock]] = relationship(secondary=news_article_stocks, lazy="raise")
+
+    def __repr__(self) -> str:
+        return f"<NewsArticle(id={self.id}, title={self.title[:30]})>"
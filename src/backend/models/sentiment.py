@@ -0,0 +1,26 @@
+"""
+センチメントスコアモデル
+"""
+from sqlalchemy import Float, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base, TimestampMixin
+
+
+class SentimentScore(Base, TimestampMixin):
+    """センチメント分析結果（正規化テキストのハッシュ + モデルバージョンごと）"""
+
+    __tablename__ = "sentiment_scores"
+
+    __table_args__ = (
+        UniqueConstraint("content_hash", "model_version", name="uq_sentiment_hash_model"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    model_version: Mapped[str] = mapped_column(String(100), nullable=False)
+    label: Mapped[str] = mapped_column(String(20), nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SentimentScore(hash={self.content_hash[:8]}, label={self.label}, score={self.score})>"
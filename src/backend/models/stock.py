@@ -5,7 +5,7 @@ from datetime import date
 from decimal import Decimal
 
 import sqlalchemy as sa
-from sqlalchemy import Date, Index, Numeric, String, UniqueConstraint
+from sqlalchemy import Computed, Date, Double, Index, Numeric, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import Base, TimestampMixin
@@ -23,22 +23,47 @@ class Stock(Base, TimestampMixin):
     market: Mapped[str | None] = mapped_column(String(50))
     description: Mapped[str | None] = mapped_column(String(1000))
     is_active: Mapped[bool] = mapped_column(default=True)
+    # 保存済み株価件数（取り込み時に加算し、一覧の総数に count(*) を使わない）
+    price_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
 
     # リレーション
-    prices: Mapped[list["StockPrice"]] = relationship(back_populates="stock", lazy="selectin")
+    # 株価履歴は数万行になりうるため暗黙にはロードしない（必要なクエリで selectinload 等を明示する）
+    prices: Mapped[list["StockPrice"]] = relationship(back_populates="stock", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<Stock(ticker={self.ticker}, name={self.name})>"
 
 
+def _float_column(source: str):
+    return mapped_column(
+        Double,
+        Computed(f"CAST({source} AS DOUBLE PRECISION)", persisted=True),
+        deferred=True,
+        deferred_raiseload=True,
+    )
+
+
 class StockPrice(Base, TimestampMixin):
-    """株価データ（日足）"""
+    """
+    株価データ（日足）
+
+    PostgreSQL では price_date で年単位に RANGE パーティション分割している（migration 006）。
+    DB 上の主キーは (id, price_date) だが、id はシーケンスで一意なので ORM では id のみを識別子とする。
+    """
 
     __tablename__ = "stock_prices"
 
     __table_args__ = (
         UniqueConstraint("stock_id", "price_date", name="uq_stock_price_date"),
-        Index("ix_stock_prices_stock_date", "stock_id", "price_date"),
+        # 銘柄 × 期間の範囲スキャンを Index Only Scan にするカバリングインデックス
+        Index(
+            "ix_stock_prices_stock_date",
+            "stock_id",
+            "price_date",
+            postgresql_include=["open_f", "high_f", "low_f", "close_f", "volume", "adjusted_close_f"],
+        ),
+        # 全銘柄を対象にした日付範囲の検索用
+        Index("ix_stock_prices_date_brin", "price_date", postgresql_using="brin"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -51,8 +76,51 @@ class StockPrice(Base, TimestampMixin):
     volume: Mapped[int] = mapped_column(nullable=False)
     adjusted_close: Mapped[Decimal | None] = mapped_column(Numeric(12, 4))
 
+    # 分析用の float8 列（Numeric から DB が生成する。Decimal を経由せずに float / NumPy 配列で読む）
+    # エンティティのロードでは読まない（必要なクエリで列を明示的に選択する）
+    open_f: Mapped[float] = _float_column("open")
+    high_f: Mapped[float] = _float_column("high")
+    low_f: Mapped[float] = _float_column("low")
+    close_f: Mapped[float] = _float_column("close")
+    adjusted_close_f: Mapped[float | None] = _float_column("adjusted_close")
+
     # リレーション
-    stock: Mapped["Stock"] = relationship(back_populates="prices")
+    stock: Mapped["Stock"] = relationship(back_populates="prices", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<StockPrice(stock_id={self.stock_id}, date={self.price_date}, close={self.close})>"
+
+
+class StockPriceRollup(Base, TimestampMixin):
+    """
+    株価の週足・月足（日足から集計したもの）
+
+    株価の取り込み時に、新しい日足が属する期間の行だけを更新する（services.rollup）。
+    period_start は週足なら月曜日、月足なら 1 日。
+    """
+
+    __tablename__ = "stock_price_rollups"
+
+    __table_args__ = (
+        UniqueConstraint("stock_id", "granularity", "period_start", name="uq_stock_price_rollup"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    stock_id: Mapped[int] = mapped_column(sa.ForeignKey("stocks.id", ondelete="CASCADE"), nullable=False)
+    granularity: Mapped[str] = mapped_column(String(10), nullable=False)  # week | month
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    # 期間内で最初・最後の取引日（始値・終値を差し替えるかの判定に使う）
+    first_date: Mapped[date] = mapped_column(Date, nullable=False)
+    last_date: Mapped[date] = mapped_column(Date, nullable=False)
+    open: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    high: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    low: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    close: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    volume: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
+    day_count: Mapped[int] = mapped_column(nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<StockPriceRollup(stock_id={self.stock_id}, granularity={self.granularity}, "
+            f"period_start={self.period_start}, close={self.close})>"
+        )
@@ -5,20 +5,44 @@ LightGBM を使用して将来の株価変動を予測する。
 import logging
 from datetime import date, timedelta
 
-import lightgbm as lgb
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+
+from analyzers.macro_panel import join_macro_features
+from core.lazy import lazy_import
+from core.metrics import LIGHTGBM_PREDICT_SECONDS, LIGHTGBM_TRAIN_SECONDS
+from core.tracing import span, traced
+from services.rollup import BARS_PER_GRANULARITY
+
+# lightgbm / scikit-learn はインポートが重いため初回学習時にロードする
+lgb = lazy_import("lightgbm")
+model_selection = lazy_import("sklearn.model_selection")
 
 logger = logging.getLogger(__name__)
 
 
 class PricePredictor:
-    """株価予測クラス"""
-
-    def __init__(self):
+    """
+    株価予測クラス
+
+    granularity が "week" / "month" のときは週足・月足（services.rollup）の DataFrame を受け取り、
+    target_days を足数に換算して予測する（1〜12 か月先のような長期の予測向け）。
+    macro_panel（analyzers.macro_panel.get_macro_panel の結果）を渡すと、各日に公表済みの
+    マクロ指標を特徴量に加える。
+    """
+
+    def __init__(self, granularity: str = "day", macro_panel: pd.DataFrame | None = None):
+        if granularity not in BARS_PER_GRANULARITY:
+            raise ValueError(f"未対応の粒度です: {granularity}")
+        self.granularity = granularity
+        self.macro_panel = macro_panel
         self.model = None
 
+    def horizon_bars(self, target_days: int) -> int:
+        """target_days（営業日数）を現在の粒度の足数に換算する（最低 1 本）"""
+        return max(1, round(target_days / BARS_PER_GRANULARITY[self.granularity]))
+
+    @traced("predictor.prepare_features")
     def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         テクニカル指標を含む DataFrame から特徴量を作成する。
@@ -59,16 +83,23 @@ class PricePredictor:
         # 5. 出来高変化率
         features["volume_change"] = df["volume"].pct_change()
 
+        # 6. マクロ指標（各日に公表済みの値）
+        if self.macro_panel is not None:
+            macro = join_macro_features(df.index, self.macro_panel)
+            for column in macro.columns:
+                features[column] = macro[column].to_numpy()
+
         # 欠損値を含む行を削除（計算初期の期間など）
         return features.dropna()
 
+    @traced("predictor.train")
     def train(self, df: pd.DataFrame, target_days: int = 30) -> dict:
         """
         モデルを学習する。
 
         Args:
             df: 株価データ（テクニカル指標付き）
-            target_days: 何日後の騰落を予測するか
+            target_days: 何日後の騰落を予測するか（週足・月足では足数に換算する）
 
         Returns:
             dict: 学習結果（精度など）
@@ -78,8 +109,9 @@ class PricePredictor:
             raise ValueError("学習可能なデータがありません")
 
         # ターゲット作成: N日後のリターン
-        # shift(-N) で未来の価格を現在の行に持ってくる
-        future_return = df["close"].shift(-target_days) / df["close"] - 1.0
+        # shift(-N) で未来の価格を現在の行に持ってくる（N は足数）
+        horizon = self.horizon_bars(target_days)
+        future_return = df["close"].shift(-horizon) / df["close"] - 1.0
         # 特徴量とインデックスを合わせる
         target = future_return[features.index]
         # ターゲットが NaN になる（直近データ）を除外
@@ -89,7 +121,7 @@ class PricePredictor:
 
         # 騰落クラスに変換（0: 下落, 1: 上昇）あるいは回帰
         # ここでは回帰（リターン予測）とする
-        X_train, X_test, y_train, y_test = train_test_split(
+        X_train, X_test, y_train, y_test = model_selection.train_test_split(
             X, y, test_size=0.2, shuffle=False
         )
 
@@ -103,17 +135,18 @@ class PricePredictor:
             "verbosity": -1,
         }
 
-        self.model = lgb.train(
-            params,
-            train_data,
-            valid_sets=[valid_data],
-            # early_stopping_rounds=10, # LightGBM 4.0以降はcallback推奨だが簡易的に省略または警告無視
-            num_boost_round=100,
-            callbacks=[
-                lgb.early_stopping(stopping_rounds=10),
-                lgb.log_evaluation(period=0),  # ログ出力を抑制
-            ],
-        )
+        with LIGHTGBM_TRAIN_SECONDS.time(), span("lightgbm.train", rows=len(X_train)):
+            self.model = lgb.train(
+                params,
+                train_data,
+                valid_sets=[valid_data],
+                # early_stopping_rounds=10, # LightGBM 4.0以降はcallback推奨だが簡易的に省略または警告無視
+                num_boost_round=100,
+                callbacks=[
+                    lgb.early_stopping(stopping_rounds=10),
+                    lgb.log_evaluation(period=0),  # ログ出力を抑制
+                ],
+            )
 
         return {
             "train_rmse": float(self.model.best_score["valid_0"]["rmse"]),
@@ -122,6 +155,13 @@ class PricePredictor:
             ),
         }
 
+    def save_model(self, path: str) -> None:
+        """学習済みモデルを保存する（predictors.registry で読み込める形式）"""
+        if self.model is None:
+            raise ValueError("モデルが学習されていません")
+        self.model.save_model(path)
+
+    @traced("predictor.predict")
     def predict(self, df: pd.DataFrame, target_days: int = 30) -> float:
         """
         最新データに基づいて将来のリターンを予測する。
@@ -135,5 +175,6 @@ class PricePredictor:
 
         # 最新の行を使用
         latest_features = features.iloc[[-1]]
-        prediction = self.model.predict(latest_features)[0]
+        with LIGHTGBM_PREDICT_SECONDS.time():
+            prediction = self.model.predict(latest_features)[0]
         return float(prediction)
@@ -0,0 +1,46 @@
+"""
+学習済みモデルレジストリ
+LightGBM の学習済みブースターをプロセス内に登録し、予測時の再学習を省く。
+ブースターは "<ticker>_<target_days>d.txt" の名前でディレクトリに保存しておく。
+"""
+import logging
+from pathlib import Path
+
+from core.lazy import lazy_import
+
+lgb = lazy_import("lightgbm")
+
+logger = logging.getLogger(__name__)
+
+_boosters: dict[str, "lgb.Booster"] = {}
+
+
+def booster_name(ticker: str, target_days: int, granularity: str = "day") -> str:
+    """レジストリ上のブースター名（週足・月足で学習したものは粒度を付ける）"""
+    if granularity == "day":
+        return f"{ticker}_{target_days}d"
+    return f"{ticker}_{target_days}d_{granularity}"
+
+
+def register_booster(name: str, booster: "lgb.Booster") -> None:
+    """ブースターを登録する"""
+    _boosters[name] = booster
+
+
+def get_booster(name: str) -> "lgb.Booster | None":
+    """登録済みのブースターを返す"""
+    return _boosters.get(name)
+
+
+def load_boosters(model_dir: str | Path) -> int:
+    """
+    ディレクトリ内の学習済みブースター（*.txt）を読み込んで登録する。
+
+    Returns:
+        int: 登録した件数
+    """
+    paths = sorted(Path(model_dir).glob("*.txt"))
+    for path in paths:
+        register_booster(path.stem, lgb.Booster(model_file=str(path)))
+        logger.info("学習済みモデルを登録: %s", path.stem)
+    return len(paths)
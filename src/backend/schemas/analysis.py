@@ -2,6 +2,7 @@
 分析・予測 API スキーマ
 """
 from datetime import date
+from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -33,6 +34,62 @@ class TechnicalIndicators(BaseModel):
     bb_lower: float | None = Field(None, alias="BBL_20_2.0")
 
 
+# TechnicalIndicators の出力キー（エイリアス）。"date" は DataFrame のインデックスから出力する
+TECHNICAL_COLUMNS = [
+    field.alias or name
+    for name, field in TechnicalIndicators.model_fields.items()
+    if name != "date"
+]
+
+
+class TechnicalIndicatorsColumnar(BaseModel):
+    """テクニカル指標レスポンス（format=columnar: 項目ごとの配列。キーは TechnicalIndicators と同じ）"""
+
+    date: list[date]
+    open: list[float]
+    high: list[float]
+    low: list[float]
+    close: list[float]
+    volume: list[float]
+    sma_20: list[float | None] = Field(alias="SMA_20")
+    sma_50: list[float | None] = Field(alias="SMA_50")
+    sma_200: list[float | None] = Field(alias="SMA_200")
+    rsi_14: list[float | None] = Field(alias="RSI_14")
+    macd: list[float | None] = Field(alias="MACD_12_26_9")
+    macd_hist: list[float | None] = Field(alias="MACDh_12_26_9")
+    macd_signal: list[float | None] = Field(alias="MACDs_12_26_9")
+    bb_upper: list[float | None] = Field(alias="BBU_20_2.0")
+    bb_middle: list[float | None] = Field(alias="BBM_20_2.0")
+    bb_lower: list[float | None] = Field(alias="BBL_20_2.0")
+
+
+class ScreeningResult(BaseModel):
+    """スクリーニング結果の 1 銘柄（最新の終値・出来高と指標。キーは TechnicalIndicators と同じ）"""
+
+    ticker: str
+    close: float | None
+    volume: float | None
+    sma_20: float | None = Field(None, alias="SMA_20")
+    sma_50: float | None = Field(None, alias="SMA_50")
+    sma_200: float | None = Field(None, alias="SMA_200")
+    rsi_14: float | None = Field(None, alias="RSI_14")
+    macd: float | None = Field(None, alias="MACD_12_26_9")
+    macd_hist: float | None = Field(None, alias="MACDh_12_26_9")
+    macd_signal: float | None = Field(None, alias="MACDs_12_26_9")
+    bb_upper: float | None = Field(None, alias="BBU_20_2.0")
+    bb_middle: float | None = Field(None, alias="BBM_20_2.0")
+    bb_lower: float | None = Field(None, alias="BBL_20_2.0")
+
+
+class ScreeningResponse(BaseModel):
+    """スクリーニングレスポンス"""
+
+    version: int  # ユニバース行列の版
+    as_of: date | None  # ユニバース行列の最新の日付
+    total: int  # 条件に一致した銘柄数（limit で切る前）
+    results: list[ScreeningResult]
+
+
 class SentimentResponse(BaseModel):
     """センチメント分析レスポンス"""
 
@@ -47,6 +104,31 @@ class SentimentRequest(BaseModel):
     text: str = Field(..., max_length=1000)
 
 
+class SentimentDocumentRequest(BaseModel):
+    """長文センチメント分析リクエスト"""
+
+    text: str = Field(..., max_length=100_000)
+
+
+class SentimentDocumentResponse(BaseModel):
+    """長文センチメント分析レスポンス"""
+
+    label: str
+    score: float
+
+
+class SentimentBatchRequest(BaseModel):
+    """センチメント一括分析リクエスト"""
+
+    texts: list[Annotated[str, Field(max_length=1000)]] = Field(..., min_length=1, max_length=500)
+
+
+class SentimentBatchResponse(BaseModel):
+    """センチメント一括分析レスポンス"""
+
+    results: list[SentimentResponse]
+
+
 class PredictionResponse(BaseModel):
     """株価予測レスポンス"""
 
@@ -26,6 +26,18 @@ class MacroIndicatorResponse(BaseModel):
     total: int
 
 
+class MacroPanelResponse(BaseModel):
+    """
+    複数指標のパネル（観測日の和集合を軸にした列ごとの配列）
+
+    date に加えて、指定した指標キーごとに date と同じ長さの値の配列（欠損は null）を持つ。
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    date: list[date]
+
+
 class MacroIndicatorFetchRequest(BaseModel):
     """マクロ指標取得リクエスト"""
 
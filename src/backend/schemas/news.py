@@ -20,3 +20,4 @@ class NewsResponse(BaseModel):
     query: str
     articles: list[NewsArticle]
     total: int
+    next_cursor: str | None = None
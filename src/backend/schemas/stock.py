@@ -3,6 +3,7 @@
 """
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -43,7 +44,9 @@ class StockListResponse(BaseModel):
     """銘柄一覧レスポンス"""
 
     stocks: list[StockResponse]
-    total: int
+    total: int | None = Field(None, description="アクティブ銘柄の総数（include_total=true の場合のみ）")
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 # =============================================================================
@@ -51,13 +54,18 @@ class StockListResponse(BaseModel):
 # =============================================================================
 
 
+# 株価の足の粒度（week / month は取り込み時に更新しているロールアップから読む）
+Granularity = Literal["day", "week", "month"]
+GRANULARITY_DESCRIPTION = "day: 日足 / week: 週足（月曜始まり） / month: 月足"
+
+
 class StockPriceResponse(BaseModel):
     """株価レスポンス"""
 
     model_config = ConfigDict(from_attributes=True)
 
     id: int
-    price_date: date
+    price_date: date = Field(..., description="取引日（週足・月足では期間の開始日）")
     open: Decimal
     high: Decimal
     low: Decimal
@@ -71,7 +79,12 @@ class StockPriceListResponse(BaseModel):
 
     ticker: str
     prices: list[StockPriceResponse]
-    total: int
+    total: int = Field(
+        ...,
+        description="保存済みの株価件数（日足は取り込み時に更新するキャッシュ値、週足・月足は本数）",
+    )
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 class StockPriceFetchRequest(BaseModel):
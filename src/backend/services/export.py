@@ -0,0 +1,161 @@
+"""
+株価履歴の一括エクスポート
+サーバーサイドカーソルで chunk_size 行ずつ読み出し、チャンクごとに NDJSON / Arrow IPC / Parquet の
+バイト列として書き出す。結果全体をメモリに載せないため、数 GB の抽出でもメモリ使用量は一定になる。
+"""
+import io
+from collections.abc import AsyncIterator
+from datetime import date
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.lazy import is_available, lazy_import
+from models.stock import StockPrice
+
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+# フォーマット → (メディアタイプ, 拡張子)
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _arrow_schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("ticker", pa.string()),
+            ("date", pa.date32()),
+            ("open", pa.float64()),
+            ("high", pa.float64()),
+            ("low", pa.float64()),
+            ("close", pa.float64()),
+            ("adjusted_close", pa.float64()),
+            ("volume", pa.int64()),
+        ]
+    )
+
+
+async def _iter_chunks(
+    session_factory: async_sessionmaker[AsyncSession],
+    tickers: dict[int, str],
+    start: date | None,
+    end: date | None,
+    chunk_size: int,
+) -> AsyncIterator[list[tuple]]:
+    """サーバーサイドカーソルで株価を chunk_size 行ずつ返す（銘柄 ID・日付の昇順、価格は float8 列）"""
+    # 銘柄コードで並べると結合後の全行のソートが終わるまで最初の行を返せないため、
+    # (stock_id, price_date) のインデックス順に読み、銘柄コードは Python 側で対応付ける
+    stmt = (
+        select(
+            StockPrice.stock_id,
+            StockPrice.price_date,
+            StockPrice.open_f,
+            StockPrice.high_f,
+            StockPrice.low_f,
+            StockPrice.close_f,
+            StockPrice.adjusted_close_f,
+            StockPrice.volume,
+        )
+        .where(StockPrice.stock_id.in_(tickers))
+        .order_by(StockPrice.stock_id, StockPrice.price_date)
+        .execution_options(yield_per=chunk_size)
+    )
+    if start is not None:
+        stmt = stmt.where(StockPrice.price_date >= start)
+    if end is not None:
+        stmt = stmt.where(StockPrice.price_date <= end)
+
+    # レスポンス送信中も接続を保持するため、リクエストスコープの get_db ではなく専用セッションを使う
+    async with session_factory() as session:
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            yield [(tickers[stock_id], *values) for stock_id, *values in rows]
+
+
+async def _ndjson(chunks: AsyncIterator[list[tuple]]) -> AsyncIterator[bytes]:
+    async for rows in chunks:
+        yield b"".join(
+            orjson.dumps(
+                {
+                    "ticker": ticker,
+                    "date": price_date,
+                    "open": open_,
+                    "high": high,
+                    "low": low,
+                    "close": close,
+                    "adjusted_close": adjusted_close,
+                    "volume": volume,
+                },
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+            for ticker, price_date, open_, high, low, close, adjusted_close, volume in rows
+        )
+
+
+def _record_batch(rows: list[tuple], schema: "pa.Schema") -> "pa.RecordBatch":
+    columns = list(zip(*rows, strict=True))
+    arrays = [
+        pa.array(values, type=field.type)
+        for field, values in zip(schema, columns, strict=True)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+async def _arrow(chunks: AsyncIterator[list[tuple]], parquet: bool) -> AsyncIterator[bytes]:
+    """チャンクごとに Arrow IPC のレコードバッチ / Parquet の行グループを書き出して返す"""
+    schema = _arrow_schema()
+    buffer = io.BytesIO()
+    writer = pq.ParquetWriter(buffer, schema) if parquet else pa.ipc.new_stream(buffer, schema)
+
+    def drain() -> bytes:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    try:
+        async for rows in chunks:
+            writer.write_batch(_record_batch(rows, schema))
+            data = drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    # Arrow はストリーム終端、Parquet はフッター
+    yield drain()
+
+
+def export_prices(
+    session_factory: async_sessionmaker[AsyncSession],
+    tickers: dict[int, str],
+    fmt: str,
+    start: date | None = None,
+    end: date | None = None,
+    chunk_size: int = 10000,
+) -> AsyncIterator[bytes]:
+    """
+    株価履歴をエクスポート形式のバイト列として逐次返す。
+
+    Args:
+        session_factory: 読み出しに使うセッションファクトリ
+        tickers: 対象銘柄の ID → 銘柄コード
+        fmt: "ndjson" | "arrow" | "parquet"
+        start: 開始日（含む）
+        end: 終了日（含む）
+        chunk_size: 1 回に読み出して書き出す行数
+
+    Raises:
+        ImportError: arrow / parquet で pyarrow がインストールされていない場合（呼び出し時に判定）
+    """
+    chunks = _iter_chunks(session_factory, tickers, start, end, chunk_size)
+    if fmt == "ndjson":
+        return _ndjson(chunks)
+    # レスポンスを開始してから失敗しないよう、ストリーム開始前に pyarrow の有無を確認する
+    if not is_available("pyarrow"):
+        raise ImportError("pyarrow ライブラリがインストールされていません")
+    return _arrow(chunks, parquet=fmt == "parquet")
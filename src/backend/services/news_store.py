@@ -0,0 +1,206 @@
+"""
+ニュース記事ストア
+collectors.news で取得した記事を DB に蓄積し、全文検索（キーセットページネーション）を提供する。
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import UTC, datetime
+
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from collectors.news import fetch_news
+from core.database import async_session
+from core.pagination import decode_cursor, encode_cursor
+from models.news import NewsArticle, news_article_stocks
+from models.stock import Stock
+
+logger = logging.getLogger(__name__)
+
+
+def url_hash(url: str) -> str:
+    """重複排除用の URL ハッシュを返す"""
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def _parse_published(published_at: str | None) -> datetime | None:
+    """collectors.news の published_at（UTC の ISO 文字列）を datetime に変換する"""
+    if not published_at:
+        return None
+    try:
+        parsed = datetime.fromisoformat(published_at)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+async def save_articles(
+    db: AsyncSession,
+    articles: list[dict],
+    stock_id: int | None = None,
+) -> int:
+    """
+    記事を保存する（URL ハッシュが既存の記事はスキップ）。
+
+    Args:
+        db: データベースセッション
+        articles: collectors.news.fetch_news の戻り値
+        stock_id: 記事を紐付ける銘柄 ID
+
+    Returns:
+        int: 新規保存した件数
+    """
+    fetched_at = datetime.now(UTC)
+    rows: dict[str, dict] = {}
+    for article in articles:
+        if not article.get("url"):
+            continue
+        rows[url_hash(article["url"])] = {
+            "url_hash": url_hash(article["url"]),
+            "url": article["url"][:2000],
+            "title": article.get("title", "")[:1000],
+            "source": article.get("source", "")[:200],
+            "summary": article.get("summary", ""),
+            "published_at": _parse_published(article.get("published_at")) or fetched_at,
+        }
+
+    if not rows:
+        return 0
+
+    result = await db.execute(
+        insert(NewsArticle)
+        .values(list(rows.values()))
+        .on_conflict_do_nothing(index_elements=["url_hash"])
+        .returning(NewsArticle.id)
+    )
+    saved_count = len(result.all())
+
+    if stock_id is not None:
+        id_result = await db.execute(
+            select(NewsArticle.id).where(NewsArticle.url_hash.in_(list(rows)))
+        )
+        links = [{"article_id": article_id, "stock_id": stock_id} for article_id in id_result.scalars()]
+        if links:
+            await db.execute(insert(news_article_stocks).values(links).on_conflict_do_nothing())
+
+    return saved_count
+
+
+async def ingest_news(
+    db: AsyncSession,
+    query: str,
+    stock_id: int | None = None,
+    max_items: int = 50,
+) -> int:
+    """ニュースを取得して保存する"""
+    articles = await fetch_news(query, max_items=max_items)
+    saved_count = await save_articles(db, articles, stock_id=stock_id)
+    logger.info("ニュース保存完了: query=%s, 新規=%d件", query, saved_count)
+    return saved_count
+
+
+def _like_pattern(term: str) -> str:
+    """部分一致（ILIKE）のパターン（ワイルドカードの文字は PostgreSQL の既定のエスケープ文字でエスケープ）"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+async def search_news(
+    db: AsyncSession,
+    query: str,
+    limit: int = 10,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    保存済みの記事を検索する（公開日時の降順）。
+
+    空白で区切った語をすべてタイトル + 要約に含む記事（pg_trgm の部分一致。日本語向け）と、
+    全文検索（simple 構成の tsvector。英語の記事など）に一致する記事を返す。
+    query が銘柄のティッカー / 名称と一致する場合は紐付け済みの記事も返す。
+
+    Args:
+        db: データベースセッション
+        query: 検索キーワード
+        limit: 取得件数
+        cursor: 前ページの next_cursor
+
+    Returns:
+        tuple[list[dict], str | None]: 記事リストと次ページのカーソル
+
+    Raises:
+        ValueError: 不正なカーソルの場合
+    """
+    linked_ids = (
+        select(news_article_stocks.c.article_id)
+        .join(Stock, Stock.id == news_article_stocks.c.stock_id)
+        .where(or_(Stock.ticker == query, Stock.name == query))
+    )
+    conditions = [
+        NewsArticle.search_vector.op("@@")(func.websearch_to_tsquery("simple", query)),
+        NewsArticle.id.in_(linked_ids),
+    ]
+    terms = query.split()
+    if terms:
+        conditions.append(
+            and_(*(NewsArticle.search_text.ilike(_like_pattern(t)) for t in terms))
+        )
+    stmt = select(NewsArticle).where(or_(*conditions))
+
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            position = (datetime.fromisoformat(values["published_at"]), int(values["id"]))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("不正なカーソルです") from e
+        stmt = stmt.where(tuple_(NewsArticle.published_at, NewsArticle.id) < position)
+
+    result = await db.execute(
+        stmt.order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc()).limit(limit + 1)
+    )
+    records = list(result.scalars().all())
+
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_cursor(
+            {"published_at": last.published_at.isoformat(), "id": last.id}
+        )
+
+    articles = [
+        {
+            "title": r.title,
+            "url": r.url,
+            "source": r.source,
+            "published_at": r.published_at.isoformat(),
+            "summary": r.summary,
+        }
+        for r in records
+    ]
+    return articles, next_cursor
+
+
+async def run_news_ingestion_loop(interval_seconds: int, max_items: int = 50) -> None:
+    """アクティブな全銘柄のニュースを定期的に取得・保存する（lifespan からタスクとして起動）"""
+    logger.info("ニュース取り込みループ開始: interval=%ds", interval_seconds)
+    while True:
+        try:
+            async with async_session() as db:
+                stocks = (
+                    await db.execute(
+                        select(Stock.id, Stock.name).where(Stock.is_active.is_(True))
+                    )
+                ).all()
+                for stock_id, name in stocks:
+                    try:
+                        await ingest_news(db, name, stock_id=stock_id, max_items=max_items)
+                        await db.commit()
+                    except Exception as e:
+                        await db.rollback()
+                        logger.warning("ニュース取り込み失敗: stock=%s, %s", name, e)
+        except Exception as e:
+            logger.error("ニュース取り込みループでエラー: %s", e, exc_info=True)
+
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,289 @@
+"""
+分析用の株価カラムキャッシュ（メモリマップ）
+銘柄ごとの日足を列ごとのバイナリファイル（date / open / high / low / close / volume）としてローカルに
+置き、np.memmap でゼロコピーに読み出す。日足は追記のみなので、コレクターは新しい行を末尾に追記する。
+
+- 同じホストの uvicorn ワーカーは OS のページキャッシュを共有する（プロセスごとのコピーを持たない）
+- meta.json に行数と株価のデータバージョン（core.data_version）を持つ。DB のバージョンと一致しない
+  キャッシュ（取り込みの取りこぼし・ロールバック等）は読み出し時に DB から作り直す
+- 読み出し側はロックを取らない。追記は列ファイルの末尾に書いてから meta.json を置き換えるため、
+  meta.json の行数までは常に書き込み済み
+- 列ファイルはヘッダーのない生の配列（.npy はヘッダーに行数を持ち、追記のたびに書き換えが要るため）
+- ロック待ち（flock）と書き込みはブロッキング I/O のため、非同期の経路からはスレッドで実行する
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.data_version import get_data_version, prices_scope
+from core.metrics import record_cache
+from services.price_loader import PRICE_COLUMNS, load_price_frame
+
+logger = logging.getLogger(__name__)
+
+# 列ファイルのデータ型（リトルエンディアン固定。日付は datetime64[D]）
+DTYPES = {"date": np.dtype("<M8[D]"), **{c: np.dtype("<f8") for c in PRICE_COLUMNS}}
+
+
+class PriceColumnCache:
+    """銘柄ごとの列ファイルキャッシュ"""
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+
+    def path(self, ticker: str) -> Path:
+        # "^N225" のような記号を含むコードもファイル名にできるようにする
+        return self.cache_dir / quote(ticker, safe="")
+
+    @contextmanager
+    def _lock(self, ticker: str):
+        """銘柄単位の書き込みロック（別プロセスの書き込みと直列化する）"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / f"{quote(ticker, safe='')}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_meta(path: Path) -> dict | None:
+        try:
+            return json.loads((path / "meta.json").read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("株価キャッシュのメタデータ読み込み失敗: %s, %s", path, e)
+            return None
+
+    @staticmethod
+    def _write_meta(path: Path, rows: int, version: int) -> None:
+        tmp_path = path / f"meta.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps({"rows": rows, "version": version}))
+        os.replace(tmp_path, path / "meta.json")
+
+    def version(self, ticker: str) -> int | None:
+        """キャッシュしているデータバージョン（キャッシュがなければ None）"""
+        meta = self._read_meta(self.path(ticker))
+        return meta["version"] if meta else None
+
+    def read(self, ticker: str) -> dict[str, np.ndarray] | None:
+        """
+        列ごとの読み取り専用の配列（np.memmap）を返す（キャッシュがなければ None）。
+
+        配列はファイルをマップしたままなので、スライスしてもコピーは発生しない。
+        """
+        path = self.path(ticker)
+        meta = self._read_meta(path)
+        if meta is None:
+            return None
+        rows = meta["rows"]
+        if rows == 0:
+            return {c: np.empty(0, dtype=dtype) for c, dtype in DTYPES.items()}
+        try:
+            return {
+                c: np.memmap(path / f"{c}.bin", dtype=dtype, mode="r", shape=(rows,))
+                for c, dtype in DTYPES.items()
+            }
+        except (OSError, ValueError) as e:
+            # 作り直しと読み出しが重なった場合など
+            logger.warning("株価キャッシュ読み込み失敗: ticker=%s, %s", ticker, e)
+            return None
+
+    def write(self, ticker: str, arrays: dict[str, np.ndarray], version: int) -> None:
+        """銘柄の全履歴でキャッシュを作り直す（一時ディレクトリに書いてから置き換え）"""
+        path = self.path(ticker)
+        with self._lock(ticker):
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            tmp_path.mkdir(parents=True)
+            for column, dtype in DTYPES.items():
+                np.ascontiguousarray(arrays[column], dtype=dtype).tofile(tmp_path / f"{column}.bin")
+            self._write_meta(tmp_path, len(arrays["date"]), version)
+            # 古いディレクトリは退避してから消す（マップ済みの読み出し側は古いファイルを読み続けられる）
+            old_path = path.with_name(f"{path.name}.{os.getpid()}.old")
+            if path.exists():
+                os.replace(path, old_path)
+            os.replace(tmp_path, path)
+            shutil.rmtree(old_path, ignore_errors=True)
+
+    def append(self, ticker: str, arrays: dict[str, np.ndarray], version: int) -> bool:
+        """
+        新しい日足を末尾に追記する。
+
+        キャッシュが直前のバージョン（version - 1）で、追記する日付がすべて最終日より後の場合だけ追記する。
+        それ以外（キャッシュなし・取りこぼし・過去日の補完）は追記せず、キャッシュを破棄して次の読み出しで
+        作り直させる。
+
+        Returns:
+            bool: 追記したか
+        """
+        path = self.path(ticker)
+        with self._lock(ticker):
+            meta = self._read_meta(path)
+            if meta is None:
+                return False
+            rows = meta["rows"]
+            dates = np.asarray(arrays["date"], dtype=DTYPES["date"])
+            cached = self.read(ticker)
+            last = cached["date"][-1] if cached is not None and rows else None
+            if meta["version"] != version - 1 or (last is not None and dates.min() <= last):
+                shutil.rmtree(path, ignore_errors=True)
+                return False
+            order = np.argsort(dates, kind="stable")
+            for column, dtype in DTYPES.items():
+                file_path = path / f"{column}.bin"
+                # 前回の追記が途中で失敗していても meta.json の行数の位置から書く
+                with open(file_path, "r+b") as f:
+                    f.truncate(rows * dtype.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.asarray(arrays[column], dtype=dtype)[order].tobytes())
+            self._write_meta(path, rows + len(dates), version)
+            return True
+
+    def invalidate(self, ticker: str) -> None:
+        """銘柄のキャッシュを破棄する"""
+        with self._lock(ticker):
+            shutil.rmtree(self.path(ticker), ignore_errors=True)
+
+
+_cache: PriceColumnCache | None = None
+
+
+def get_price_cache() -> PriceColumnCache | None:
+    """設定された株価カラムキャッシュ（PRICE_CACHE_DIR が未設定なら None）"""
+    global _cache
+    cache_dir = get_settings().price_cache_dir
+    if cache_dir is None:
+        return None
+    if _cache is None or _cache.cache_dir != Path(cache_dir):
+        _cache = PriceColumnCache(cache_dir)
+    return _cache
+
+
+def _frame(arrays: dict[str, np.ndarray], columns: list[str]) -> pd.DataFrame:
+    """マップした配列をそのまま列にした DataFrame（日付は DatetimeIndex）"""
+    df = pd.DataFrame({c: arrays[c] for c in columns}, copy=False)
+    df.index = pd.DatetimeIndex(arrays["date"], name="date")
+    return df
+
+
+def slice_arrays(
+    arrays: dict[str, np.ndarray],
+    limit: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    latest: bool = False,
+) -> dict[str, np.ndarray]:
+    """
+    期間・件数で絞り込んだスライス（コピーしない）。
+
+    件数は load_price_frame と同じく古い日付から（latest=True なら新しい日付から）数える。
+    """
+    dates = arrays["date"]
+    lo, hi = 0, len(dates)
+    if start is not None:
+        lo = int(np.searchsorted(dates, np.datetime64(start, "D"), side="left"))
+    if end is not None:
+        hi = int(np.searchsorted(dates, np.datetime64(end, "D"), side="right"))
+    if limit is not None:
+        if latest:
+            lo = max(lo, hi - limit)
+        else:
+            hi = min(hi, lo + limit)
+    return {c: a[lo:hi] for c, a in arrays.items()}
+
+
+async def load_cached_price_arrays(
+    db: AsyncSession,
+    ticker: str,
+    stock_id: int,
+    limit: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    latest: bool = False,
+) -> dict[str, np.ndarray] | None:
+    """
+    株価カラムキャッシュから列ごとの配列を読み出す（リードスルー）。
+
+    キャッシュがない・古い場合は DB から全履歴を読んで作り直す。
+    キャッシュが無効（PRICE_CACHE_DIR 未設定）なら None を返す。
+    limit / latest は slice_arrays と同じ。
+    """
+    cache = get_price_cache()
+    if cache is None:
+        return None
+    version = await get_data_version(db, prices_scope(ticker))
+    arrays = cache.read(ticker) if cache.version(ticker) == version else None
+    record_cache("price_columns", hit=arrays is not None)
+    if arrays is None:
+        df = await load_price_frame(db, stock_id)
+        arrays = {"date": df.index.to_numpy(dtype=DTYPES["date"])}
+        arrays.update((c, df[c].to_numpy()) for c in PRICE_COLUMNS)
+        try:
+            await asyncio.to_thread(cache.write, ticker, arrays, version)
+        except OSError as e:
+            logger.warning("株価キャッシュ書き込み失敗: ticker=%s, %s", ticker, e)
+    return slice_arrays(arrays, limit=limit, start=start, end=end, latest=latest)
+
+
+async def load_cached_price_frame(
+    db: AsyncSession,
+    ticker: str,
+    stock_id: int,
+    limit: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    columns: list[str] | None = None,
+    latest: bool = False,
+) -> pd.DataFrame:
+    """
+    株価を日付昇順の DataFrame（float64）として読み出す。
+
+    キャッシュが有効なら列ファイルをマップした配列をコピーせずに列にする（インデックスは
+    DatetimeIndex）。無効なら services.price_loader.load_price_frame と同じく DB から読む。
+    """
+    columns = columns or list(PRICE_COLUMNS)
+    arrays = await load_cached_price_arrays(
+        db, ticker, stock_id, limit=limit, start=start, end=end, latest=latest
+    )
+    if arrays is None:
+        return await load_price_frame(
+            db, stock_id, limit=limit, start=start, end=end, columns=columns, latest=latest
+        )
+    return _frame(arrays, columns)
+
+
+async def append_price_bars(ticker: str, bars: list[dict], version: int) -> None:
+    """
+    コレクターが保存した日足をキャッシュに追記する（キャッシュが無効・未作成なら何もしない）。
+
+    取り込みのコミット後に呼ぶ（コミット前に追記すると、ロールバック時に DB にない行が残る）。
+
+    Args:
+        ticker: 銘柄コード
+        bars: date / open / high / low / close / volume の dict
+        version: 保存後の株価のデータバージョン
+    """
+    cache = get_price_cache()
+    if cache is None or not bars:
+        return
+    arrays = {"date": np.array([b["date"] for b in bars], dtype=DTYPES["date"])}
+    arrays.update((c, np.array([b[c] for b in bars], dtype=DTYPES[c])) for c in PRICE_COLUMNS)
+    try:
+        await asyncio.to_thread(cache.append, ticker, arrays, version)
+    except OSError as e:
+        logger.warning("株価キャッシュ追記失敗: ticker=%s, %s", ticker, e)
+        await asyncio.to_thread(cache.invalidate, ticker)
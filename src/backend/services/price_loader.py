@@ -0,0 +1,87 @@
+"""
+株価の高速読み出し
+分析用の float8 列（open_f など）を選択し、Decimal を経由せずに DataFrame / NumPy 配列として返す。
+行ごとの float() 変換がなくなり、列は最初から float64 になる。
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.stock import StockPrice
+
+# 列名 → 選択する列（volume は BIGINT のまま読み、DataFrame 上で float64 にする）
+PRICE_COLUMNS = {
+    "open": StockPrice.open_f,
+    "high": StockPrice.high_f,
+    "low": StockPrice.low_f,
+    "close": StockPrice.close_f,
+    "volume": StockPrice.volume,
+}
+
+
+def price_rows_to_frame(rows: list, columns: list[str]) -> pd.DataFrame:
+    """(日付, 値...) の行を date をインデックスとした float64 の DataFrame にする"""
+    if not rows:
+        return pd.DataFrame(columns=columns, dtype="float64").rename_axis("date")
+    df = pd.DataFrame.from_records(rows, columns=["date", *columns], index="date", coerce_float=True)
+    return df.astype("float64", copy=False)
+
+
+async def load_price_frame(
+    db: AsyncSession,
+    stock_id: int,
+    limit: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    columns: list[str] | None = None,
+    latest: bool = False,
+) -> pd.DataFrame:
+    """
+    株価を日付昇順の DataFrame（float64）として読み出す。
+
+    Args:
+        db: データベースセッション
+        stock_id: 銘柄 ID
+        limit: 読み出す件数の上限（古い日付から。latest=True なら新しい日付から）
+        start: 開始日（含む）
+        end: 終了日（含む）
+        columns: 読み出す列（既定は open / high / low / close / volume）
+        latest: 直近 limit 件を読む（日付の降順で limit 件を読み、昇順に戻す）
+
+    Returns:
+        pd.DataFrame: date をインデックスとした DataFrame
+    """
+    columns = columns or list(PRICE_COLUMNS)
+    stmt = (
+        select(StockPrice.price_date, *(PRICE_COLUMNS[c] for c in columns))
+        .where(StockPrice.stock_id == stock_id)
+        .order_by(StockPrice.price_date.desc() if latest else StockPrice.price_date.asc())
+    )
+    if start is not None:
+        stmt = stmt.where(StockPrice.price_date >= start)
+    if end is not None:
+        stmt = stmt.where(StockPrice.price_date <= end)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = (await db.execute(stmt)).all()
+    if latest:
+        rows.reverse()
+    return price_rows_to_frame(rows, columns)
+
+
+async def load_price_arrays(
+    db: AsyncSession,
+    stock_id: int,
+    limit: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    columns: list[str] | None = None,
+) -> dict[str, np.ndarray]:
+    """株価を列ごとの NumPy 配列（date は datetime64[D]、他は float64）として読み出す"""
+    df = await load_price_frame(db, stock_id, limit=limit, start=start, end=end, columns=columns)
+    arrays = {"date": df.index.to_numpy(dtype="datetime64[D]")}
+    arrays.update((c, df[c].to_numpy()) for c in df.columns)
+    return arrays
@@ -0,0 +1,201 @@
+"""
+リアルタイム配信（プロセス内 Pub/Sub）
+コレクターや予測処理が銘柄ごとの更新（新しい足・最新のテクニカル指標・予測）を publish し、
+Server-Sent Events で購読しているクライアントへ配信する。
+
+大量接続に向けた設計:
+- イベントは publish 時に 1 回だけ SSE フレームへシリアライズし、全購読者で同じ bytes を共有する
+- 購読者ごとのキューは上限付きで、publish は put_nowait のみ（遅いクライアントが配信側を待たせない）
+- キューがあふれた購読者は溜まったイベントを捨て、"resync" イベントで REST からの再取得を促す
+"""
+import asyncio
+import itertools
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from typing import Any
+
+import orjson
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from analyzers.technical import calculate_technical_indicators
+from core.config import get_settings
+from schemas.analysis import TECHNICAL_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# イベント種別
+BAR = "bar"
+INDICATORS = "indicators"
+PREDICTION = "prediction"
+RESYNC = "resync"
+
+# 配信する最新指標の計算に使う株価の件数（SMA_200 が埋まる長さ）
+TECHNICAL_LIMIT = 300
+
+
+def format_event(event: str, data: Any, event_id: int | None = None) -> bytes:
+    """SSE フレームを組み立てる"""
+    head = f"event: {event}\n" + (f"id: {event_id}\n" if event_id is not None else "")
+    return head.encode() + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+class Subscriber:
+    """1 接続分の購読（上限付きキュー）"""
+
+    def __init__(self, tickers: frozenset[str], queue_size: int):
+        self.tickers = tickers
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def push(self, frame: bytes) -> None:
+        """フレームを積む（あふれたら溜まった分を捨てて resync を積む）"""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(format_event(RESYNC, {"tickers": sorted(self.tickers)}))
+
+    async def frames(self, heartbeat_seconds: float) -> AsyncIterator[bytes]:
+        """フレームを順に返す（一定時間イベントがなければ接続維持用のコメントを返す）"""
+        while True:
+            try:
+                yield await asyncio.wait_for(self.queue.get(), timeout=heartbeat_seconds)
+            except TimeoutError:
+                yield b": ping\n\n"
+
+
+class Broker:
+    """銘柄ごとの購読者への配信"""
+
+    def __init__(self, queue_size: int = 100, max_subscribers: int = 5000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._topics: defaultdict[str, set[Subscriber]] = defaultdict(set)
+        self._subscribers: set[Subscriber] = set()
+        self._ids = itertools.count(1)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def has_subscribers(self, ticker: str) -> bool:
+        """銘柄の購読者がいるか（配信内容の計算を省くために使う）"""
+        return bool(self._topics.get(ticker))
+
+    def publish(self, ticker: str, event: str, data: Any) -> int:
+        """
+        銘柄の購読者にイベントを配信する（待たずに返る）。
+
+        Returns:
+            int: 配信した購読者数
+        """
+        subscribers = self._topics.get(ticker)
+        if not subscribers:
+            return 0
+        frame = format_event(event, {"ticker": ticker, **data}, next(self._ids))
+        for subscriber in subscribers:
+            subscriber.push(frame)
+        return len(subscribers)
+
+    def add(self, tickers: Iterable[str]) -> Subscriber:
+        """
+        購読者を登録する（解除は remove）。
+
+        Raises:
+            OverflowError: 購読者数が上限に達している場合
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise OverflowError("リアルタイム配信の接続数が上限に達しています")
+        subscriber = Subscriber(frozenset(tickers), self.queue_size)
+        self._subscribers.add(subscriber)
+        for ticker in subscriber.tickers:
+            self._topics[ticker].add(subscriber)
+        return subscriber
+
+    def remove(self, subscriber: Subscriber) -> None:
+        """購読を解除する（解除済みなら何もしない）"""
+        if subscriber not in self._subscribers:
+            return
+        self._subscribers.discard(subscriber)
+        for ticker in subscriber.tickers:
+            topic = self._topics.get(ticker)
+            if topic is not None:
+                topic.discard(subscriber)
+                if not topic:
+                    del self._topics[ticker]
+        if subscriber.dropped:
+            logger.info("購読解除: 配信しきれなかったイベント %d 件", subscriber.dropped)
+
+    @asynccontextmanager
+    async def subscribe(self, tickers: Iterable[str]) -> AsyncIterator[Subscriber]:
+        """
+        銘柄を購読する（抜けると購読を解除する）。
+
+        Raises:
+            OverflowError: 購読者数が上限に達している場合
+        """
+        subscriber = self.add(tickers)
+        try:
+            yield subscriber
+        finally:
+            self.remove(subscriber)
+
+
+async def event_stream(
+    broker: Broker, subscriber: Subscriber, heartbeat_seconds: float
+) -> AsyncIterator[bytes]:
+    """
+    SSE のレスポンス本体（切断でジェネレーターが閉じられると購読を解除する）。
+
+    購読者はレスポンスを返す前に Broker.add で登録しておく（上限超過を 503 で返すため）。
+    """
+    try:
+        # 切断時のクライアントの再接続間隔（ミリ秒）
+        yield b"retry: 3000\n\n"
+        async for frame in subscriber.frames(heartbeat_seconds):
+            yield frame
+    finally:
+        broker.remove(subscriber)
+
+
+async def publish_price_update(db: AsyncSession, ticker: str, bars: list[dict]) -> None:
+    """
+    新しい足と、それを反映した最新のテクニカル指標を配信する。
+
+    取り込みのコミット後に呼ぶ（ロールバックされた足や、コミット前の指標を配信しない）。
+    指標の計算は購読者がいる場合のみ行い、失敗しても取り込み処理は止めない。
+    """
+    broker = get_broker()
+    if not bars or not broker.has_subscribers(ticker):
+        return
+    broker.publish(ticker, BAR, {"bars": bars})
+
+    try:
+        df = await calculate_technical_indicators(db, ticker, limit=TECHNICAL_LIMIT)
+    except Exception as e:
+        logger.warning("配信用の指標計算失敗: ticker=%s, %s", ticker, e)
+        return
+    if df.empty:
+        return
+    latest = df.reindex(columns=TECHNICAL_COLUMNS).iloc[-1]
+    indicators = {k: (None if pd.isna(v) else float(v)) for k, v in latest.items()}
+    broker.publish(
+        ticker, INDICATORS, {"date": pd.Timestamp(df.index[-1]).date(), **indicators}
+    )
+
+
+_broker: Broker | None = None
+
+
+def get_broker() -> Broker:
+    """プロセス共通のブローカーを返す"""
+    global _broker
+    if _broker is None:
+        settings = get_settings()
+        _broker = Broker(settings.realtime_queue_size, settings.realtime_max_connections)
+    return _broker
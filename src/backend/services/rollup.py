@@ -0,0 +1,148 @@
+"""
+株価の週足・月足ロールアップ
+取り込んだ日足を期間（週は月曜始まり、月は 1 日始まり）ごとに集計し、stock_price_rollups の
+該当期間の行だけを UPSERT で更新する。読み取り側は日足を毎回集計せずにロールアップを読む。
+"""
+from datetime import date, timedelta
+
+import pandas as pd
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.stock import StockPriceRollup
+from services.price_loader import price_rows_to_frame
+
+# ロールアップを持つ粒度（"day" は stock_prices をそのまま読む）
+GRANULARITIES = ("week", "month")
+
+# 粒度ごとの 1 足あたりのおおよその営業日数（予測の期間を足数に換算する）
+BARS_PER_GRANULARITY = {"day": 1, "week": 5, "month": 21}
+
+_FRAME_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def period_start(day: date, granularity: str) -> date:
+    """日付が属する期間の開始日（週は月曜日、月は 1 日）"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"未対応の粒度です: {granularity}")
+
+
+def aggregate_bars(bars: list[dict], granularity: str) -> list[dict]:
+    """
+    日足（date / open / high / low / close / volume の dict）を期間ごとに集計する。
+
+    Returns:
+        list[dict]: stock_price_rollups の 1 行分の値（period_start の昇順）
+    """
+    periods: dict[date, dict] = {}
+    for bar in sorted(bars, key=lambda b: b["date"]):
+        start = period_start(bar["date"], granularity)
+        row = periods.get(start)
+        if row is None:
+            periods[start] = {
+                "granularity": granularity,
+                "period_start": start,
+                "first_date": bar["date"],
+                "last_date": bar["date"],
+                "open": bar["open"],
+                "high": bar["high"],
+                "low": bar["low"],
+                "close": bar["close"],
+                "volume": int(bar["volume"]),
+                "day_count": 1,
+            }
+            continue
+        row["last_date"] = bar["date"]
+        row["high"] = max(row["high"], bar["high"])
+        row["low"] = min(row["low"], bar["low"])
+        row["close"] = bar["close"]
+        row["volume"] += int(bar["volume"])
+        row["day_count"] += 1
+    return list(periods.values())
+
+
+async def apply_bars_to_rollups(db: AsyncSession, stock_id: int, bars: list[dict]) -> None:
+    """
+    新しく保存した日足を週足・月足に反映する（影響する期間の行だけを更新）。
+
+    既存の行とは、始値は最初の取引日が早い方、終値は最後の取引日が遅い方を採り、
+    高値・安値は最大・最小、出来高と日数は加算してマージする。
+    同じ日足を 2 回渡すと出来高が二重に加算されるため、保存済みでない日足だけを渡すこと。
+    """
+    if not bars:
+        return
+    dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+    table = StockPriceRollup.__table__
+    for granularity in GRANULARITIES:
+        rows = [{"stock_id": stock_id, **row} for row in aggregate_bars(bars, granularity)]
+        stmt = dialect.insert(StockPriceRollup).values(rows)
+        new = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.stock_id, table.c.granularity, table.c.period_start],
+            set_={
+                "open": case((new.first_date < table.c.first_date, new.open), else_=table.c.open),
+                "close": case((new.last_date > table.c.last_date, new.close), else_=table.c.close),
+                "high": case((new.high > table.c.high, new.high), else_=table.c.high),
+                "low": case((new.low < table.c.low, new.low), else_=table.c.low),
+                "first_date": case(
+                    (new.first_date < table.c.first_date, new.first_date),
+                    else_=table.c.first_date,
+                ),
+                "last_date": case(
+                    (new.last_date > table.c.last_date, new.last_date),
+                    else_=table.c.last_date,
+                ),
+                "volume": table.c.volume + new.volume,
+                "day_count": table.c.day_count + new.day_count,
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+
+
+async def load_rollup_frame(
+    db: AsyncSession,
+    stock_id: int,
+    granularity: str,
+    limit: int | None = None,
+    latest: bool = False,
+) -> pd.DataFrame:
+    """
+    週足・月足を期間開始日の昇順の DataFrame（float64）として読み出す。
+
+    Args:
+        db: データベースセッション
+        stock_id: 銘柄 ID
+        granularity: "week" または "month"
+        limit: 読み出す件数の上限（古い期間から。latest=True なら新しい期間から）
+        latest: 直近 limit 件を読む（期間開始日の降順で limit 件を読み、昇順に戻す）
+
+    Returns:
+        pd.DataFrame: 期間開始日（date）をインデックスとした open / high / low / close / volume
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"未対応の粒度です: {granularity}")
+    stmt = (
+        select(
+            StockPriceRollup.period_start,
+            *(getattr(StockPriceRollup, c) for c in _FRAME_COLUMNS),
+        )
+        .where(
+            StockPriceRollup.stock_id == stock_id,
+            StockPriceRollup.granularity == granularity,
+        )
+        .order_by(
+            StockPriceRollup.period_start.desc() if latest else StockPriceRollup.period_start.asc()
+        )
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = (await db.execute(stmt)).all()
+    if latest:
+        rows.reverse()
+    return price_rows_to_frame(rows, _FRAME_COLUMNS)
+
@@ -0,0 +1,74 @@
+"""
+銘柄スクリーニング
+リフレッシャーが共有メモリに置いたユニバース行列（services.universe）の最新の指標を、
+銘柄ごとに DB を読まずにまとめて条件で絞り込む。
+"""
+import numpy as np
+
+from services.universe import UNIVERSE_INDICATORS, UniverseMatrix
+
+_RSI = UNIVERSE_INDICATORS.index("RSI_14")
+_SMA_200 = UNIVERSE_INDICATORS.index("SMA_200")
+
+
+def _latest(values: np.ndarray) -> np.ndarray:
+    """銘柄ごとの最後の欠損でない値（株価が 1 件もなければ NaN）"""
+    if values.shape[1] == 0:
+        return np.full(len(values), np.nan)
+    valid = ~np.isnan(values)
+    last = values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    latest = values[np.arange(len(values)), last]
+    return np.where(valid.any(axis=1), latest, np.nan)
+
+
+def screen_universe(
+    matrix: UniverseMatrix,
+    rsi_min: float | None = None,
+    rsi_max: float | None = None,
+    above_sma_200: bool | None = None,
+    min_volume: float | None = None,
+    limit: int = 50,
+) -> tuple[int, list[dict]]:
+    """
+    ユニバース行列の銘柄を最新の指標で絞り込む（条件に使う値が欠損の銘柄は除く）。
+
+    Args:
+        matrix: get_universe の結果
+        rsi_min: RSI_14 の下限（含む）
+        rsi_max: RSI_14 の上限（含む）
+        above_sma_200: True なら終値が SMA_200 より上、False なら下の銘柄
+        min_volume: 最新の出来高の下限（含む）
+        limit: 返す件数の上限（銘柄コード順）
+
+    Returns:
+        tuple[int, list[dict]]: (条件に一致した銘柄数, 銘柄ごとの ticker / close / volume / 指標)
+    """
+    indicators = matrix.indicators
+    close = _latest(matrix.close)
+    volume = _latest(matrix.volume)
+
+    mask = np.ones(len(matrix.tickers), dtype=bool)
+    rsi = indicators[:, _RSI]
+    if rsi_min is not None:
+        mask &= rsi >= rsi_min
+    if rsi_max is not None:
+        mask &= rsi <= rsi_max
+    if above_sma_200 is not None:
+        sma_200 = indicators[:, _SMA_200]
+        mask &= close > sma_200 if above_sma_200 else close < sma_200
+    if min_volume is not None:
+        mask &= volume >= min_volume
+
+    rows = np.flatnonzero(mask)
+    results = []
+    for row in rows[:limit]:
+        values = np.where(np.isnan(indicators[row]), None, indicators[row]).tolist()
+        results.append(
+            {
+                "ticker": str(matrix.tickers[row]),
+                "close": None if np.isnan(close[row]) else float(close[row]),
+                "volume": None if np.isnan(volume[row]) else float(volume[row]),
+                **dict(zip(UNIVERSE_INDICATORS, values, strict=True)),
+            }
+        )
+    return len(rows), results
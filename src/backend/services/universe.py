@@ -0,0 +1,412 @@
+"""
+ユニバース価格行列（共有メモリ）
+アクティブな全銘柄の終値・出来高（銘柄 × 日付の float64 行列）と最新のテクニカル指標を
+multiprocessing.shared_memory のセグメントに置き、同じホストの uvicorn ワーカーで共有する。
+スクリーニング（services.screening / GET /api/v1/screening）でワーカーごとにユニバース全体を
+読み込まないようにする。
+
+- 書き込みは 1 つのリフレッシャープロセスだけが行う（ロックファイルで多重起動を防ぐ）
+- リフレッシャーはバージョンごとに新しいセグメント（<名前>_<バージョン>）を作って書き込み、書き終えて
+  から制御セグメント（<名前>）のバージョン番号を書き換える。読み出し側は番号が変わったら新しい
+  セグメントに付け替えるため、書き込み途中の行列を読むことはない
+- ワーカーは読み取り専用の配列としてアタッチする（プロセス数が増えてもメモリは 1 組分）
+
+リフレッシャーはワーカーとは別のプロセスとして動かす（ワーカーの lifespan からは起動しない）。
+本番は start.sh が UNIVERSE_ENABLED のとき同じコンテナで起動し、docker-compose では
+universe-refresher サービスが backend と IPC 名前空間を共有して動く:
+    python -m services.universe
+"""
+import argparse
+import asyncio
+import contextlib
+import fcntl
+import logging
+import sys
+import time
+from datetime import timedelta
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.database import read_session
+from core.lazy import is_available
+from models.stock import Stock, StockPrice
+
+logger = logging.getLogger(__name__)
+
+# 共有する最新の指標（analyzers.technical が計算する列）
+UNIVERSE_INDICATORS = [
+    "SMA_20",
+    "SMA_50",
+    "SMA_200",
+    "RSI_14",
+    "MACD_12_26_9",
+    "MACDh_12_26_9",
+    "MACDs_12_26_9",
+    "BBU_20_2.0",
+    "BBM_20_2.0",
+    "BBL_20_2.0",
+]
+
+# セグメントのレイアウトの版（変えたら読み出し側は古いセグメントを使わない）
+_LAYOUT_VERSION = 1
+_ALIGN = 64
+_CONTROL_SIZE = 16  # int64 x 2: [バージョン, レイアウトの版]
+
+
+def _layout(stocks: int, days: int, indicators: int) -> tuple[list[tuple], int]:
+    """(名前, dtype, 形状, オフセット) の一覧とセグメントの総バイト数"""
+    fields = [
+        ("header", np.dtype("<i8"), (4,)),
+        ("tickers", np.dtype("<U20"), (stocks,)),
+        ("dates", np.dtype("<M8[D]"), (days,)),
+        ("close", np.dtype("<f8"), (stocks, days)),
+        ("volume", np.dtype("<f8"), (stocks, days)),
+        ("indicators", np.dtype("<f8"), (stocks, indicators)),
+    ]
+    layout, offset = [], 0
+    for name, dtype, shape in fields:
+        layout.append((name, dtype, shape, offset))
+        size = dtype.itemsize * int(np.prod(shape))
+        offset += -(-size // _ALIGN) * _ALIGN
+    return layout, max(offset, _ALIGN)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    既存のセグメントにアタッチする。
+
+    アタッチしただけのプロセスも resource_tracker に登録され、そのプロセスの終了時にセグメントが
+    削除されてしまうため追跡させない（削除はリフレッシャーだけが行う）。Python 3.13 以降は track=False、
+    それより前は登録を外す。
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    _untrack(shm)
+    return shm
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """プロセス終了時に resource_tracker がセグメントを削除しないようにする"""
+    with contextlib.suppress(Exception):
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+
+
+def _view(buf: memoryview, dtype: np.dtype, shape: tuple, offset: int = 0) -> np.ndarray:
+    """バッファ上の配列のビュー（np.frombuffer は配列がある間バッファを保持する）"""
+    count = int(np.prod(shape))
+    return np.frombuffer(buf, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+
+def _segment_name(base: str, version: int) -> str:
+    return f"{base}_{version}"
+
+
+class UniverseMatrix:
+    """共有メモリ上のユニバース行列（読み取り専用のビュー）"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, version: int):
+        self.version = version
+        buf = shm.buf
+        header = _view(buf, np.dtype("<i8"), (4,))
+        layout_version, stocks, days, indicators = (int(v) for v in header)
+        if layout_version != _LAYOUT_VERSION or indicators != len(UNIVERSE_INDICATORS):
+            raise ValueError(f"ユニバース行列のレイアウトが一致しません: version={version}")
+        arrays = {}
+        for name, dtype, shape, offset in _layout(stocks, days, indicators)[0]:
+            array = _view(buf, dtype, shape, offset)
+            array.flags.writeable = False
+            arrays[name] = array
+        self.tickers: np.ndarray = arrays["tickers"]
+        self.dates: np.ndarray = arrays["dates"]
+        self.close: np.ndarray = arrays["close"]
+        self.volume: np.ndarray = arrays["volume"]
+        self.indicators: np.ndarray = arrays["indicators"]
+        self.index: dict[str, int] = {str(t): i for i, t in enumerate(self.tickers)}
+        # 配列より後に持たせる（破棄時に配列が先に解放され、セグメントを閉じられるようにする）
+        self.shm = shm
+
+    def row(self, ticker: str) -> int | None:
+        """銘柄の行番号（ユニバースになければ None）"""
+        return self.index.get(ticker)
+
+    def close_series(self, ticker: str) -> pd.Series | None:
+        """銘柄の終値の系列（日付インデックス、コピーしない）"""
+        row = self.row(ticker)
+        if row is None:
+            return None
+        index = pd.DatetimeIndex(self.dates, name="date")
+        return pd.Series(self.close[row], index=index, name=ticker, copy=False)
+
+    def indicator_frame(self) -> pd.DataFrame:
+        """銘柄 × 最新の指標の DataFrame（スクリーニング用、コピーしない）"""
+        return pd.DataFrame(
+            self.indicators,
+            index=pd.Index(self.tickers, name="ticker"),
+            columns=UNIVERSE_INDICATORS,
+            copy=False,
+        )
+
+
+class UniverseReader:
+    """
+    ワーカー側のアタッチ状態。
+
+    制御セグメントのバージョンが変わったときだけ新しいセグメントに付け替える。
+    古い版は close() で閉じる。その配列を参照しているコードが残っていて閉じられない
+    （BufferError）版は手元に残し、次の付け替えのときに閉じ直す。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._control: shared_memory.SharedMemory | None = None
+        self._current: UniverseMatrix | None = None
+        self._retired: list[shared_memory.SharedMemory] = []
+
+    def _control_version(self) -> int | None:
+        if self._control is None:
+            try:
+                self._control = _attach(self.name)
+            except FileNotFoundError:
+                return None
+        version, layout_version = _view(self._control.buf, np.dtype("<i8"), (2,)).tolist()
+        if layout_version != _LAYOUT_VERSION or version == 0:
+            return None
+        return version
+
+    def get(self) -> UniverseMatrix | None:
+        """最新のユニバース行列（リフレッシャーがまだ書き込んでいなければ None）"""
+        version = self._control_version()
+        if version is None or (self._current is not None and self._current.version == version):
+            return self._current
+        try:
+            shm = _attach(_segment_name(self.name, version))
+        except FileNotFoundError as e:
+            # 付け替えの直後に次の版へ入れ替わった場合などは、手元の版を使い続ける
+            logger.debug("ユニバース行列へのアタッチ失敗: version=%d, %s", version, e)
+            return self._current
+        try:
+            matrix = UniverseMatrix(shm, version)
+        except ValueError as e:
+            logger.debug("ユニバース行列へのアタッチ失敗: version=%d, %s", version, e)
+            self._retired.append(shm)
+            return self._current
+        if self._current is not None:
+            self._retired.append(self._current.shm)
+        self._current = matrix
+        self._close_retired()
+        return self._current
+
+    def _close_retired(self) -> None:
+        """古い版のうち、配列の参照がなくなったものを閉じる"""
+        still_used = []
+        for shm in self._retired:
+            try:
+                shm.close()
+            except BufferError:
+                still_used.append(shm)
+        self._retired = still_used
+
+
+_reader: UniverseReader | None = None
+
+
+def get_universe() -> UniverseMatrix | None:
+    """このワーカーから見た最新のユニバース行列（UNIVERSE_ENABLED が無効・未作成なら None）"""
+    global _reader
+    settings = get_settings()
+    if not settings.universe_enabled:
+        return None
+    if _reader is None or _reader.name != settings.universe_shm_name:
+        _reader = UniverseReader(settings.universe_shm_name)
+    return _reader.get()
+
+
+# =============================================================================
+# リフレッシャー（書き込み側）
+# =============================================================================
+
+
+async def load_universe(db: AsyncSession, lookback_days: int) -> dict[str, np.ndarray]:
+    """
+    アクティブな全銘柄の終値・出来高を 1 クエリで読み、pivot で銘柄 × 日付の行列にそろえる。
+
+    日付軸は最新の取引日から lookback_days 日（暦日）前までのいずれかの銘柄に株価がある日。
+    株価がない日は NaN。
+    """
+    ticker_result = await db.execute(
+        select(Stock.ticker).where(Stock.is_active.is_(True)).order_by(Stock.ticker)
+    )
+    tickers = list(ticker_result.scalars())
+    latest = (await db.execute(select(func.max(StockPrice.price_date)))).scalar_one_or_none()
+    rows = []
+    if tickers and latest is not None:
+        result = await db.execute(
+            select(Stock.ticker, StockPrice.price_date, StockPrice.close_f, StockPrice.volume)
+            .join(Stock, Stock.id == StockPrice.stock_id)
+            .where(
+                Stock.is_active.is_(True),
+                StockPrice.price_date >= latest - timedelta(days=lookback_days),
+            )
+        )
+        rows = result.all()
+    df = pd.DataFrame.from_records(rows, columns=["ticker", "date", "close", "volume"])
+    close = df.pivot(index="ticker", columns="date", values="close").reindex(tickers)
+    volume = df.pivot(index="ticker", columns="date", values="volume").reindex(
+        index=tickers, columns=close.columns
+    )
+    return {
+        "tickers": np.asarray(tickers, dtype="<U20"),
+        "dates": np.asarray(close.columns, dtype="<M8[D]"),
+        "close": close.to_numpy(dtype="<f8"),
+        "volume": volume.to_numpy(dtype="<f8"),
+    }
+
+
+def latest_indicators(close: np.ndarray) -> np.ndarray:
+    """銘柄ごとの終値から最新のテクニカル指標（銘柄 × UNIVERSE_INDICATORS）を計算する"""
+    result = np.full((len(close), len(UNIVERSE_INDICATORS)), np.nan)
+    if not is_available("pandas_ta"):
+        logger.warning("pandas_ta がインストールされていないため、ユニバースの指標は NaN になります")
+        return result
+
+    from analyzers.technical import add_indicators
+
+    for row, values in enumerate(close):
+        series = pd.Series(values).dropna()
+        if series.empty:
+            continue
+        df = add_indicators(pd.DataFrame({"close": series}))
+        result[row] = df.reindex(columns=UNIVERSE_INDICATORS).iloc[-1].to_numpy(dtype="<f8")
+    return result
+
+
+class UniverseWriter:
+    """リフレッシャーが持つ書き込み側の状態（制御セグメントと現在の版）"""
+
+    def __init__(self, name: str):
+        self.name = name
+        try:
+            self._control = _attach(name)
+        except FileNotFoundError:
+            control = shared_memory.SharedMemory(name=name, create=True, size=_CONTROL_SIZE)
+            # 制御セグメントはリフレッシャーの再起動をまたいで残す（バージョンを単調増加にする）
+            _untrack(control)
+            _view(control.buf, np.dtype("<i8"), (2,))[:] = 0
+            self._control = control
+        self._state = _view(self._control.buf, np.dtype("<i8"), (2,))
+        self._segment: shared_memory.SharedMemory | None = None
+
+    @property
+    def version(self) -> int:
+        return int(self._state[0])
+
+    def publish(self, data: dict[str, np.ndarray]) -> int:
+        """新しい版のセグメントに書き込んでから制御セグメントを切り替え、古い版を削除する"""
+        stocks, days = data["close"].shape
+        layout, size = _layout(stocks, days, len(UNIVERSE_INDICATORS))
+        version = self.version + 1
+        name = _segment_name(self.name, version)
+        with contextlib.suppress(FileNotFoundError):
+            # 前回のリフレッシャーが書きかけで終了した版
+            _attach(name).unlink()
+        segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        values = {
+            **data,
+            "header": np.array([_LAYOUT_VERSION, stocks, days, len(UNIVERSE_INDICATORS)]),
+        }
+        for field, dtype, shape, offset in layout:
+            _view(segment.buf, dtype, shape, offset)[...] = values[field]
+
+        # 書き終えてから版を切り替える（読み出し側は版の番号を見て付け替える）
+        self._state[1] = _LAYOUT_VERSION
+        self._state[0] = version
+        previous, self._segment = self._segment, segment
+        if previous is not None:
+            previous.close()
+            previous.unlink()
+        return version
+
+    def close(self) -> None:
+        """現在の版を削除する（制御セグメントは残す）"""
+        if self._segment is not None:
+            self._segment.close()
+            self._segment.unlink()
+            self._segment = None
+        del self._state
+        self._control.close()
+
+
+async def refresh_universe(writer: UniverseWriter, lookback_days: int) -> int:
+    """DB からユニバースを読み直して新しい版を公開する"""
+    start = time.perf_counter()
+    async with read_session() as db:
+        data = await load_universe(db, lookback_days)
+    data["indicators"] = await asyncio.to_thread(latest_indicators, data["close"])
+    version = writer.publish(data)
+    logger.info(
+        "ユニバース行列を更新: version=%d, stocks=%d, days=%d, %.1fs",
+        version,
+        len(data["tickers"]),
+        len(data["dates"]),
+        time.perf_counter() - start,
+    )
+    return version
+
+
+async def _refresh_loop(name: str, interval: float, lookback_days: int) -> None:
+    writer = UniverseWriter(name)
+    try:
+        while True:
+            try:
+                await refresh_universe(writer, lookback_days)
+            except Exception:
+                logger.exception("ユニバース行列の更新に失敗しました")
+            await asyncio.sleep(interval)
+    finally:
+        writer.close()
+
+
+def run_refresher() -> None:
+    """リフレッシャープロセスの本体（設定された間隔でユニバース行列を更新し続ける）"""
+    from core.logging import setup_logging
+
+    setup_logging()
+    settings = get_settings()
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(
+            _refresh_loop(
+                settings.universe_shm_name,
+                settings.universe_refresh_interval_seconds,
+                settings.universe_lookback_days,
+            )
+        )
+
+
+def _try_lock(path: str):
+    """リフレッシャーを起動する権利（ロックファイル）を取る。取れなければ None"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    lock_file = open(path, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.parse_args()
+    lock = _try_lock(get_settings().universe_lock_file)
+    if lock is None:
+        raise SystemExit("別のリフレッシャーが実行中です")
+    run_refresher()
@@ -0,0 +1,216 @@
+"""
+起動時ウォームアップ
+lifespan からバックグラウンドで実行し、初回リクエストが払うコストを事前に済ませる。
+
+- database: DB 接続プールの接続を事前に開く
+- sentiment: FinBERT をロードして 1 回推論する
+- lightgbm: LightGBM をロードし、学習済みブースターをレジストリに登録する
+- indicators: よく参照される銘柄のテクニカル指標を計算してキャッシュする
+
+進捗は /ready で公開し、全ステップ完了までロードバランサーにトラフィックを流させない。
+warmup_timeout_seconds を超えたら未完了のステップを失敗扱いにして打ち切る
+（インフラ側のヘルスチェック猶予期間はこの時間に合わせる）。
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from sqlalchemy import text
+
+from core.config import get_settings
+from core.database import engine, read_engine, read_session
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# 参照回数（ウォームアップ対象銘柄の選定に使用し、終了時にファイルへ保存する）
+ticker_popularity: Counter[str] = Counter()
+
+# 参照回数を持つ銘柄数の上限（超えたら参照回数の上位だけを残す）
+POPULARITY_MAX_TICKERS = 1000
+
+
+def _prune_popularity() -> None:
+    # 上限の 2 倍まで溜めてから間引き、記録のたびに並べ替えないようにする
+    if len(ticker_popularity) > 2 * POPULARITY_MAX_TICKERS:
+        top = ticker_popularity.most_common(POPULARITY_MAX_TICKERS)
+        ticker_popularity.clear()
+        ticker_popularity.update(dict(top))
+
+
+def record_ticker_request(ticker: str) -> None:
+    """銘柄の参照回数を記録する（登録済みの銘柄であることを確認してから呼ぶ）"""
+    ticker_popularity[ticker] += 1
+    _prune_popularity()
+
+
+def load_popularity(path: str | Path) -> None:
+    """前回プロセスの参照回数を読み込む"""
+    try:
+        with Path(path).open(encoding="utf-8") as f:
+            ticker_popularity.update(json.load(f))
+        _prune_popularity()
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning("参照回数の読み込み失敗: %s", e)
+
+
+def save_popularity(path: str | Path) -> None:
+    """参照回数を保存する（一時ファイル経由でアトミックに置き換え）"""
+    try:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(dict(ticker_popularity.most_common(1000)), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("参照回数の保存失敗: %s", e)
+
+
+class WarmupState:
+    """ウォームアップの進捗"""
+
+    def __init__(self, steps: list[str]):
+        self.steps: dict[str, dict] = {name: {"status": PENDING} for name in steps}
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        """全ステップが終了したか（失敗したステップは機能縮退として扱い、待ち続けない）"""
+        return all(step["status"] in (DONE, FAILED) for step in self.steps.values())
+
+    def to_dict(self) -> dict:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.monotonic()) - self.started_at, 3)
+        return {
+            "status": "ready" if self.ready else "warming_up",
+            "elapsed_seconds": elapsed,
+            "steps": self.steps,
+        }
+
+    async def run_step(self, name: str, coro) -> None:
+        """ステップを実行し、状態と所要時間を記録する（例外はログに残して握りつぶす）"""
+        step = self.steps[name]
+        step["status"] = RUNNING
+        start = time.monotonic()
+        try:
+            detail = await coro
+            step["status"] = DONE
+            if detail is not None:
+                step["detail"] = detail
+        except Exception as e:
+            step["status"] = FAILED
+            step["error"] = str(e)
+            logger.warning("ウォームアップ失敗: step=%s, %s", name, e)
+        finally:
+            step["seconds"] = round(time.monotonic() - start, 3)
+
+
+async def _warm_database(connections: int) -> str:
+    """接続プールに接続を作っておく（レプリカを使う場合はその接続プールにも）"""
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+
+    async def ping(target) -> None:
+        async with target.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping(target) for target in engines for _ in range(connections)))
+    return f"{connections} connections x {len(engines)} engines"
+
+
+async def _warm_sentiment() -> str:
+    from analyzers.sentiment import SentimentAnalyzer
+
+    result = await asyncio.to_thread(SentimentAnalyzer.analyze, "Warm-up inference.")
+    return f"label={result['label']}"
+
+
+async def _warm_lightgbm(model_dir: str | None) -> str:
+    from predictors import registry
+
+    # ライブラリのロード（初回の import コスト）
+    await asyncio.to_thread(lambda: registry.lgb.Booster)
+    if not model_dir:
+        return "0 boosters"
+    count = await asyncio.to_thread(registry.load_boosters, model_dir)
+    return f"{count} boosters"
+
+
+async def _warm_indicators(tickers: list[str], limits: list[int]) -> str:
+    from analyzers.technical import calculate_technical_indicators
+
+    warmed = 0
+    async with read_session() as db:
+        for ticker in tickers:
+            for limit in limits:
+                try:
+                    await calculate_technical_indicators(db, ticker, limit=limit)
+                    warmed += 1
+                except ValueError:
+                    # 登録されていない銘柄はスキップ
+                    break
+    return f"{warmed} entries"
+
+
+def select_tickers() -> list[str]:
+    """指標を事前計算する銘柄（固定リスト + 参照回数の多い順）"""
+    settings = get_settings()
+    popular = [t for t, _ in ticker_popularity.most_common(settings.warmup_top_tickers)]
+    return list(dict.fromkeys([*settings.warmup_tickers, *popular]))
+
+
+def create_warmup_state() -> WarmupState:
+    """設定に応じたステップでウォームアップ状態を作成する"""
+    settings = get_settings()
+    if not settings.warmup_enabled:
+        return WarmupState([])
+    steps = ["database"]
+    steps += [m for m in ("sentiment", "lightgbm") if m in settings.warmup_models]
+    steps.append("indicators")
+    return WarmupState(steps)
+
+
+async def run_warmup(state: WarmupState) -> None:
+    """ウォームアップを実行する（モデルのロードと DB 系の処理は並行して進める）"""
+    settings = get_settings()
+    state.started_at = time.monotonic()
+    logger.info("ウォームアップ開始: steps=%s", list(state.steps))
+
+    load_popularity(settings.warmup_popularity_file)
+
+    async def database_then_indicators() -> None:
+        await state.run_step("database", _warm_database(settings.warmup_db_connections))
+        await state.run_step(
+            "indicators",
+            _warm_indicators(select_tickers(), settings.warmup_indicator_limits),
+        )
+
+    tasks = [database_then_indicators()]
+    if "sentiment" in state.steps:
+        tasks.append(state.run_step("sentiment", _warm_sentiment()))
+    if "lightgbm" in state.steps:
+        tasks.append(state.run_step("lightgbm", _warm_lightgbm(settings.model_registry_dir)))
+    try:
+        async with asyncio.timeout(settings.warmup_timeout_seconds):
+            await asyncio.gather(*tasks)
+    except TimeoutError:
+        for step in state.steps.values():
+            if step["status"] in (PENDING, RUNNING):
+                step["status"] = FAILED
+                step["error"] = "timeout"
+        logger.warning("ウォームアップ打ち切り: %.1fs", settings.warmup_timeout_seconds)
+
+    state.finished_at = time.monotonic()
+    logger.info("ウォームアップ完了: %.1fs", state.finished_at - state.started_at)
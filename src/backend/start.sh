@@ -0,0 +1,24 @@
+#!/bin/sh
+# =============================================================================
+# 本番コンテナの起動スクリプト
+# =============================================================================
+# UNIVERSE_ENABLED が有効なら、ユニバース行列のリフレッシャー（python -m services.universe）を
+# バックグラウンドで動かしてから uvicorn を起動する。共有メモリ（/dev/shm）は同じコンテナの
+# プロセス間でしか共有できない（Fargate はコンテナ間で IPC 名前空間を共有できない）ため、
+# リフレッシャーは別のコンテナではなくワーカーと同じコンテナで動かす。
+# リフレッシャーが落ちても API は 503 を返すだけなので、コンテナは止めずに再起動し続ける。
+
+case "$(echo "${UNIVERSE_ENABLED:-false}" | tr '[:upper:]' '[:lower:]')" in
+  true | 1 | yes | on)
+    (
+      while true; do
+        python -m services.universe
+        echo "ユニバース行列のリフレッシャーが終了しました。5 秒後に再起動します" >&2
+        sleep 5
+      done
+    ) &
+    ;;
+esac
+
+# workers=2 (メモリに応じて調整)
+exec python -m uvicorn main:app --host 0.0.0.0 --port "${PORT:-8000}" --workers 2
@@ -1,13 +1,106 @@
 """
 テスト共通設定
 """
+from datetime import date, timedelta
+from decimal import Decimal
+
 import pytest
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
+from core import response_cache
+from core.database import get_db, get_read_db, get_read_session_factory, get_session_factory
 from main import app
+from models.base import Base
+from models.data_version import DataVersion
+from models.macro import MacroIndicator
+from models.stock import Stock, StockPrice, StockPriceRollup
+from services.rollup import apply_bars_to_rollups
+
+# sqlite_engine に投入する銘柄と株価の日数
+TICKERS = ["AAPL", "MSFT", "7203.T"]
+PRICE_DAYS = 300
 
 
 @pytest.fixture
 def client() -> TestClient:
     """テスト用 HTTP クライアント"""
     return TestClient(app)
+
+
+@pytest.fixture
+async def sqlite_engine(monkeypatch: pytest.MonkeyPatch):
+    """銘柄と株価を投入したインメモリ SQLite（get_db / get_read_db を差し替え、レスポンスキャッシュは空にする）"""
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setattr(response_cache, "_store", None)
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    tables = [
+        Stock.__table__,
+        StockPrice.__table__,
+        StockPriceRollup.__table__,
+        DataVersion.__table__,
+        MacroIndicator.__table__,
+    ]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        start = date(2024, 1, 1)
+        for ticker in TICKERS:
+            stock = Stock(ticker=ticker, name=ticker, price_count=PRICE_DAYS)
+            session.add(stock)
+            await session.flush()
+            session.add_all(
+                StockPrice(
+                    stock_id=stock.id,
+                    price_date=start + timedelta(days=i),
+                    open=Decimal("100"),
+                    high=Decimal("101"),
+                    low=Decimal("99"),
+                    close=Decimal("100.5"),
+                    volume=1000,
+                )
+                for i in range(PRICE_DAYS)
+            )
+            await apply_bars_to_rollups(
+                session,
+                stock.id,
+                [
+                    {
+                        "date": start + timedelta(days=i),
+                        "open": 100.0,
+                        "high": 101.0,
+                        "low": 99.0,
+                        "close": 100.5,
+                        "volume": 1000,
+                    }
+                    for i in range(PRICE_DAYS)
+                ],
+            )
+        await session.commit()
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_read_session_factory] = lambda: session_factory
+    try:
+        yield engine
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+@pytest.fixture
+async def async_client():
+    """同じイベントループで動く非同期 HTTP クライアント"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
@@ -0,0 +1,54 @@
+"""
+クエリ予算ハーネス
+エンドポイント 1 回の呼び出しで発行された SQL 文の数と、セッション経由の SELECT が返した行数
+（ORM エンティティ・リレーションのロード・Core の列選択をすべて含む）を数える。
+リレーションの暗黙ロードや列選択で履歴テーブルを丸ごと読むような退行をテストで検出するために使う。
+
+    with QueryBudget(engine) as budget:
+        await client.get("/api/v1/stocks")
+    budget.check(statements=2, rows=50)
+"""
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+@dataclass
+class QueryBudget:
+    """SQL 文数・取得行数の計測"""
+
+    engine: AsyncEngine
+    statements: list[str] = field(default_factory=list)
+    rows: int = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def _on_orm_execute(self, state: ORMExecuteState) -> Result | None:
+        # 結果を凍結して行数を数え、同じ行を呼び出し側に返す
+        result = state.invoke_statement()
+        if not getattr(result, "returns_rows", True):
+            return result
+        frozen = result.freeze()
+        self.rows += len(frozen.data)
+        return frozen()
+
+    def __enter__(self) -> "QueryBudget":
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(Session, "do_orm_execute", self._on_orm_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.remove(Session, "do_orm_execute", self._on_orm_execute)
+
+    def check(self, statements: int, rows: int) -> None:
+        """予算を超えていれば AssertionError（発行された SQL を添える）"""
+        detail = "\n".join(self.statements)
+        assert len(self.statements) <= statements, (
+            f"SQL 文数 {len(self.statements)} > 予算 {statements}\n{detail}"
+        )
+        assert self.rows <= rows, f"取得行数 {self.rows} > 予算 {rows}\n{detail}"
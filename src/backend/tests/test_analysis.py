@@ -1,12 +1,21 @@
 """
 分析 API テスト
 """
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
 import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, patch
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from analyzers import technical
+from core.data_version import bump_data_version, prices_scope
 from main import app
+from models.stock import Stock, StockPrice
 
 
 @pytest.fixture
@@ -17,11 +26,13 @@ def client() -> TestClient:
 class TestSentimentAnalysis:
     """センチメント分析 POST /api/v1/analysis/sentiment"""
 
-    def test_sentiment_positive(self, client: TestClient):
-        """ポジティブなテキストで sentiment エンドポイントが正常に動作する"""
-        with patch("analyzers.sentiment.SentimentAnalyzer.analyze") as mock_analyze:
+    async def test_sentiment_positive(self, sqlite_engine, async_client: AsyncClient):
+        """ポジティブなテキストで sentiment エンドポイントが正常に動作する（DB はインメモリ SQLite）"""
+        with patch(
+            "analyzers.sentiment.SentimentAnalyzer.analyze_async", new_callable=AsyncMock
+        ) as mock_analyze:
             mock_analyze.return_value = {"label": "positive", "score": 0.95}
-            resp = client.post(
+            resp = await async_client.post(
                 "/api/v1/analysis/sentiment",
                 json={"text": "Strong earnings beat expectations!"},
             )
@@ -38,6 +49,28 @@ class TestSentimentAnalysis:
         )
         assert resp.status_code == 422
 
+    def test_sentiment_batch(self, client: TestClient):
+        """一括分析は入力順に結果を返す"""
+        with patch("analyzers.sentiment.SentimentAnalyzer.analyze_batch") as mock_batch:
+            mock_batch.side_effect = lambda texts: [
+                {"label": "positive" if "beat" in t else "negative", "score": 0.9} for t in texts
+            ]
+            resp = client.post(
+                "/api/v1/analysis/sentiment/batch",
+                json={"texts": ["Earnings beat", "Guidance cut"]},
+            )
+            assert resp.status_code == 200
+            labels = [r["label"] for r in resp.json()["results"]]
+            assert labels == ["positive", "negative"]
+
+    def test_sentiment_batch_too_many(self, client: TestClient):
+        """501 件以上はバリデーションエラーになる"""
+        resp = client.post(
+            "/api/v1/analysis/sentiment/batch",
+            json={"texts": ["x"] * 501},
+        )
+        assert resp.status_code == 422
+
 
 class TestTechnicalIndicators:
     """テクニカル指標 GET /api/v1/analysis/{ticker}/technical"""
@@ -81,3 +114,75 @@ class TestTechnicalIndicators:
             resp = client.get("/api/v1/analysis/7203.T/technical?days=1")
             assert resp.status_code == 200
             assert isinstance(resp.json(), list)
+
+    def test_technical_columnar(self, client: TestClient):
+        """format=columnar は項目ごとの配列を返し、欠損値は null"""
+        dummy_df = pd.DataFrame(
+            {
+                "open": [100.0, 101.0],
+                "high": [105.0, 106.0],
+                "low": [99.0, 100.0],
+                "close": [103.0, 104.0],
+                "volume": [100000.0, 120000.0],
+                "SMA_20": [float("nan"), 101.5],
+            },
+            index=pd.to_datetime(["2025-01-01", "2025-01-02"]),
+        )
+        with patch("api.v1.analysis.calculate_technical_indicators") as mock_calc:
+            mock_calc.return_value = dummy_df
+            resp = client.get("/api/v1/analysis/7203.T/technical?days=2&format=columnar")
+
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["date"] == ["2025-01-01", "2025-01-02"]
+        assert body["close"] == [103.0, 104.0]
+        assert body["SMA_20"] == [None, 101.5]
+        assert body["RSI_14"] == [None, None]
+
+
+async def _ingest_elsewhere(engine, ticker: str, day: date) -> None:
+    """別プロセスの取り込みと同じく、このプロセスのキャッシュに触れずに足を保存してバージョンを上げる"""
+    async with async_sessionmaker(engine)() as db:
+        stock_id = (await db.execute(select(Stock.id).where(Stock.ticker == ticker))).scalar_one()
+        price = Decimal("120")
+        db.add(
+            StockPrice(
+                stock_id=stock_id, price_date=day,
+                open=price, high=price, low=price, close=price, volume=1,
+            )
+        )
+        await bump_data_version(db, prices_scope(ticker))
+        await db.commit()
+
+
+class TestIndicatorCache:
+    """指標のプロセス内キャッシュ"""
+
+    @pytest.fixture(autouse=True)
+    def _without_pandas_ta(self, monkeypatch):
+        # キャッシュの挙動だけを見るため、指標の計算は省く
+        monkeypatch.setattr(technical, "add_indicators", lambda df: df)
+        technical.invalidate_indicator_cache()
+        yield
+        technical.invalidate_indicator_cache()
+
+    async def test_follows_data_version(self, sqlite_engine):
+        """別プロセスが取り込んでバージョンを上げると、TTL 内でも計算し直す"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            df = await technical.calculate_technical_indicators(db, "AAPL", limit=400)
+        assert df.index[-1] == date(2024, 10, 26)
+
+        await _ingest_elsewhere(sqlite_engine, "AAPL", date(2025, 6, 1))
+        async with async_sessionmaker(sqlite_engine)() as db:
+            df = await technical.calculate_technical_indicators(db, "AAPL", limit=400)
+        assert df.index[-1] == date(2025, 6, 1)
+
+    async def test_hit_without_ingest(self, sqlite_engine):
+        """バージョンが変わらなければキャッシュから返す"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            await technical.calculate_technical_indicators(db, "AAPL", limit=400)
+        with patch.object(technical, "_calculate_technical_indicators") as calc:
+            async with async_sessionmaker(sqlite_engine)() as db:
+                df = await technical.calculate_technical_indicators(db, "AAPL", limit=400)
+        calc.assert_not_called()
+        assert df.index[-1] == date(2024, 10, 26)
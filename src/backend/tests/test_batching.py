@@ -0,0 +1,86 @@
+"""
+マイクロバッチングのテスト
+"""
+import asyncio
+import threading
+
+import pytest
+
+from analyzers.batching import MicroBatcher
+
+
+class TestMicroBatcher:
+    """MicroBatcher"""
+
+    async def test_concurrent_submits_are_batched(self):
+        """同時に投入された要素は 1 回のバッチ処理にまとめられ、順序通りに結果が返る"""
+        batches: list[list[int]] = []
+
+        def process(items: list[int]) -> list[int]:
+            batches.append(items)
+            return [i * 2 for i in items]
+
+        batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50)
+        results = await batcher.submit_many(list(range(5)))
+        await batcher.close()
+
+        assert results == [0, 2, 4, 6, 8]
+        assert batches == [[0, 1, 2, 3, 4]]
+
+    async def test_max_batch_size(self):
+        """バッチは max_batch_size 件で分割される"""
+        batches: list[list[int]] = []
+
+        def process(items: list[int]) -> list[int]:
+            batches.append(items)
+            return items
+
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+        results = await batcher.submit_many(list(range(10)))
+        await batcher.close()
+
+        assert results == list(range(10))
+        assert [len(b) for b in batches] == [4, 4, 2]
+
+    async def test_exception_propagates_to_callers(self):
+        """バッチ処理の例外は各呼び出し元に伝播し、ワーカーは処理を継続する"""
+        calls = 0
+
+        def process(items: list[str]) -> list[str]:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ImportError("model unavailable")
+            return items
+
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=1)
+        with pytest.raises(ImportError):
+            await batcher.submit("a")
+        assert await asyncio.wait_for(batcher.submit("b"), timeout=1) == "b"
+        await batcher.close()
+
+    async def test_worker_death_fails_queued(self):
+        """ワーカーが止まると処理中・待機中の呼び出し元は待ち続けずにエラーになり、次の投入で再起動する"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def process(items: list[str]) -> list[str]:
+            started.set()
+            release.wait(timeout=5)
+            return items
+
+        batcher = MicroBatcher(process, max_batch_size=1, max_wait_ms=1)
+        running = asyncio.create_task(batcher.submit("a"))
+        await asyncio.to_thread(started.wait, 5)
+        queued = asyncio.create_task(batcher.submit("b"))
+        await asyncio.sleep(0)
+
+        batcher._worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(running, timeout=1)
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(queued, timeout=1)
+
+        release.set()
+        assert await asyncio.wait_for(batcher.submit("c"), timeout=1) == "c"
+        await batcher.close()
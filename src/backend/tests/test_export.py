@@ -0,0 +1,66 @@
+"""
+一括エクスポート GET /api/v1/export/prices のテスト
+"""
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import PRICE_DAYS
+
+URL = "/api/v1/export/prices"
+
+
+class TestExportPrices:
+    """株価履歴のエクスポート"""
+
+    async def test_ndjson(self, sqlite_engine, async_client: AsyncClient):
+        """複数銘柄を銘柄（ID）・日付順に 1 行 1 レコードで返す（価格は数値）"""
+        resp = await async_client.get(
+            URL, params={"tickers": "MSFT,AAPL", "chunk_size": 100}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+
+        rows = [json.loads(line) for line in resp.text.splitlines()]
+        assert len(rows) == PRICE_DAYS * 2
+        assert [r["ticker"] for r in rows[:: PRICE_DAYS]] == ["AAPL", "MSFT"]
+        assert rows[0]["date"] == "2024-01-01"
+        assert rows[0]["close"] == 100.5
+
+    async def test_date_range(self, sqlite_engine, async_client: AsyncClient):
+        """start / end の範囲（両端を含む）に絞り込む"""
+        resp = await async_client.get(
+            URL, params={"tickers": "AAPL", "start": "2024-02-01", "end": "2024-02-10"}
+        )
+        dates = [json.loads(line)["date"] for line in resp.text.splitlines()]
+        assert dates[0] == "2024-02-01"
+        assert dates[-1] == "2024-02-10"
+        assert len(dates) == 10
+
+    @pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+    async def test_arrow_formats(self, sqlite_engine, async_client: AsyncClient, fmt: str):
+        """Arrow IPC ストリーム / Parquet として読み戻せる"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        resp = await async_client.get(
+            URL, params={"tickers": ["AAPL", "7203.T"], "format": fmt, "chunk_size": 100}
+        )
+        assert resp.status_code == 200
+
+        if fmt == "arrow":
+            table = pa.ipc.open_stream(resp.content).read_all()
+        else:
+            table = pq.read_table(io.BytesIO(resp.content))
+            # チャンクごとに行グループとして書き出している
+            assert pq.ParquetFile(io.BytesIO(resp.content)).num_row_groups > 1
+        assert table.num_rows == PRICE_DAYS * 2
+        assert table.schema.field("close").type == pa.float64()
+
+    async def test_unknown_ticker(self, sqlite_engine, async_client: AsyncClient):
+        """存在しない銘柄を含むと 404"""
+        resp = await async_client.get(URL, params={"tickers": "AAPL,UNKNOWN"})
+        assert resp.status_code == 404
+        assert "UNKNOWN" in resp.json()["detail"]
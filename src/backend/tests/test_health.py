@@ -18,3 +18,82 @@ def test_root(client):
     assert data["app"] == "Autonomous Stock Analyst"
     assert "docs" in data
     assert "api" in data
+
+
+def test_ready_reports_warmup_progress(client):
+    """ウォームアップ完了までは 503、完了後は 200 を返すこと"""
+    from main import app
+    from services.warmup import DONE, WarmupState
+
+    app.state.warmup = WarmupState(["database", "sentiment"])
+    try:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+        for step in app.state.warmup.steps.values():
+            step["status"] = DONE
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+    finally:
+        del app.state.warmup
+
+
+async def test_warmup_timeout_marks_ready(monkeypatch):
+    """打ち切り時間を超えたら未完了のステップを失敗扱いにして ready にすること"""
+    import asyncio
+
+    from core.config import Settings
+    from services import warmup
+
+    async def instant(*args) -> None:
+        return None
+
+    async def hang() -> None:
+        await asyncio.sleep(60)
+
+    settings = Settings(warmup_timeout_seconds=0.05, warmup_models=["sentiment"])
+    monkeypatch.setattr(warmup, "get_settings", lambda: settings)
+    monkeypatch.setattr(warmup, "load_popularity", lambda path: None)
+    monkeypatch.setattr(warmup, "_warm_database", instant)
+    monkeypatch.setattr(warmup, "_warm_indicators", instant)
+    monkeypatch.setattr(warmup, "_warm_sentiment", hang)
+
+    state = warmup.create_warmup_state()
+    await warmup.run_warmup(state)
+
+    assert state.ready
+    assert state.steps["database"]["status"] == warmup.DONE
+    assert state.steps["sentiment"]["status"] == warmup.FAILED
+    assert state.steps["sentiment"]["error"] == "timeout"
+
+
+async def test_unknown_ticker_not_counted(sqlite_engine, async_client, monkeypatch):
+    """存在しない銘柄へのリクエストは参照回数に数えないこと"""
+    from collections import Counter
+
+    from services import warmup
+
+    monkeypatch.setattr(warmup, "ticker_popularity", Counter())
+    response = await async_client.get("/api/v1/analysis/NO_SUCH/technical")
+    assert response.status_code == 404
+    response = await async_client.post("/api/v1/analysis/NO_SUCH/predict")
+    assert response.status_code == 404
+    assert warmup.ticker_popularity == Counter()
+
+
+def test_popularity_is_capped(monkeypatch):
+    """参照回数を持つ銘柄数は上限を超えて増え続けず、参照回数の多い銘柄が残ること"""
+    from collections import Counter
+
+    from services import warmup
+
+    monkeypatch.setattr(warmup, "ticker_popularity", Counter())
+    monkeypatch.setattr(warmup, "POPULARITY_MAX_TICKERS", 3)
+    for _ in range(5):
+        warmup.record_ticker_request("AAPL")
+    for i in range(20):
+        warmup.record_ticker_request(f"T{i}")
+    assert len(warmup.ticker_popularity) <= 2 * 3
+    assert warmup.ticker_popularity.most_common(1) == [("AAPL", 5)]
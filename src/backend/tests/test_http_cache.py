@@ -0,0 +1,98 @@
+"""
+外部 API レスポンスキャッシュのテスト
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from collectors.http_cache import ResponseCache
+
+URL = "https://example.com/feed"
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestResponseCache:
+    """ResponseCache.fetch"""
+
+    async def test_hit_within_ttl(self, tmp_path):
+        """TTL 内は上流にアクセスせずパース済みの値を返す"""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(200, json={"items": [1, 2]})
+
+        cache = ResponseCache(tmp_path, ttls={"news": 60})
+        parse_calls = []
+
+        def parse(response: httpx.Response) -> list:
+            parse_calls.append(response)
+            return response.json()["items"]
+
+        async with _client(handler) as client:
+            first = await cache.fetch(client, "news", URL, parse)
+            second = await cache.fetch(client, "news", URL, parse)
+
+        assert first == second == [1, 2]
+        assert len(calls) == 1
+        assert len(parse_calls) == 1
+
+    async def test_revalidate_with_etag(self, tmp_path):
+        """TTL 切れ後は If-None-Match で再検証し、304 なら再パースしない"""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"items": ["a"]}, headers={"ETag": '"v1"'})
+
+        cache = ResponseCache(tmp_path, ttls={"news": 0})
+        async with _client(handler) as client:
+            await cache.fetch(client, "news", URL, lambda r: r.json()["items"])
+            value = await cache.fetch(client, "news", URL, lambda r: pytest.fail("再パースされた"))
+
+        assert value == ["a"]
+        assert calls[1].headers["If-None-Match"] == '"v1"'
+
+    async def test_stale_on_upstream_error(self, tmp_path):
+        """上流がエラー（レート制限等）の場合は期限切れのキャッシュを返す"""
+        responses = [httpx.Response(200, json=["cached"]), httpx.Response(429)]
+
+        cache = ResponseCache(tmp_path, ttls={"macro": 0})
+        async with _client(lambda request: responses.pop(0)) as client:
+            await cache.fetch(client, "macro", URL, lambda r: r.json())
+            value = await cache.fetch(client, "macro", URL, lambda r: r.json())
+
+        assert value == ["cached"]
+
+    async def test_owner_cancelled(self, tmp_path):
+        """取得中のタスクがキャンセルされても同じキーの待機者は止まらず、次の取得はやり直せる"""
+        started = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            started.set()
+            await asyncio.sleep(60)
+            return httpx.Response(200, json=[])
+
+        cache = ResponseCache(tmp_path, ttls={"news": 60})
+        async with _client(handler) as client:
+            owner = asyncio.create_task(cache.fetch(client, "news", URL, lambda r: r.json()))
+            await started.wait()
+            waiter = asyncio.create_task(cache.fetch(client, "news", URL, lambda r: r.json()))
+            await asyncio.sleep(0)
+            owner.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(waiter, timeout=1)
+        assert cache._inflight == {}
+
+    def test_key_depends_on_params(self):
+        """パラメータが異なれば別キーになる"""
+        a = ResponseCache.make_key("macro", URL, {"series_id": "CPIAUCSL"})
+        b = ResponseCache.make_key("macro", URL, {"series_id": "GDP"})
+        assert a != b
+        assert "CPIAUCSL" not in a
@@ -0,0 +1,185 @@
+"""
+マクロ指標の as-of パネルのテスト
+"""
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from analyzers.macro_panel import MacroPanelCache, align_as_of, join_macro_features
+from collectors.macro import MACRO_INDICATORS, load_macro_observations
+from core.data_version import bump_data_version, macro_scope
+from models.macro import MacroIndicator
+from predictors.price_predictor import PricePredictor
+from tests.conftest import PRICE_DAYS
+
+
+async def _save(db, key: str, values: dict[date, float]) -> None:
+    """観測値を保存してデータバージョンを進める（コレクターと同じ手順）"""
+    info = MACRO_INDICATORS[key]
+    db.add_all(
+        MacroIndicator(
+            series_id=info["series_id"], name=info["name"], indicator_date=d, value=Decimal(str(v))
+        )
+        for d, v in values.items()
+    )
+    await bump_data_version(db, macro_scope(key))
+    await db.commit()
+
+
+async def _save_cpi(db, values: dict[date, float]) -> None:
+    await _save(db, "cpi", values)
+
+
+class TestAlignAsOf:
+    """取引日へのそろえ方"""
+
+    def test_publication_lag(self):
+        """観測日 + 公表ラグの日から値を使い、それまでは直前の公表値を使う"""
+        calendar = pd.date_range("2024-02-10", "2024-02-20", freq="D")
+        observations = pd.DataFrame(
+            {"date": [date(2024, 1, 1), date(2024, 2, 1)], "value": [1.0, 2.0]}
+        )
+        aligned = align_as_of(calendar, observations, publication_lag_days=14)
+        # 2/1 の値は 2/15 に公表される
+        assert aligned[calendar.get_loc("2024-02-14")] == 1.0
+        assert aligned[calendar.get_loc("2024-02-15")] == 2.0
+        assert aligned[-1] == 2.0
+
+    def test_before_first_publication(self):
+        """最初の公表より前の日と欠損値は NaN（欠損値は公表されなかったものとして扱う）"""
+        calendar = pd.date_range("2024-01-01", "2024-01-05", freq="D")
+        observations = pd.DataFrame(
+            {"date": [date(2024, 1, 3), date(2024, 1, 4)], "value": [1.0, np.nan]}
+        )
+        aligned = align_as_of(calendar, observations)
+        assert np.isnan(aligned[:2]).all()
+        assert aligned[2:].tolist() == [1.0, 1.0, 1.0]
+
+
+class TestMacroPanelCache:
+    """パネルのキャッシュと更新"""
+
+    async def test_panel(self, sqlite_engine):
+        """取引日ごとに公表済みの値をそろえ、取り込んでいない指標の列は含めない"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            await _save_cpi(db, {date(2023, 10, 1): 300.0, date(2024, 1, 1): 310.0})
+            panel = await MacroPanelCache().get(db)
+        assert len(panel) == PRICE_DAYS
+        assert list(panel.columns) == ["cpi", "cpi_change"]
+        lag = MACRO_INDICATORS["cpi"]["publication_lag_days"]
+        published = pd.Timestamp("2024-01-01") + pd.Timedelta(days=lag)
+        assert panel.loc["2024-01-01", "cpi"] == 300.0
+        assert panel.loc[published - pd.Timedelta(days=1), "cpi"] == 300.0
+        assert panel.loc[published, "cpi"] == 310.0
+
+    async def test_incremental_update(self, sqlite_engine):
+        """バージョンが変わらなければ同じパネルを返し、変わった系列だけを作り直す"""
+        cache = MacroPanelCache()
+        async with async_sessionmaker(sqlite_engine)() as db:
+            await _save_cpi(db, {date(2023, 10, 1): 300.0})
+            panel = await cache.get(db)
+            assert await cache.get(db) is panel
+
+            await _save_cpi(db, {date(2024, 6, 1): 320.0})
+            updated = await cache.get(db)
+        assert updated is not panel
+        assert updated["cpi"].iloc[0] == 300.0
+        assert updated["cpi"].iloc[-1] == 320.0
+
+
+class TestLoadMacroObservations:
+    """複数指標の一括読み出し"""
+
+    async def test_unknown_key(self, sqlite_engine):
+        """不明な指標キーは ValueError"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            with pytest.raises(ValueError):
+                await load_macro_observations(db, ["cpi", "unknown"])
+
+
+class TestMacroPanelEndpoint:
+    """GET /api/v1/macro/panel"""
+
+    URL = "/api/v1/macro/panel"
+
+    async def test_aligned_columns(self, sqlite_engine, async_client: AsyncClient):
+        """観測日の和集合を軸に、直前の観測値で埋めた列ごとの配列を返す"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            await _save_cpi(db, {date(2024, 1, 1): 300.0, date(2024, 2, 1): 310.0})
+            await _save(db, "usdjpy", {date(2024, 1, 2): 141.0, date(2024, 2, 2): 148.5})
+
+        resp = await async_client.get(self.URL, params={"keys": "cpi,usdjpy,fed_rate"})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["date"] == ["2024-01-01", "2024-01-02", "2024-02-01", "2024-02-02"]
+        assert body["cpi"] == [300.0, 300.0, 310.0, 310.0]
+        assert body["usdjpy"] == [None, 141.0, 141.0, 148.5]
+        assert body["fed_rate"] == [None] * 4
+
+        resp = await async_client.get(
+            self.URL, params={"keys": ["cpi", "usdjpy"], "start": "2024-01-02", "fill": "false"}
+        )
+        body = resp.json()
+        assert body["date"] == ["2024-01-02", "2024-02-01", "2024-02-02"]
+        assert body["cpi"] == [None, 310.0, None]
+
+    async def test_etag_follows_each_series(self, sqlite_engine, async_client: AsyncClient):
+        """いずれかの指標を取り込むと ETag が変わる"""
+        params = {"keys": "cpi,usdjpy"}
+        etag = (await async_client.get(self.URL, params=params)).headers["etag"]
+        resp = await async_client.get(self.URL, params=params, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+        async with async_sessionmaker(sqlite_engine)() as db:
+            await _save(db, "usdjpy", {date(2024, 1, 2): 141.0})
+        resp = await async_client.get(self.URL, params=params, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.json()["usdjpy"] == [141.0]
+
+    async def test_unknown_key(self, sqlite_engine, async_client: AsyncClient):
+        """不明な指標キーは 400"""
+        resp = await async_client.get(self.URL, params={"keys": "cpi,unknown"})
+        assert resp.status_code == 400
+
+
+class TestPredictorMacroFeatures:
+    """予測の特徴量への結合"""
+
+    def test_join(self):
+        """株価の各日に直近のパネルの値を結合する"""
+        panel = pd.DataFrame(
+            {"cpi": [1.0, 2.0]},
+            index=pd.DatetimeIndex(["2024-01-01", "2024-01-03"], name="date"),
+        )
+        index = pd.Index([date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4)], name="date")
+        joined = join_macro_features(index, panel)
+        assert list(joined.index) == list(index)
+        assert joined["macro_cpi"].tolist() == [1.0, 2.0, 2.0]
+
+    def test_prepare_features(self):
+        """パネルを渡すとマクロ指標の列が特徴量に加わる"""
+        dates = pd.date_range("2024-01-01", periods=5, freq="D", name="date")
+        df = pd.DataFrame({"close": 100.0, "volume": np.arange(1.0, 6.0)}, index=dates)
+        panel = pd.DataFrame({"cpi": 300.0}, index=dates)
+        features = PricePredictor(macro_panel=panel).prepare_features(df)
+        assert "macro_cpi" in features.columns
+        assert "macro_cpi" not in PricePredictor().prepare_features(df).columns
+
+    def test_low_coverage_columns_dropped(self):
+        """公表済みの日が少ない列は除き、欠損値の行の削除で株価の行が消えないようにする"""
+        dates = pd.date_range("2024-01-01", periods=10, freq="D", name="date")
+        panel = pd.DataFrame(
+            {"cpi": 300.0, "usdjpy": [np.nan] * 8 + [150.0, 151.0]}, index=dates
+        )
+        joined = join_macro_features(pd.Index(dates.date, name="date"), panel)
+        assert list(joined.columns) == ["macro_cpi"]
+
+        df = pd.DataFrame({"close": 100.0, "volume": np.arange(1.0, 11.0)}, index=dates)
+        features = PricePredictor(macro_panel=panel).prepare_features(df)
+        assert "macro_usdjpy" not in features.columns
+        assert len(features) == len(PricePredictor().prepare_features(df))
@@ -0,0 +1,52 @@
+"""
+Prometheus メトリクスのテスト
+"""
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from core.metrics import instrument_engine
+
+
+def _sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetricsEndpoint:
+    """GET /metrics"""
+
+    def test_exposition_format(self, client: TestClient):
+        """Prometheus のテキスト形式で返す"""
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds" in resp.text
+        assert "db_pool_checkout_wait_seconds" in resp.text
+
+    def test_route_template_label(self, client: TestClient):
+        """リクエストはパスではなくルートテンプレートでラベル付けされる"""
+        labels = {"method": "GET", "route": "/api/v1/realtime/stream", "status": "400"}
+        before = _sample("http_request_duration_seconds_count", labels)
+        client.get("/api/v1/realtime/stream", params={"tickers": ","})
+        assert _sample("http_request_duration_seconds_count", labels) == before + 1
+
+    def test_unmatched_route(self, client: TestClient):
+        """ルートにマッチしないパスは 1 系列にまとめる"""
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = _sample("http_request_duration_seconds_count", labels)
+        client.get("/no-such-path/12345")
+        assert _sample("http_request_duration_seconds_count", labels) == before + 1
+
+
+class TestDbMetrics:
+    """SQL 文の計測"""
+
+    def test_query_count_by_operation(self):
+        """SQL 文の種類ごとに件数と時間を記録する"""
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        before = _sample("db_query_duration_seconds_count", {"operation": "select"})
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("select 2"))
+        assert _sample("db_query_duration_seconds_count", {"operation": "select"}) == before + 2
@@ -0,0 +1,140 @@
+"""
+ニュース記事の蓄積・検索のテスト
+
+TestNewsStore は PostgreSQL（pg_trgm・tsvector）が必要なため、TEST_DATABASE_URL が設定されている
+場合のみ実行する。対象 DB のスキーマは作り直される。
+"""
+import os
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from alembic.config import Config
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from alembic import command
+from services.news_store import save_articles, search_news
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _article(i: int, title: str, summary: str = "") -> dict:
+    return {
+        "title": title,
+        "url": f"https://example.com/news/{i}",
+        "source": "Example",
+        "published_at": f"2025-01-{i:02d}T09:00:00",
+        "summary": summary,
+    }
+
+
+@pytest.fixture(scope="module")
+def pg_url():
+    """マイグレーションを最新まで適用した DB の URL"""
+    pytest.importorskip("psycopg2")
+
+    url = TEST_DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+    saved_url = os.environ.get("DATABASE_URL")
+    # alembic/env.py は DATABASE_URL から接続先を決める
+    os.environ["DATABASE_URL"] = url
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.downgrade(config, "base")
+    command.upgrade(config, "head")
+
+    yield url.replace("postgresql://", "postgresql+asyncpg://")
+
+    command.downgrade(config, "base")
+    if saved_url is None:
+        del os.environ["DATABASE_URL"]
+    else:
+        os.environ["DATABASE_URL"] = saved_url
+
+
+@pytest.fixture
+async def pg_session(pg_url):
+    """テストごとにロールバックするセッション"""
+    engine = create_async_engine(pg_url)
+    async with async_sessionmaker(engine)() as session:
+        yield session
+        await session.rollback()
+    await engine.dispose()
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL が未設定")
+class TestNewsStore:
+    """保存と検索（PostgreSQL）"""
+
+    async def test_save_dedup(self, pg_session):
+        """URL が同じ記事は 1 件として保存する"""
+        articles = [_article(1, "トヨタ、決算を発表"), _article(1, "トヨタ、決算を発表")]
+        assert await save_articles(pg_session, articles) == 1
+        assert await save_articles(pg_session, articles) == 0
+
+    async def test_japanese_substring(self, pg_session):
+        """日本語は空白で区切られていなくても部分一致し、空白区切りの語はすべて含む記事に絞る"""
+        await save_articles(
+            pg_session,
+            [
+                _article(1, "トヨタ自動車が決算を発表"),
+                _article(2, "トヨタ自動車の新型車", "販売好調"),
+                _article(3, "ソニーが決算を発表"),
+            ],
+        )
+        found, _ = await search_news(pg_session, "トヨタ")
+        assert [a["url"][-1] for a in found] == ["2", "1"]
+        found, _ = await search_news(pg_session, "トヨタ 決算")
+        assert [a["url"][-1] for a in found] == ["1"]
+        found, _ = await search_news(pg_session, "100%")
+        assert found == []
+
+    async def test_cursor_pagination(self, pg_session):
+        """公開日時の降順に重複・欠落なく辿れる"""
+        await save_articles(pg_session, [_article(i, f"日銀 金融政策 {i}") for i in range(1, 8)])
+        urls, cursor = [], None
+        while True:
+            page, cursor = await search_news(pg_session, "金融政策", limit=3, cursor=cursor)
+            urls.extend(a["url"] for a in page)
+            if cursor is None:
+                break
+        assert urls == [f"https://example.com/news/{i}" for i in range(7, 0, -1)]
+
+    async def test_invalid_cursor(self, pg_session):
+        """不正なカーソルは ValueError"""
+        with pytest.raises(ValueError):
+            await search_news(pg_session, "トヨタ", cursor="!!")
+
+
+class TestNewsEndpoint:
+    """GET /api/v1/news/{query}"""
+
+    async def test_saved_articles(self, sqlite_engine, async_client: AsyncClient):
+        """保存済みの記事があればライブ取得しない"""
+        found = [_article(1, "トヨタ")]
+        with patch("api.v1.news.search_news", AsyncMock(return_value=(found, "next"))), \
+             patch("api.v1.news.fetch_news", AsyncMock()) as fetch:
+            resp = await async_client.get("/api/v1/news/トヨタ")
+        assert resp.status_code == 200
+        assert resp.json()["next_cursor"] == "next"
+        fetch.assert_not_called()
+
+    async def test_live_fallback_returns_cursor(self, sqlite_engine, async_client: AsyncClient):
+        """ライブ取得した記事は保存後に検索し直し、2 ページ目以降と同じカーソルを返す"""
+        live = [_article(i, "トヨタ") for i in range(1, 4)]
+        search = AsyncMock(side_effect=[([], None), (live[:2], "next")])
+        with patch("api.v1.news.search_news", search), \
+             patch("api.v1.news.fetch_news", AsyncMock(return_value=live)), \
+             patch("api.v1.news.save_articles", AsyncMock(return_value=3)) as save:
+            resp = await async_client.get("/api/v1/news/トヨタ", params={"max_items": 2})
+        body = resp.json()
+        assert body["total"] == 2
+        assert body["next_cursor"] == "next"
+        save.assert_awaited_once()
+
+    async def test_invalid_cursor(self, sqlite_engine, async_client: AsyncClient):
+        """不正なカーソルは 400"""
+        with patch("api.v1.news.search_news", AsyncMock(side_effect=ValueError("不正なカーソルです"))):
+            resp = await async_client.get("/api/v1/news/トヨタ", params={"cursor": "!!"})
+        assert resp.status_code == 400
@@ -0,0 +1,75 @@
+"""
+キーセットページネーションのテスト
+"""
+from httpx import AsyncClient
+
+from tests.conftest import PRICE_DAYS, TICKERS
+
+
+async def _collect(client: AsyncClient, url: str, key: str, params: dict) -> list[list]:
+    """next_cursor を辿って全ページを取得する"""
+    pages = []
+    cursor = None
+    while True:
+        resp = await client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert resp.status_code == 200
+        body = resp.json()
+        pages.append(body[key])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+class TestStockListPagination:
+    """銘柄一覧 GET /api/v1/stocks"""
+
+    async def test_walk_all_pages(self, sqlite_engine, async_client: AsyncClient):
+        """ティッカー順に重複・欠落なく辿れる"""
+        pages = await _collect(async_client, "/api/v1/stocks", "stocks", {"limit": 2})
+        tickers = [s["ticker"] for page in pages for s in page]
+        assert tickers == sorted(TICKERS)
+        assert len(pages) == 2
+
+    async def test_total_is_optional(self, sqlite_engine, async_client: AsyncClient):
+        """総数は include_total=true のときだけ返す"""
+        resp = await async_client.get("/api/v1/stocks")
+        assert resp.json()["total"] is None
+        resp = await async_client.get("/api/v1/stocks", params={"include_total": True})
+        assert resp.json()["total"] == len(TICKERS)
+
+    async def test_invalid_cursor(self, sqlite_engine, async_client: AsyncClient):
+        """不正なカーソルは 400"""
+        resp = await async_client.get("/api/v1/stocks", params={"cursor": "!!"})
+        assert resp.status_code == 400
+
+
+class TestStockPricePagination:
+    """株価取得 GET /api/v1/stocks/{ticker}/prices"""
+
+    async def test_walk_all_pages(self, sqlite_engine, async_client: AsyncClient):
+        """日付降順に重複・欠落なく辿れ、総数はキャッシュ値を返す"""
+        url = "/api/v1/stocks/AAPL/prices"
+        pages = await _collect(async_client, url, "prices", {"limit": 70})
+        dates = [p["price_date"] for page in pages for p in page]
+        assert len(dates) == PRICE_DAYS
+        assert dates == sorted(set(dates), reverse=True)
+
+        resp = await async_client.get(url, params={"limit": 70})
+        assert resp.json()["total"] == PRICE_DAYS
+        assert resp.json()["prev_cursor"] is None
+
+    async def test_prev_cursor_returns_previous_page(
+        self, sqlite_engine, async_client: AsyncClient
+    ):
+        """prev_cursor で 1 つ前のページに戻れる"""
+        url = "/api/v1/stocks/AAPL/prices"
+        first = (await async_client.get(url, params={"limit": 50})).json()
+        second = (
+            await async_client.get(url, params={"limit": 50, "cursor": first["next_cursor"]})
+        ).json()
+        back = (
+            await async_client.get(url, params={"limit": 50, "cursor": second["prev_cursor"]})
+        ).json()
+        assert back["prices"] == first["prices"]
+        assert back["prev_cursor"] is None
+        assert back["next_cursor"] is not None
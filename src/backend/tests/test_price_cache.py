@@ -0,0 +1,152 @@
+"""
+分析用の株価カラムキャッシュ（メモリマップ）のテスト
+"""
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.config import Settings
+from core.data_version import bump_data_version, prices_scope
+from models.stock import Stock
+from services import price_cache
+from services.price_cache import (
+    append_price_bars,
+    load_cached_price_arrays,
+    load_cached_price_frame,
+)
+from tests.conftest import PRICE_DAYS
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    settings = Settings(price_cache_dir=str(tmp_path))
+    monkeypatch.setattr(price_cache, "get_settings", lambda: settings)
+    monkeypatch.setattr(price_cache, "_cache", None)
+    return tmp_path
+
+
+@pytest.fixture
+async def db(sqlite_engine):
+    async with async_sessionmaker(sqlite_engine, expire_on_commit=False)() as session:
+        yield session
+
+
+async def _stock_id(db, ticker: str = "AAPL") -> int:
+    return (await db.execute(select(Stock.id).where(Stock.ticker == ticker))).scalar_one()
+
+
+def _bar(day: date, close: float) -> dict:
+    return {"date": day, "open": close, "high": close, "low": close, "close": close, "volume": 10}
+
+
+class TestReadThrough:
+    """読み出し（キャッシュがなければ DB から作る）"""
+
+    async def test_builds_and_maps(self, db, cache_dir):
+        """初回は DB から列ファイルを作り、以降はファイルをマップした配列を返す"""
+        stock_id = await _stock_id(db)
+        first = await load_cached_price_arrays(db, "AAPL", stock_id)
+        assert (cache_dir / "AAPL" / "close.bin").exists()
+        assert len(first["date"]) == PRICE_DAYS
+
+        arrays = await load_cached_price_arrays(
+            db, "AAPL", stock_id, start=date(2024, 2, 1), limit=5
+        )
+        assert isinstance(arrays["close"].base, np.memmap)
+        assert arrays["date"][0] == np.datetime64("2024-02-01")
+        np.testing.assert_array_equal(arrays["close"], [100.5] * 5)
+
+    async def test_frame_is_zero_copy(self, db, cache_dir):
+        """DataFrame の列はマップした配列をコピーしない"""
+        stock_id = await _stock_id(db)
+        await load_cached_price_frame(db, "AAPL", stock_id)
+        df = await load_cached_price_frame(db, "AAPL", stock_id)
+        assert len(df) == PRICE_DAYS
+        assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+        assert df.index[0] == np.datetime64("2024-01-01")
+        base = df["close"].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert isinstance(base, np.memmap)
+
+    async def test_latest(self, db, cache_dir):
+        """latest=True は直近の limit 件（DB から読む場合と同じ）"""
+        stock_id = await _stock_id(db)
+        df = await load_cached_price_frame(db, "AAPL", stock_id, limit=3, latest=True)
+        assert df.index[0] == np.datetime64("2024-10-24")
+        assert df.index[-1] == np.datetime64("2024-10-26")
+
+    async def test_disabled(self, db):
+        """PRICE_CACHE_DIR が未設定なら DB から読む"""
+        stock_id = await _stock_id(db)
+        assert await load_cached_price_arrays(db, "AAPL", stock_id) is None
+        df = await load_cached_price_frame(db, "AAPL", stock_id, limit=3)
+        assert df.index[0] == date(2024, 1, 1)
+
+
+class TestAppend:
+    """コレクターからの追記"""
+
+    async def test_append_next_version(self, db, cache_dir):
+        """直前のバージョンのキャッシュには新しい日足を追記する"""
+        stock_id = await _stock_id(db)
+        await load_cached_price_arrays(db, "AAPL", stock_id)
+        version = await bump_data_version(db, prices_scope("AAPL"))
+
+        bars = [_bar(date(2024, 10, 28), 120), _bar(date(2024, 10, 27), 110)]
+        await append_price_bars("AAPL", bars, version)
+
+        cache = price_cache.get_price_cache()
+        assert cache.version("AAPL") == version
+        arrays = cache.read("AAPL")
+        assert len(arrays["date"]) == PRICE_DAYS + 2
+        np.testing.assert_array_equal(arrays["close"][-2:], [110, 120])
+
+    async def test_stale_cache_is_dropped(self, db, cache_dir):
+        """バージョンが飛んでいる・過去日を含む場合は追記せずに破棄し、次の読み出しで作り直す"""
+        stock_id = await _stock_id(db)
+        await load_cached_price_arrays(db, "AAPL", stock_id)
+        await bump_data_version(db, prices_scope("AAPL"))
+        version = await bump_data_version(db, prices_scope("AAPL"))
+
+        await append_price_bars("AAPL", [_bar(date(2024, 10, 28), 120)], version)
+        assert price_cache.get_price_cache().version("AAPL") is None
+
+        arrays = await load_cached_price_arrays(db, "AAPL", stock_id)
+        assert price_cache.get_price_cache().version("AAPL") == version
+        assert len(arrays["date"]) == PRICE_DAYS
+
+    async def test_past_date_is_not_appended(self, db, cache_dir):
+        """最終日以前の日付（過去日の補完）は追記しない"""
+        stock_id = await _stock_id(db)
+        await load_cached_price_arrays(db, "AAPL", stock_id)
+        version = await bump_data_version(db, prices_scope("AAPL"))
+
+        await append_price_bars("AAPL", [_bar(date(2024, 1, 1), 120)], version)
+        assert price_cache.get_price_cache().version("AAPL") is None
+
+    async def test_fetch_appends_after_commit(
+        self, db, cache_dir, sqlite_engine, async_client: AsyncClient
+    ):
+        """取り込みエンドポイントはコミットしてから追記し、追記後のキャッシュは DB と同じバージョン"""
+        stock_id = await _stock_id(db)
+        await load_cached_price_arrays(db, "AAPL", stock_id)
+        yf = MagicMock()
+        yf.Ticker.return_value.history.return_value = pd.DataFrame(
+            {"Open": [1.0], "High": [2.0], "Low": [0.5], "Close": [1.5], "Volume": [100]},
+            index=pd.to_datetime(["2025-06-02"]),
+        )
+        with patch("collectors.stock_price.yf", yf):
+            resp = await async_client.post("/api/v1/stocks/AAPL/fetch")
+        assert resp.status_code == 200
+
+        arrays = await load_cached_price_arrays(db, "AAPL", stock_id)
+        assert len(arrays["date"]) == PRICE_DAYS + 1
+        assert arrays["date"][-1] == np.datetime64("2025-06-02")
+        assert isinstance(arrays["close"].base, np.memmap)
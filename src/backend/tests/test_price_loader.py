@@ -0,0 +1,79 @@
+"""
+株価の高速読み出し（float8 列）のテスト
+"""
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.stock import Stock, StockPrice
+from services.price_loader import load_price_arrays, load_price_frame
+from tests.conftest import PRICE_DAYS
+
+
+@pytest.fixture
+async def db(sqlite_engine):
+    async with async_sessionmaker(sqlite_engine, expire_on_commit=False)() as session:
+        yield session
+
+
+async def _stock_id(db, ticker: str = "AAPL") -> int:
+    return (await db.execute(select(Stock.id).where(Stock.ticker == ticker))).scalar_one()
+
+
+class TestLoadPriceFrame:
+    """load_price_frame / load_price_arrays"""
+
+    async def test_float64_columns(self, db):
+        """価格・出来高は float64 の列で、日付の昇順に並ぶ"""
+        df = await load_price_frame(db, await _stock_id(db))
+        assert len(df) == PRICE_DAYS
+        assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+        assert all(dtype == np.float64 for dtype in df.dtypes)
+        assert df.index[0] == date(2024, 1, 1)
+        assert df["close"].iloc[0] == 100.5
+        assert df["volume"].iloc[0] == 1000.0
+
+    async def test_range_and_limit(self, db):
+        """期間・件数で絞り込む（該当なしは列だけの空の DataFrame）"""
+        stock_id = await _stock_id(db)
+        df = await load_price_frame(db, stock_id, start=date(2024, 2, 1), limit=5)
+        assert list(df.index) == [date(2024, 2, d) for d in range(1, 6)]
+
+        empty = await load_price_frame(db, stock_id, start=date(2030, 1, 1))
+        assert empty.empty
+        assert list(empty.columns) == ["open", "high", "low", "close", "volume"]
+
+    async def test_latest(self, db):
+        """latest=True は直近の limit 件を日付の昇順で返す"""
+        stock_id = await _stock_id(db)
+        df = await load_price_frame(db, stock_id, end=date(2024, 2, 10), limit=3, latest=True)
+        assert list(df.index) == [date(2024, 2, d) for d in range(8, 11)]
+
+    async def test_arrays(self, db):
+        """列ごとの NumPy 配列で返す"""
+        arrays = await load_price_arrays(db, await _stock_id(db), columns=["close"], limit=3)
+        assert arrays["date"].dtype == np.dtype("datetime64[D]")
+        assert arrays["date"][0] == np.datetime64("2024-01-01")
+        np.testing.assert_array_equal(arrays["close"], [100.5, 100.5, 100.5])
+
+
+class TestFloatColumns:
+    """ORM の float8 列"""
+
+    async def test_generated_from_numeric(self, db):
+        """float8 列は Numeric 列から生成され、選択すると float で返る"""
+        close, close_f = (
+            await db.execute(select(StockPrice.close, StockPrice.close_f).limit(1))
+        ).one()
+        assert isinstance(close_f, float)
+        assert close_f == float(close)
+
+    async def test_not_loaded_with_entity(self, db):
+        """エンティティのロードでは読まない（暗黙のロードはエラー）"""
+        price = (await db.execute(select(StockPrice).limit(1))).scalar_one()
+        with pytest.raises(InvalidRequestError):
+            assert price.close_f is not None
@@ -0,0 +1,99 @@
+"""
+リクエスト単位のプロファイリングのテスト
+"""
+import json
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from core import profiling
+from core.config import Settings
+
+pytest.importorskip("pyinstrument")
+
+TOKEN = "test-profiling-token"
+PATH = "/api/v1/stocks/AAPL/prices"
+
+
+@pytest.fixture
+def configure(monkeypatch: pytest.MonkeyPatch):
+    """プロファイリングの設定を差し替える"""
+
+    def apply(**overrides) -> Settings:
+        settings = Settings(**overrides)
+        monkeypatch.setattr(profiling, "get_settings", lambda: settings)
+        return settings
+
+    return apply
+
+
+class TestManualProfiling:
+    """X-Profile / ?profile= による手動計測"""
+
+    async def test_html(self, configure, sqlite_engine, async_client: AsyncClient):
+        """トークンが一致すればレスポンスの代わりに HTML のフレームグラフを返す"""
+        configure(profiling_token=TOKEN)
+        resp = await async_client.get(
+            PATH, headers={"X-Profile": "html", "X-Profile-Token": TOKEN}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/html")
+        assert resp.headers["x-profiled-status"] == "200"
+        assert "<html" in resp.text.lower()
+
+    async def test_speedscope_query(self, configure, sqlite_engine, async_client: AsyncClient):
+        """クエリでも指定でき、speedscope の JSON を返す"""
+        configure(profiling_token=TOKEN)
+        resp = await async_client.get(
+            PATH, params={"profile": "speedscope", "profile_token": TOKEN}
+        )
+        assert resp.status_code == 200
+        assert "speedscope" in resp.json()["$schema"]
+
+    @pytest.mark.parametrize(
+        ("token", "sent"),
+        [(None, TOKEN), (TOKEN, "wrong-token")],
+    )
+    async def test_ignored(
+        self, configure, sqlite_engine, async_client: AsyncClient, token, sent
+    ):
+        """トークン未設定・不一致なら通常のレスポンスを返す"""
+        configure(profiling_token=token)
+        resp = await async_client.get(PATH, headers={"X-Profile": "html", "X-Profile-Token": sent})
+        assert resp.status_code == 200
+        assert "x-profiled-status" not in resp.headers
+        assert resp.json()["ticker"] == "AAPL"
+
+
+class TestAutoProfiling:
+    """遅いリクエストの自動計測"""
+
+    async def test_saves_slow_request(
+        self, configure, sqlite_engine, async_client: AsyncClient, tmp_path: Path
+    ):
+        """しきい値を超えたリクエストは計測結果を保存する（レスポンスはそのまま）"""
+        configure(
+            profiling_auto_sample_ratio=1.0,
+            profiling_slow_threshold_ms=0.0,
+            profiling_dir=str(tmp_path),
+        )
+        resp = await async_client.get(PATH)
+        assert resp.json()["ticker"] == "AAPL"
+
+        (saved,) = tmp_path.iterdir()
+        assert "_GET_api-v1-stocks-ticker-prices_" in saved.name
+        assert saved.name.endswith(".speedscope.json")
+        assert "speedscope" in json.loads(saved.read_text())["$schema"]
+
+    async def test_fast_request_not_saved(
+        self, configure, sqlite_engine, async_client: AsyncClient, tmp_path: Path
+    ):
+        """しきい値未満のリクエストは保存しない"""
+        configure(
+            profiling_auto_sample_ratio=1.0,
+            profiling_slow_threshold_ms=60_000.0,
+            profiling_dir=str(tmp_path),
+        )
+        await async_client.get(PATH)
+        assert list(tmp_path.iterdir()) == []
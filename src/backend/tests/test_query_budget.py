@@ -0,0 +1,160 @@
+"""
+エンドポイントごとのクエリ予算テスト
+インメモリ SQLite に銘柄 3 件 × 株価 300 日分を投入し、各エンドポイントの SQL 文数と
+取得行数が予算内に収まることを確認する（株価履歴の暗黙ロード・読みすぎを検出する）。
+"""
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from analyzers.macro_panel import invalidate_macro_panel
+from analyzers.technical import invalidate_indicator_cache
+from core.config import Settings
+from tests.conftest import PRICE_DAYS, TICKERS
+from tests.query_budget import QueryBudget
+from tests.test_macro_panel import _save
+
+
+@pytest.fixture
+def clean_caches():
+    """プロセス内の指標キャッシュ・マクロパネルを空にする（他のテストの計算結果を使わない）"""
+    invalidate_indicator_cache()
+    invalidate_macro_panel()
+    yield
+    invalidate_indicator_cache()
+    invalidate_macro_panel()
+
+
+class TestStockQueryBudget:
+    """銘柄 API のクエリ予算"""
+
+    async def test_list_stocks(self, sqlite_engine, async_client: AsyncClient):
+        """一覧は銘柄の 1 文だけで、株価はロードしない"""
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get("/api/v1/stocks")
+        assert resp.status_code == 200
+        assert len(resp.json()["stocks"]) == len(TICKERS)
+        budget.check(statements=1, rows=len(TICKERS))
+
+    async def test_get_stock(self, sqlite_engine, async_client: AsyncClient):
+        """詳細は 1 文・1 行"""
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get("/api/v1/stocks/AAPL")
+        assert resp.status_code == 200
+        budget.check(statements=1, rows=1)
+
+    async def test_get_stock_prices(self, sqlite_engine, async_client: AsyncClient):
+        """株価取得は要求した件数だけロードし、2 回目はバージョン確認の 1 文だけ"""
+        url = "/api/v1/stocks/AAPL/prices"
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get(url, params={"limit": 30})
+        assert resp.status_code == 200
+        assert len(resp.json()["prices"]) == 30
+        # データバージョン + 銘柄 + 株価（次ページの有無を判定するため limit + 1 件）
+        budget.check(statements=3, rows=1 + 31)
+
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get(url, params={"limit": 30})
+        assert resp.status_code == 200
+        budget.check(statements=1, rows=0)
+
+    async def test_unknown_ticker(self, sqlite_engine, async_client: AsyncClient):
+        """存在しない銘柄はバージョン確認 + 銘柄の 2 文で 404"""
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get("/api/v1/stocks/UNKNOWN/prices")
+        assert resp.status_code == 404
+        budget.check(statements=2, rows=0)
+
+
+class TestAnalysisQueryBudget:
+    """分析 API のクエリ予算"""
+
+    @pytest.fixture(autouse=True)
+    def _require_pandas_ta(self, clean_caches):
+        pytest.importorskip("pandas_ta")
+
+    async def test_technical(self, sqlite_engine, async_client: AsyncClient):
+        """指標の計算に必要な本数だけ読み、2 回目はバージョン確認の 1 文だけ"""
+        url = "/api/v1/analysis/AAPL/technical"
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get(url)
+        assert resp.status_code == 200
+        # データバージョン（ETag と指標キャッシュのキー）+ 銘柄 + 株価（既定 30 日 + 計算用 100 日の 2 倍）
+        budget.check(statements=4, rows=1 + 260)
+
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get(url)
+        assert resp.status_code == 200
+        budget.check(statements=1, rows=0)
+
+    async def test_technical_weekly(self, sqlite_engine, async_client: AsyncClient):
+        """週足は日足ではなくロールアップを読む"""
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get(
+                "/api/v1/analysis/AAPL/technical", params={"granularity": "week"}
+            )
+        assert resp.status_code == 200
+        budget.check(statements=4, rows=1 + PRICE_DAYS // 7 + 1)
+
+    async def test_predict(self, sqlite_engine, async_client: AsyncClient):
+        """予測はデータバージョン + 銘柄 + 株価の 3 文だけ（マクロ指標は読まない）"""
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.post("/api/v1/analysis/MSFT/predict")
+        assert resp.status_code == 200
+        budget.check(statements=3, rows=1 + PRICE_DAYS)
+
+    async def test_predict_with_macro_features(
+        self, sqlite_engine, async_client: AsyncClient, monkeypatch
+    ):
+        """マクロ指標を使う予測はパネルを 1 回だけ組み立て、2 回目は差分の確認だけ"""
+        monkeypatch.setattr(
+            "api.v1.analysis.get_settings", lambda: Settings(predictor_macro_features=True)
+        )
+        async with async_sessionmaker(sqlite_engine)() as db:
+            await _save(db, "cpi", {date(2024, 1, 1): 300.0, date(2024, 2, 1): 310.0})
+
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.post("/api/v1/analysis/MSFT/predict")
+        assert resp.status_code == 200
+        # 株価のデータバージョン + 銘柄 + 株価 + マクロのデータバージョン + 取引日 + 観測値
+        budget.check(statements=6, rows=1 + PRICE_DAYS + 1 + PRICE_DAYS + 2)
+
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.post("/api/v1/analysis/MSFT/predict")
+        assert resp.status_code == 200
+        # 指標・パネルともにキャッシュ済み。データバージョンと新しい取引日の確認だけ
+        budget.check(statements=3, rows=1)
+
+
+class TestMacroQueryBudget:
+    """マクロ指標 API のクエリ予算"""
+
+    async def test_panel(self, sqlite_engine, async_client: AsyncClient):
+        """パネルは全指標をまとめて 1 文で読み、2 回目はバージョン確認の 1 文だけ"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            await _save(db, "cpi", {date(2024, 1, 1): 300.0, date(2024, 2, 1): 310.0})
+            await _save(db, "usdjpy", {date(2024, 1, 2): 141.0})
+
+        params = {"keys": "cpi,usdjpy,fed_rate"}
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get("/api/v1/macro/panel", params=params)
+        assert resp.status_code == 200
+        # データバージョン（取り込み済みの 2 指標）+ 観測値
+        budget.check(statements=2, rows=2 + 3)
+
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get("/api/v1/macro/panel", params=params)
+        assert resp.status_code == 200
+        budget.check(statements=1, rows=2)
+
+    async def test_indicator(self, sqlite_engine, async_client: AsyncClient):
+        """単一指標はバージョン確認 + 観測値の 2 文"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            await _save(db, "cpi", {date(2024, 1, 1): 300.0, date(2024, 2, 1): 310.0})
+
+        with QueryBudget(sqlite_engine) as budget:
+            resp = await async_client.get("/api/v1/macro/cpi")
+        assert resp.status_code == 200
+        budget.check(statements=2, rows=1 + 2)
@@ -0,0 +1,173 @@
+"""
+リアルタイム配信（プロセス内 Pub/Sub + SSE）のテスト
+"""
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import pandas as pd
+from fastapi.testclient import TestClient
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from analyzers import technical
+from services import realtime
+from services.realtime import BAR, INDICATORS, RESYNC, Broker, event_stream
+
+
+def _parse(frame: bytes) -> tuple[str, dict]:
+    """SSE フレームから (event, data) を取り出す"""
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().splitlines())
+    return fields["event"], orjson.loads(fields["data"])
+
+
+class TestBroker:
+    """Broker"""
+
+    async def test_fan_out_shares_frame(self):
+        """購読銘柄の全購読者に、1 回だけシリアライズしたフレームを配る"""
+        broker = Broker()
+        async with (
+            broker.subscribe(["AAPL"]) as a,
+            broker.subscribe(["AAPL", "MSFT"]) as b,
+            broker.subscribe(["MSFT"]) as c,
+        ):
+            assert broker.publish("AAPL", BAR, {"bars": []}) == 2
+            frame_a, frame_b = a.queue.get_nowait(), b.queue.get_nowait()
+            assert frame_a is frame_b
+            assert c.queue.empty()
+            assert _parse(frame_a) == (BAR, {"ticker": "AAPL", "bars": []})
+
+    async def test_unsubscribe_on_exit(self):
+        """購読を抜けると銘柄の購読者からも外れる"""
+        broker = Broker()
+        async with broker.subscribe(["AAPL"]):
+            assert broker.has_subscribers("AAPL")
+        assert not broker.has_subscribers("AAPL")
+        assert broker.subscriber_count == 0
+        assert broker.publish("AAPL", BAR, {}) == 0
+
+    async def test_overflow_resync(self):
+        """キューがあふれたら溜まったイベントを捨てて resync を送る"""
+        broker = Broker(queue_size=3)
+        async with broker.subscribe(["AAPL"]) as sub:
+            for i in range(4):
+                broker.publish("AAPL", BAR, {"i": i})
+            assert sub.queue.qsize() == 1
+            assert _parse(sub.queue.get_nowait())[0] == RESYNC
+            assert sub.dropped == 3
+
+    async def test_max_subscribers(self):
+        """購読者数の上限を超えると OverflowError"""
+        broker = Broker(max_subscribers=1)
+        async with broker.subscribe(["AAPL"]):
+            try:
+                async with broker.subscribe(["AAPL"]):
+                    raise AssertionError("上限を超えて購読できた")
+            except OverflowError:
+                pass
+
+
+class TestEventStream:
+    """event_stream"""
+
+    async def test_stream_and_heartbeat(self):
+        """publish したイベントを流し、イベントがなければ ping コメントを返す"""
+        broker = Broker()
+        stream = event_stream(broker, broker.add(["AAPL"]), heartbeat_seconds=0.01)
+        assert (await anext(stream)).startswith(b"retry:")
+
+        broker.publish("AAPL", BAR, {"bars": [{"close": 1.0}]})
+        assert _parse(await anext(stream))[0] == BAR
+        assert await anext(stream) == b": ping\n\n"
+
+        await stream.aclose()
+        assert broker.subscriber_count == 0
+
+
+class TestPublishPriceUpdate:
+    """publish_price_update"""
+
+    async def test_bars_and_latest_indicators(self, monkeypatch):
+        """新しい足と最新行の指標（欠損値は null）を配信する"""
+        broker = Broker()
+        monkeypatch.setattr(realtime, "_broker", broker)
+        df = pd.DataFrame(
+            {"close": [100.0, 101.0], "SMA_20": [None, 100.5]},
+            index=pd.to_datetime(["2025-01-01", "2025-01-02"]).date,
+        )
+        async with broker.subscribe(["AAPL"]) as sub:
+            with patch.object(realtime, "calculate_technical_indicators", AsyncMock(return_value=df)):
+                await realtime.publish_price_update(AsyncMock(), "AAPL", [{"close": 101.0}])
+
+            assert _parse(sub.queue.get_nowait())[0] == BAR
+            event, data = _parse(sub.queue.get_nowait())
+        assert event == INDICATORS
+        assert data["date"] == "2025-01-02"
+        assert data["SMA_20"] == 100.5
+        assert data["RSI_14"] is None
+
+    async def test_latest_of_long_history(self, sqlite_engine, monkeypatch):
+        """計算に使う件数より履歴が長くても、最新の足の日付の指標を配信する"""
+        broker = Broker()
+        monkeypatch.setattr(realtime, "_broker", broker)
+        monkeypatch.setattr(realtime, "TECHNICAL_LIMIT", 50)
+        monkeypatch.setattr(technical, "add_indicators", lambda df: df)
+        technical.invalidate_indicator_cache()
+        async with broker.subscribe(["AAPL"]) as sub:
+            async with async_sessionmaker(sqlite_engine)() as db:
+                await realtime.publish_price_update(db, "AAPL", [{"close": 100.5}])
+            sub.queue.get_nowait()
+            event, data = _parse(sub.queue.get_nowait())
+        technical.invalidate_indicator_cache()
+        assert event == INDICATORS
+        assert data["date"] == date(2024, 10, 26).isoformat()
+
+    async def test_skip_without_subscribers(self, monkeypatch):
+        """購読者がいなければ指標を計算しない"""
+        monkeypatch.setattr(realtime, "_broker", Broker())
+        calc = AsyncMock()
+        with patch.object(realtime, "calculate_technical_indicators", calc):
+            await realtime.publish_price_update(AsyncMock(), "AAPL", [{"close": 1.0}])
+        calc.assert_not_called()
+
+
+class TestStreamEndpoint:
+    """GET /api/v1/realtime/stream"""
+
+    def test_requires_tickers(self, client: TestClient):
+        """tickers が空なら 400"""
+        resp = client.get("/api/v1/realtime/stream", params={"tickers": " , "})
+        assert resp.status_code == 400
+
+    def test_subscriber_limit(self, client: TestClient, monkeypatch):
+        """接続数が上限に達していればストリームを始める前に 503"""
+        broker = Broker(max_subscribers=0)
+        monkeypatch.setattr(realtime, "_broker", broker)
+        resp = client.get("/api/v1/realtime/stream", params={"tickers": "AAPL"})
+        assert resp.status_code == 503
+        assert broker.subscriber_count == 0
+
+
+class TestPublishAfterCommit:
+    """POST /api/v1/stocks/{ticker}/fetch"""
+
+    async def test_publish_after_commit(self, sqlite_engine, async_client: AsyncClient):
+        """新しい足の配信はコミットした後に行う"""
+        history = pd.DataFrame(
+            {"Open": [1.0], "High": [2.0], "Low": [0.5], "Close": [1.5], "Volume": [100]},
+            index=pd.to_datetime(["2025-06-02"]),
+        )
+        yf = MagicMock()
+        yf.Ticker.return_value.history.return_value = history
+        in_transaction: list[bool] = []
+
+        async def publish(db, ticker, bars):
+            in_transaction.append(db.in_transaction())
+
+        with patch("collectors.stock_price.yf", yf), \
+             patch("collectors.stock_price.publish_price_update", publish):
+            resp = await async_client.post("/api/v1/stocks/AAPL/fetch")
+        assert resp.status_code == 200
+        assert resp.json()["saved_count"] == 1
+        assert in_transaction == [False]
@@ -0,0 +1,83 @@
+"""
+読み取り API のレスポンスキャッシュ（データバージョン + ETag）のテスト
+"""
+from datetime import date
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from analyzers import technical
+from core.data_version import bump_data_version, prices_scope
+from core.response_cache import MemoryResponseStore
+from tests.test_analysis import _ingest_elsewhere
+
+URL = "/api/v1/stocks/AAPL/prices"
+
+
+class TestMemoryResponseStore:
+    """MemoryResponseStore"""
+
+    async def test_lru_eviction(self):
+        """最大件数を超えると最も古く使われたエントリから消える"""
+        store = MemoryResponseStore(max_entries=2)
+        await store.set("a", b"1")
+        await store.set("b", b"2")
+        await store.get("a")
+        await store.set("c", b"3")
+        assert await store.get("a") == b"1"
+        assert await store.get("b") is None
+
+
+class TestEtag:
+    """ETag / If-None-Match"""
+
+    async def test_not_modified(self, sqlite_engine, async_client: AsyncClient):
+        """同じ ETag で再取得すると 304（本体なし）"""
+        resp = await async_client.get(URL)
+        etag = resp.headers["etag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+
+        resp = await async_client.get(URL, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    async def test_etag_depends_on_query(self, sqlite_engine, async_client: AsyncClient):
+        """クエリが違えば ETag も違う"""
+        a = await async_client.get(URL, params={"limit": 10})
+        b = await async_client.get(URL, params={"limit": 20})
+        assert a.headers["etag"] != b.headers["etag"]
+
+    async def test_bump_invalidates(self, sqlite_engine, async_client: AsyncClient):
+        """データバージョンが上がると ETag が変わり、本体を作り直す"""
+        resp = await async_client.get(URL)
+        etag = resp.headers["etag"]
+
+        async with AsyncSession(sqlite_engine) as session:
+            await bump_data_version(session, prices_scope("AAPL"))
+            await session.commit()
+
+        resp = await async_client.get(URL, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+        assert len(resp.json()["prices"]) > 0
+
+    async def test_ingest_by_other_process(
+        self, sqlite_engine, async_client: AsyncClient, monkeypatch
+    ):
+        """別プロセスの取り込み後は、新しい ETag で新しい足を含む本体を返す（古い指標を返さない）"""
+        monkeypatch.setattr(technical, "add_indicators", lambda df: df)
+        technical.invalidate_indicator_cache()
+        url = "/api/v1/analysis/AAPL/technical"
+        params = {"days": 400}
+        resp = await async_client.get(url, params=params)
+        etag = resp.headers["etag"]
+        assert resp.json()[-1]["date"] == "2024-10-26"
+
+        await _ingest_elsewhere(sqlite_engine, "AAPL", date(2025, 6, 1))
+
+        resp = await async_client.get(url, params=params, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+        assert resp.json()[-1]["date"] == "2025-06-01"
+        technical.invalidate_indicator_cache()
@@ -0,0 +1,171 @@
+"""
+週足・月足ロールアップのテスト
+"""
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.stock import Stock, StockPriceRollup
+from predictors.price_predictor import PricePredictor
+from services.rollup import aggregate_bars, apply_bars_to_rollups, load_rollup_frame, period_start
+from tests.conftest import PRICE_DAYS
+
+# conftest の株価は 2024-01-01 から 300 日分（最終日は 2024-10-26）
+MONTHS = 10
+
+
+@pytest.fixture
+async def db(sqlite_engine):
+    async with async_sessionmaker(sqlite_engine, expire_on_commit=False)() as session:
+        yield session
+
+
+async def _stock_id(db, ticker: str = "AAPL") -> int:
+    return (await db.execute(select(Stock.id).where(Stock.ticker == ticker))).scalar_one()
+
+
+async def _rollups(db, stock_id: int, granularity: str) -> list[StockPriceRollup]:
+    result = await db.execute(
+        select(StockPriceRollup)
+        .where(StockPriceRollup.stock_id == stock_id, StockPriceRollup.granularity == granularity)
+        .order_by(StockPriceRollup.period_start)
+    )
+    return list(result.scalars().all())
+
+
+def _bar(day: date, close: float, high: float | None = None, volume: int = 500) -> dict:
+    return {
+        "date": day,
+        "open": close,
+        "high": high if high is not None else close,
+        "low": close,
+        "close": close,
+        "volume": volume,
+    }
+
+
+class TestAggregate:
+    """期間の判定と集計"""
+
+    def test_period_start(self):
+        """週は月曜始まり、月は 1 日始まり"""
+        assert period_start(date(2024, 10, 27), "week") == date(2024, 10, 21)
+        assert period_start(date(2024, 10, 21), "week") == date(2024, 10, 21)
+        assert period_start(date(2024, 10, 27), "month") == date(2024, 10, 1)
+        with pytest.raises(ValueError):
+            period_start(date(2024, 10, 27), "year")
+
+    def test_aggregate_bars(self):
+        """始値は最初、終値は最後の日足。高値・安値は最大・最小、出来高は合計"""
+        bars = [_bar(date(2024, 1, 3), 12, high=15), _bar(date(2024, 1, 2), 10)]
+        (row,) = aggregate_bars(bars, "month")
+        assert row["period_start"] == date(2024, 1, 1)
+        assert (row["open"], row["close"], row["high"], row["low"]) == (10, 12, 15, 10)
+        assert (row["volume"], row["day_count"]) == (1000, 2)
+
+
+class TestApplyBars:
+    """取り込み時の増分更新"""
+
+    async def test_seeded_rollups(self, db):
+        """既存の日足から作ったロールアップ（月足は 10 本）"""
+        months = await _rollups(db, await _stock_id(db), "month")
+        assert len(months) == MONTHS
+        assert sum(m.day_count for m in months) == PRICE_DAYS
+        assert months[-1].period_start == date(2024, 10, 1)
+        assert months[-1].last_date == date(2024, 10, 26)
+
+    async def test_merges_only_current_period(self, db):
+        """新しい日足は属する週・月の行だけを更新し、他の期間は変わらない"""
+        stock_id = await _stock_id(db)
+        weeks_before = await _rollups(db, stock_id, "week")
+        months_before = {m.period_start: m.volume for m in await _rollups(db, stock_id, "month")}
+
+        # 10/27（日）は既存の週、10/28（月）は新しい週
+        bars = [_bar(date(2024, 10, 27), 110, high=120), _bar(date(2024, 10, 28), 105)]
+        await apply_bars_to_rollups(db, stock_id, bars)
+        await db.commit()
+        db.expire_all()
+
+        months = await _rollups(db, stock_id, "month")
+        assert len(months) == MONTHS
+        october = months[-1]
+        assert float(october.open) == 100
+        assert float(october.close) == 105
+        assert float(october.high) == 120
+        assert october.last_date == date(2024, 10, 28)
+        assert october.volume == months_before[october.period_start] + 1000
+        assert {m.period_start: m.volume for m in months[:-1]} == {
+            k: v for k, v in months_before.items() if k != october.period_start
+        }
+
+        weeks = await _rollups(db, stock_id, "week")
+        assert len(weeks) == len(weeks_before) + 1
+        assert float(weeks[-2].close) == 110
+        assert weeks[-1].period_start == date(2024, 10, 28)
+        assert weeks[-1].day_count == 1
+
+    async def test_earlier_bar_replaces_open(self, db):
+        """既存の行より前の日足が来た場合は始値と最初の取引日を差し替える"""
+        stock_id = await _stock_id(db)
+        await apply_bars_to_rollups(db, stock_id, [_bar(date(2025, 1, 15), 90)])
+        await apply_bars_to_rollups(db, stock_id, [_bar(date(2025, 1, 13), 80)])
+        await db.commit()
+        db.expire_all()
+
+        week = (await _rollups(db, stock_id, "week"))[-1]
+        assert week.period_start == date(2025, 1, 13)
+        assert (week.first_date, week.last_date) == (date(2025, 1, 13), date(2025, 1, 15))
+        assert (float(week.open), float(week.close)) == (80, 90)
+        assert week.day_count == 2
+
+
+class TestReadGranularity:
+    """粒度を指定した読み出し"""
+
+    async def test_load_rollup_frame(self, db):
+        """期間開始日の昇順、float64 の列で返す"""
+        df = await load_rollup_frame(db, await _stock_id(db), "month")
+        assert len(df) == MONTHS
+        assert all(dtype == np.float64 for dtype in df.dtypes)
+        assert df.index[0] == date(2024, 1, 1)
+        assert df["volume"].iloc[0] == 31 * 1000
+
+    async def test_prices_endpoint_month(self, sqlite_engine, async_client):
+        """granularity=month はロールアップの行を株価と同じ形で返す"""
+        response = await async_client.get(
+            "/api/v1/stocks/AAPL/prices", params={"granularity": "month", "limit": 3}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == MONTHS
+        dates = [p["price_date"] for p in data["prices"]]
+        assert dates == ["2024-10-01", "2024-09-01", "2024-08-01"]
+        assert data["prices"][0]["adjusted_close"] is None
+
+        following = await async_client.get(
+            "/api/v1/stocks/AAPL/prices",
+            params={"granularity": "month", "limit": 3, "cursor": data["next_cursor"]},
+        )
+        assert following.json()["prices"][0]["price_date"] == "2024-07-01"
+
+    async def test_prices_endpoint_invalid_granularity(self, sqlite_engine, async_client):
+        response = await async_client.get(
+            "/api/v1/stocks/AAPL/prices", params={"granularity": "year"}
+        )
+        assert response.status_code == 422
+
+
+class TestPredictorGranularity:
+    """予測の期間の足数への換算"""
+
+    def test_horizon_bars(self):
+        assert PricePredictor().horizon_bars(30) == 30
+        assert PricePredictor("week").horizon_bars(30) == 6
+        assert PricePredictor("month").horizon_bars(252) == 12
+        assert PricePredictor("month").horizon_bars(5) == 1
+        with pytest.raises(ValueError):
+            PricePredictor("year")
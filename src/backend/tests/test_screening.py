@@ -0,0 +1,77 @@
+"""
+銘柄スクリーニング（共有メモリのユニバース行列）のテスト
+"""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from core.config import Settings
+from services import universe
+from services.universe import UNIVERSE_INDICATORS, UniverseWriter
+from tests.test_universe import shm_name  # noqa: F401
+
+URL = "/api/v1/screening"
+
+
+def _data() -> dict[str, np.ndarray]:
+    """7203.T: 最終日の株価なし・指標なし / AAPL: RSI 25・SMA_200 より上 / MSFT: RSI 75・下"""
+    indicators = np.full((3, len(UNIVERSE_INDICATORS)), np.nan)
+    rsi, sma_200 = UNIVERSE_INDICATORS.index("RSI_14"), UNIVERSE_INDICATORS.index("SMA_200")
+    indicators[1, [rsi, sma_200]] = [25.0, 90.0]
+    indicators[2, [rsi, sma_200]] = [75.0, 110.0]
+    return {
+        "tickers": np.array(["7203.T", "AAPL", "MSFT"], dtype="<U20"),
+        "dates": np.array(["2024-10-25", "2024-10-26"], dtype="<M8[D]"),
+        "close": np.array([[50.0, np.nan], [99.0, 100.0], [101.0, 100.0]]),
+        "volume": np.array([[10.0, np.nan], [1000.0, 2000.0], [500.0, 600.0]]),
+        "indicators": indicators,
+    }
+
+
+@pytest.fixture
+def writer(shm_name, monkeypatch):  # noqa: F811
+    """ユニバース行列を公開し、get_universe がそれにアタッチするようにする"""
+    settings = Settings(universe_enabled=True, universe_shm_name=shm_name)
+    monkeypatch.setattr(universe, "get_settings", lambda: settings)
+    monkeypatch.setattr(universe, "_reader", None)
+    writer = UniverseWriter(shm_name)
+    writer.publish(_data())
+    yield writer
+    monkeypatch.setattr(universe, "_reader", None)
+    writer.close()
+
+
+class TestScreening:
+    """GET /api/v1/screening"""
+
+    def test_all(self, client: TestClient, writer):
+        """条件なしなら全銘柄を銘柄コード順に、最後の欠損でない終値・出来高と指標で返す"""
+        resp = client.get(URL)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["version"] == 1
+        assert body["as_of"] == "2024-10-26"
+        assert body["total"] == 3
+        assert [r["ticker"] for r in body["results"]] == ["7203.T", "AAPL", "MSFT"]
+        toyota, aapl, _ = body["results"]
+        assert aapl["close"] == 100.0 and aapl["volume"] == 2000.0
+        assert aapl["RSI_14"] == 25.0 and aapl["MACD_12_26_9"] is None
+        assert toyota["close"] == 50.0 and toyota["volume"] == 10.0
+
+    def test_filters(self, client: TestClient, writer):
+        """RSI・SMA_200・出来高で絞り込み、条件の値が欠損の銘柄は除く"""
+        body = client.get(URL, params={"rsi_max": 30}).json()
+        assert [r["ticker"] for r in body["results"]] == ["AAPL"]
+
+        body = client.get(URL, params={"above_sma_200": "false"}).json()
+        assert [r["ticker"] for r in body["results"]] == ["MSFT"]
+
+        body = client.get(URL, params={"min_volume": 100, "limit": 1}).json()
+        assert body["total"] == 2
+        assert [r["ticker"] for r in body["results"]] == ["AAPL"]
+
+    def test_unavailable(self, client: TestClient, monkeypatch):
+        """UNIVERSE_ENABLED が無効・リフレッシャーが未起動なら 503"""
+        monkeypatch.setattr(universe, "get_settings", lambda: Settings(universe_enabled=False))
+        resp = client.get(URL)
+        assert resp.status_code == 503
@@ -0,0 +1,103 @@
+"""
+センチメント分析（長文モード）のテスト
+"""
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from analyzers.sentiment import SentimentAnalyzer, aggregate_windows, split_windows
+from core.config import Settings
+
+
+class TestSplitWindows:
+    """split_windows"""
+
+    def test_short_text_single_window(self):
+        """ウィンドウ長以下なら 1 ウィンドウ"""
+        assert split_windows(list(range(10)), size=16, overlap=4) == [list(range(10))]
+
+    def test_overlap_and_full_coverage(self):
+        """重なり付きで分割され、末尾まで含まれる"""
+        windows = split_windows(list(range(25)), size=10, overlap=3)
+        assert windows[0] == list(range(10))
+        assert windows[1][:3] == windows[0][-3:]
+        assert windows[-1][-1] == 24
+        assert sorted({t for w in windows for t in w}) == list(range(25))
+
+    def test_no_trailing_fragment(self):
+        """最後のウィンドウが末尾に達したら打ち切る"""
+        windows = split_windows(list(range(20)), size=10, overlap=0)
+        assert windows == [list(range(10)), list(range(10, 20))]
+
+    def test_overlap_must_be_smaller_than_size(self):
+        """重なりがウィンドウ長以上だと分割が進まないため ValueError"""
+        with pytest.raises(ValueError):
+            split_windows(list(range(20)), size=10, overlap=10)
+
+    def test_settings_reject_overlap(self):
+        """設定でもウィンドウ長以上の重なりを受け付けない"""
+        with pytest.raises(ValidationError):
+            Settings(sentiment_document_overlap_tokens=510)
+
+
+class TestAggregateWindows:
+    """aggregate_windows"""
+
+    def test_weighted_by_length(self):
+        """トークン数の多いウィンドウほど重みが大きい"""
+        probs = np.array([[0.9, 0.1], [0.1, 0.9]])
+        result = aggregate_windows(probs, [300, 100])
+        assert np.allclose(result, [0.7, 0.3])
+
+
+class _FakeTokenizer:
+    pad_token_id = 0
+
+    def __call__(self, texts: list[str], add_special_tokens: bool = True) -> dict:
+        return {"input_ids": [[1] * len(t.split()) for t in texts]}
+
+    def num_special_tokens_to_add(self) -> int:
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids: list[int]) -> list[int]:
+        return [1, *ids, 1]
+
+
+class _FakeBackend:
+    """ウィンドウ数を記録し、トークン数 10 以上のウィンドウを positive とする"""
+
+    labels = ["positive", "negative"]
+    max_length = 12
+    tokenizer = _FakeTokenizer()
+
+    def __init__(self):
+        self.calls: list[int] = []
+
+    def encode_windows(self, windows: list[list[int]]) -> dict:
+        return {"input_ids": np.array([len(w) for w in windows]), "attention_mask": None}
+
+    def predict_proba(self, input_ids: np.ndarray, attention_mask) -> np.ndarray:
+        self.calls.append(len(input_ids))
+        positive = (input_ids >= 10).astype(float)
+        return np.stack([positive, 1.0 - positive], axis=1)
+
+
+class TestAnalyzeDocuments:
+    """SentimentAnalyzer.analyze_documents"""
+
+    def test_single_batched_call(self, monkeypatch):
+        """全文書の全ウィンドウを 1 回の推論にかけ、文書ごとに集計する"""
+        backend = _FakeBackend()
+        monkeypatch.setattr(SentimentAnalyzer, "_backend", backend)
+        monkeypatch.setattr(
+            "analyzers.sentiment.get_settings",
+            lambda: Settings(sentiment_document_overlap_tokens=0),
+        )
+        results = SentimentAnalyzer.analyze_documents(["w " * 25, "", "w " * 3])
+
+        # ウィンドウ長 10: 25 トークンは 10 / 10 / 5、3 トークンは 1 ウィンドウ
+        assert backend.calls == [4]
+        assert [r["windows"] for r in results] == [3, 0, 1]
+        assert results[0]["label"] == "positive"
+        assert results[0]["score"] == pytest.approx(0.8)
+        assert results[2]["label"] == "negative"
@@ -0,0 +1,85 @@
+"""
+センチメント分析バックエンドのテスト
+ローカルに作成した小さな BERT モデルで、PyTorch と ONNX Runtime の出力が一致することを確認する。
+"""
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+from analyzers.sentiment import OnnxBackend, TransformersBackend  # noqa: E402
+
+TEXTS = [
+    "profit rose sharply",
+    "loss widened and guidance was cut",
+    "shares were flat",
+    "record revenue and strong demand",
+    "the company missed estimates",
+    "dividend raised",
+    "weak outlook",
+    "merger approved",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    """ランダム初期化した小さな BERT 分類モデルを保存する"""
+    model_dir = tmp_path_factory.mktemp("tiny-bert")
+
+    words = sorted({w for text in TEXTS for w in text.split()})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *words]
+    vocab_file = model_dir / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab) + "\n")
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab_file))
+    tokenizer.save_pretrained(model_dir)
+
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=128,
+        num_labels=3,
+        id2label={0: "positive", 1: "negative", 2: "neutral"},
+        label2id={"positive": 0, "negative": 1, "neutral": 2},
+    )
+    model = transformers.BertForSequenceClassification(config)
+    # ラベル間の差を大きくし、量子化誤差で判定が揺れないようにする
+    with torch.no_grad():
+        model.classifier.weight.mul_(20)
+    model.save_pretrained(model_dir)
+    return model_dir
+
+
+def _labels(backend, texts: list[str]) -> list[int]:
+    encoded = backend.tokenize(texts)
+    return backend.predict_proba(encoded["input_ids"], encoded["attention_mask"]).argmax(axis=1).tolist()
+
+
+class TestOnnxBackend:
+    """OnnxBackend"""
+
+    def test_fp32_matches_pytorch(self, tiny_model_dir, tmp_path):
+        """量子化なしの ONNX は PyTorch と同じ確率を返す"""
+        reference = TransformersBackend(str(tiny_model_dir))
+        onnx = OnnxBackend(str(tiny_model_dir), onnx_dir=tmp_path, quantize=False)
+
+        encoded = reference.tokenize(TEXTS)
+        expected = reference.predict_proba(encoded["input_ids"], encoded["attention_mask"])
+        actual = onnx.predict_proba(encoded["input_ids"], encoded["attention_mask"])
+        assert actual == pytest.approx(expected, abs=1e-4)
+
+    def test_int8_label_agreement(self, tiny_model_dir, tmp_path):
+        """int8 量子化モデルのラベルが PyTorch と一致する"""
+        reference = TransformersBackend(str(tiny_model_dir))
+        onnx = OnnxBackend(str(tiny_model_dir), onnx_dir=tmp_path, intra_op_threads=1)
+
+        expected = _labels(reference, TEXTS)
+        actual = _labels(onnx, TEXTS)
+        agreement = sum(a == e for a, e in zip(actual, expected, strict=True)) / len(TEXTS)
+        assert agreement >= 0.875
+        assert list(tmp_path.rglob("model.int8.onnx"))
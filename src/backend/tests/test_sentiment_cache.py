@@ -0,0 +1,74 @@
+"""
+センチメントスコアキャッシュのテスト
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from analyzers.sentiment_cache import SentimentCache, content_hash
+from models.stock import Stock
+
+
+class TestSentimentCache:
+    """SentimentCache.get_many"""
+
+    async def test_only_misses_are_resolved(self):
+        """キャッシュ済み・重複テキストはモデルに渡されない"""
+        calls: list[list[str]] = []
+
+        async def resolve(texts: list[str]) -> list[dict]:
+            calls.append(texts)
+            return [{"label": "positive", "score": 0.9} for _ in texts]
+
+        cache = SentimentCache(max_size=100)
+        await cache.get_many(None, ["Earnings beat"], "v1", resolve)
+        results = await cache.get_many(
+            None, ["Earnings beat", "Guidance cut", "Guidance cut"], "v1", resolve
+        )
+
+        assert calls == [["Earnings beat"], ["Guidance cut"]]
+        assert len(results) == 3
+
+    async def test_model_version_invalidates(self):
+        """モデルバージョンが変わるとキャッシュは使われない"""
+        calls = 0
+
+        async def resolve(texts: list[str]) -> list[dict]:
+            nonlocal calls
+            calls += 1
+            return [{"label": "neutral", "score": 0.5} for _ in texts]
+
+        cache = SentimentCache(max_size=100)
+        await cache.get_many(None, ["text"], "v1", resolve)
+        await cache.get_many(None, ["text"], "v2", resolve)
+        assert calls == 2
+
+    async def test_lru_eviction(self):
+        """max_size を超えると古いものから破棄される"""
+
+        async def resolve(texts: list[str]) -> list[dict]:
+            return [{"label": "neutral", "score": 0.5} for _ in texts]
+
+        cache = SentimentCache(max_size=2)
+        await cache.get_many(None, ["a", "b", "c"], "v1", resolve)
+        assert cache._lru_get(content_hash("a", "v1")) is None
+        assert cache._lru_get(content_hash("c", "v1")) is not None
+
+    async def test_db_error_keeps_caller_transaction(self, sqlite_engine):
+        """キャッシュの参照・保存に失敗しても、呼び出し側の未コミットの変更は残る"""
+
+        async def resolve(texts: list[str]) -> list[dict]:
+            return [{"label": "neutral", "score": 0.5} for _ in texts]
+
+        # sqlite_engine には sentiment_scores テーブルがないため参照・保存とも失敗する
+        async with async_sessionmaker(sqlite_engine)() as db:
+            db.add(Stock(ticker="NEW", name="NEW"))
+            await db.flush()
+            results = await SentimentCache().get_many(db, ["text"], "v1", resolve)
+            await db.commit()
+            tickers = (await db.execute(select(Stock.ticker))).scalars().all()
+        assert results == [{"label": "neutral", "score": 0.5}]
+        assert "NEW" in tickers
+
+    def test_normalization(self):
+        """全角・空白の違いは同じキーになる"""
+        assert content_hash("Ｔｏｙｏｔａ  決算\n", "v1") == content_hash("Toyota 決算", "v1")
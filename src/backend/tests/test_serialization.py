@@ -0,0 +1,65 @@
+"""
+DataFrame の高速 JSON シリアライズのテスト
+"""
+import json
+
+import numpy as np
+import pandas as pd
+from pydantic import TypeAdapter
+
+from core.serialization import dataframe_to_columnar_json, dataframe_to_records_json
+from schemas.analysis import TECHNICAL_COLUMNS, TechnicalIndicators
+
+
+def _indicator_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        rng.normal(100, 5, size=(rows, len(TECHNICAL_COLUMNS))),
+        columns=TECHNICAL_COLUMNS,
+        index=pd.date_range("2024-01-01", periods=rows, freq="D").date,
+    )
+    df.iloc[:20, TECHNICAL_COLUMNS.index("SMA_20")] = np.nan
+    return df
+
+
+class TestRecordsJson:
+    """dataframe_to_records_json"""
+
+    def test_matches_pydantic_output(self):
+        """行ごとに Pydantic で検証して出力した場合と同じ JSON になる"""
+        df = _indicator_frame(60)
+        rows = []
+        for date_idx, row in df.iterrows():
+            row_dict = row.where(pd.notnull(row), None).to_dict()
+            row_dict["date"] = date_idx
+            rows.append(row_dict)
+        adapter = TypeAdapter(list[TechnicalIndicators])
+        expected = adapter.dump_json(adapter.validate_python(rows), by_alias=True)
+
+        assert json.loads(dataframe_to_records_json(df, TECHNICAL_COLUMNS)) == json.loads(expected)
+
+    def test_missing_column_is_null(self):
+        """DataFrame にない列は null で出力する"""
+        df = _indicator_frame(3).drop(columns=["SMA_200"])
+        records = json.loads(dataframe_to_records_json(df, TECHNICAL_COLUMNS))
+        assert all(r["SMA_200"] is None for r in records)
+
+
+class TestColumnarJson:
+    """dataframe_to_columnar_json"""
+
+    def test_arrays_per_column(self):
+        """列ごとの配列で、行数と欠損値が保たれる"""
+        df = _indicator_frame(30)
+        body = json.loads(dataframe_to_columnar_json(df, TECHNICAL_COLUMNS))
+        assert list(body) == ["date", *TECHNICAL_COLUMNS]
+        assert body["date"][0] == "2024-01-01"
+        assert all(len(values) == 30 for values in body.values())
+        assert body["SMA_20"][:20] == [None] * 20
+
+    def test_datetime_index(self):
+        """DatetimeIndex でも日付は YYYY-MM-DD で出力する"""
+        df = _indicator_frame(3)
+        df.index = pd.to_datetime(df.index)
+        body = json.loads(dataframe_to_columnar_json(df, TECHNICAL_COLUMNS))
+        assert body["date"] == ["2024-01-01", "2024-01-02", "2024-01-03"]
@@ -0,0 +1,61 @@
+"""
+起動時間のテスト
+`python -X importtime -c "import main"` を別プロセスで実行し、重いライブラリが起動時に
+インポートされないこと・main のインポート時間が予算内であることを確認する。
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 起動時にインポートしてはいけないモジュール（初回使用時に遅延ロードする）
+HEAVY_MODULES = [
+    "transformers",
+    "torch",
+    "onnxruntime",
+    "pandas_ta",
+    "lightgbm",
+    "sklearn",
+    "yfinance",
+]
+
+# main のインポート時間の予算（秒）。CI の性能に合わせて環境変数で上書きできる
+IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get("STARTUP_IMPORT_BUDGET_SECONDS", "3.0"))
+
+
+def _import_main() -> tuple[list[str], float]:
+    """main をインポートし、ロード済みの重いモジュールと main の累積インポート時間（秒）を返す"""
+    code = (
+        "import json, sys; import main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if line.startswith("import time:") and line.rstrip().endswith("| main"):
+            cumulative_us = int(line.split("|")[1])
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return loaded, cumulative_us / 1_000_000
+
+
+def test_heavy_modules_not_imported_at_startup():
+    """main のインポートで重いライブラリがロードされない"""
+    loaded, _ = _import_main()
+    assert loaded == []
+
+
+def test_import_time_budget():
+    """main のインポート時間が予算内に収まる"""
+    _, seconds = _import_main()
+    assert 0 < seconds <= IMPORT_TIME_BUDGET_SECONDS, f"main のインポートに {seconds:.2f}s"
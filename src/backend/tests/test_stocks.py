@@ -3,8 +3,9 @@
 """
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
+from core.database import get_read_db
 from main import app
 
 
@@ -18,19 +19,25 @@ class TestStockList:
 
     def test_list_stocks_empty(self, client: TestClient):
         """銘柄がない場合、空リストを返す"""
-        with patch("api.v1.stocks.get_db") as mock_db:
-            mock_session = AsyncMock()
-            mock_session.execute.return_value = MagicMock(
-                scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
-            )
-            mock_db.return_value.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_db.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_session = AsyncMock()
+        mock_session.execute.return_value = MagicMock(
+            scalar_one=MagicMock(return_value=0),
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[]))),
+        )
 
+        async def override_get_db():
+            yield mock_session
+
+        app.dependency_overrides[get_read_db] = override_get_db
+        try:
             resp = client.get("/api/v1/stocks")
-            assert resp.status_code == 200
-            body = resp.json()
-            assert "stocks" in body
-            assert "total" in body
+        finally:
+            app.dependency_overrides.clear()
+
+        assert resp.status_code == 200
+        body = resp.json()
+        assert "stocks" in body
+        assert "total" in body
 
 
 class TestHealthCheck:
@@ -0,0 +1,127 @@
+"""
+トレーシングのテスト
+"""
+import pytest
+from httpx import AsyncClient
+
+from core import tracing
+from core.config import Settings
+
+pytest.importorskip("opentelemetry.sdk")
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (  # noqa: E402
+    InMemorySpanExporter,
+)
+
+REQUEST_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def _enable(monkeypatch: pytest.MonkeyPatch, *engines, **overrides) -> InMemorySpanExporter:
+    settings = Settings(tracing_enabled=True, **overrides)
+    monkeypatch.setattr(tracing, "get_settings", lambda: settings)
+    exporter = InMemorySpanExporter()
+    assert tracing.setup_tracing(*engines, exporter=exporter)
+    return exporter
+
+
+@pytest.fixture
+def exporter(monkeypatch: pytest.MonkeyPatch, sqlite_engine):
+    """トレーシングを有効にし、スパンをメモリに書き出す（テスト用 DB の SQL も記録する）"""
+    exporter = _enable(monkeypatch, sqlite_engine.sync_engine)
+    yield exporter
+    tracing.shutdown_tracing()
+
+
+class TestRequestId:
+    """X-Request-ID → トレース ID"""
+
+    def test_hex_and_uuid(self):
+        assert tracing.trace_id_from_request_id(REQUEST_ID) == int(REQUEST_ID, 16)
+        uuid = "4bf92f35-77b3-4da6-a3ce-929d0e0e4736"
+        assert tracing.trace_id_from_request_id(uuid) == int(REQUEST_ID, 16)
+
+    def test_invalid(self):
+        """トレース ID にできない値は None（新しいトレースを開始する）"""
+        assert tracing.trace_id_from_request_id(None) is None
+        assert tracing.trace_id_from_request_id("req-123") is None
+        assert tracing.trace_id_from_request_id("0" * 32) is None
+
+
+class TestDisabled:
+    """トレーシング無効時"""
+
+    def test_span_is_noop(self):
+        with tracing.span("noop", ticker="AAPL") as current:
+            assert current is None
+
+    def test_setup_disabled_by_default(self):
+        assert tracing.setup_tracing() is False
+
+
+class TestRequestTracing:
+    """リクエスト単位のトレース"""
+
+    async def test_request_id_becomes_trace_id(
+        self, exporter: InMemorySpanExporter, async_client: AsyncClient
+    ):
+        """X-Request-ID をトレース ID として引き継ぎ、SQL のスパンも同じトレースに入る"""
+        resp = await async_client.get(
+            "/api/v1/stocks/AAPL/prices", headers={"X-Request-ID": REQUEST_ID}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["x-request-id"] == REQUEST_ID
+
+        spans = exporter.get_finished_spans()
+        root = next(s for s in spans if s.name.startswith("HTTP "))
+        assert root.name == "HTTP GET /api/v1/stocks/{ticker}/prices"
+        assert root.attributes["http.status_code"] == 200
+        assert root.context.trace_id == int(REQUEST_ID, 16)
+
+        queries = [s for s in spans if s.name == "db.query"]
+        assert queries
+        assert all(s.context.trace_id == root.context.trace_id for s in queries)
+        assert all(s.parent.span_id == root.context.span_id for s in queries)
+
+    async def test_generated_request_id(
+        self, exporter: InMemorySpanExporter, async_client: AsyncClient
+    ):
+        """X-Request-ID がなければトレース ID を返す"""
+        resp = await async_client.get("/api/v1/stocks/AAPL/prices")
+        root = next(s for s in exporter.get_finished_spans() if s.name.startswith("HTTP "))
+        assert resp.headers["x-request-id"] == format(root.context.trace_id, "032x")
+
+    async def test_sample_ratio_zero(
+        self, monkeypatch: pytest.MonkeyPatch, sqlite_engine, async_client: AsyncClient
+    ):
+        """サンプリング率 0 ならスパンを記録しない（X-Request-ID は返す）"""
+        exporter = _enable(monkeypatch, sqlite_engine.sync_engine, tracing_sample_ratio=0.0)
+        try:
+            resp = await async_client.get(
+                "/api/v1/stocks/AAPL/prices", headers={"X-Request-ID": REQUEST_ID}
+            )
+        finally:
+            tracing.shutdown_tracing()
+        assert resp.headers["x-request-id"] == REQUEST_ID
+        assert exporter.get_finished_spans() == ()
+
+
+class TestSpans:
+    """処理単位のスパン"""
+
+    def test_traced_nesting(self, monkeypatch: pytest.MonkeyPatch):
+        """traced で囲んだ関数は呼び出し元のスパンの子になる"""
+        exporter = _enable(monkeypatch)
+
+        @tracing.traced("inner")
+        def inner():
+            return 1
+
+        try:
+            with tracing.span("outer", ticker="AAPL"):
+                assert inner() == 1
+        finally:
+            tracing.shutdown_tracing()
+
+        inner_span, outer_span = exporter.get_finished_spans()
+        assert inner_span.name == "inner"
+        assert inner_span.parent.span_id == outer_span.context.span_id
+        assert outer_span.attributes["ticker"] == "AAPL"
@@ -0,0 +1,152 @@
+"""
+ユニバース価格行列（共有メモリ）のテスト
+"""
+import multiprocessing
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.config import Settings
+from services import universe
+from services.universe import UNIVERSE_INDICATORS, UniverseReader, UniverseWriter, load_universe
+from tests.conftest import PRICE_DAYS, TICKERS
+
+
+@pytest.fixture
+def shm_name():
+    """テストごとの制御セグメント名（終了時に残ったセグメントを削除する）"""
+    name = f"sa_test_{uuid.uuid4().hex[:8]}"
+    yield name
+    for segment in [name, *(f"{name}_{v}" for v in range(1, 5))]:
+        try:
+            shared_memory.SharedMemory(name=segment).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _data(close: float, stocks: int = 2, days: int = 3) -> dict[str, np.ndarray]:
+    return {
+        "tickers": np.array(["AAPL", "MSFT", "7203.T"][:stocks], dtype="<U20"),
+        "dates": np.datetime64("2024-01-01") + np.arange(days),
+        "close": np.full((stocks, days), close),
+        "volume": np.full((stocks, days), 1000.0),
+        "indicators": np.full((stocks, len(UNIVERSE_INDICATORS)), 50.0),
+    }
+
+
+def _sum_close(name: str) -> float:
+    """別プロセスからアタッチして終値の合計を返す"""
+    return float(UniverseReader(name).get().close.sum())
+
+
+class TestLoadUniverse:
+    """DB からの読み込み"""
+
+    async def test_aligned_matrix(self, sqlite_engine):
+        """アクティブな全銘柄を銘柄 × 日付の行列にそろえる"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            data = await load_universe(db, lookback_days=400)
+        assert list(data["tickers"]) == sorted(TICKERS)
+        assert data["close"].shape == (len(TICKERS), PRICE_DAYS)
+        assert data["dates"][0] == np.datetime64("2024-01-01")
+        assert np.all(data["close"] == 100.5)
+        assert np.all(data["volume"] == 1000.0)
+
+    async def test_lookback(self, sqlite_engine):
+        """最新の取引日から lookback_days 日前までに絞る"""
+        async with async_sessionmaker(sqlite_engine)() as db:
+            data = await load_universe(db, lookback_days=9)
+        assert data["close"].shape == (len(TICKERS), 10)
+
+
+class TestSharedMatrix:
+    """共有メモリへの公開とアタッチ"""
+
+    def test_publish_and_attach(self, shm_name):
+        """公開した行列を読み取り専用の配列としてアタッチする"""
+        writer = UniverseWriter(shm_name)
+        reader = UniverseReader(shm_name)
+        assert reader.get() is None
+
+        assert writer.publish(_data(100.0)) == 1
+        matrix = reader.get()
+        assert matrix.version == 1
+        assert matrix.row("MSFT") == 1
+        assert matrix.row("UNKNOWN") is None
+        assert matrix.close.shape == (2, 3)
+        assert not matrix.close.flags.writeable
+        with pytest.raises(ValueError):
+            matrix.close[0, 0] = 0.0
+        assert matrix.close_series("AAPL").tolist() == [100.0] * 3
+        frame = matrix.indicator_frame()
+        assert list(frame.columns) == UNIVERSE_INDICATORS
+        assert frame.loc["MSFT", "RSI_14"] == 50.0
+        # 同じ版なら付け替えない
+        assert reader.get() is matrix
+        del frame
+        writer.close()
+
+    def test_version_swap(self, shm_name):
+        """新しい版を公開すると付け替え、古い版のセグメントは削除される"""
+        writer = UniverseWriter(shm_name)
+        reader = UniverseReader(shm_name)
+        writer.publish(_data(100.0))
+        old = reader.get()
+        old_close = old.close
+
+        writer.publish(_data(200.0, stocks=3, days=4))
+        new = reader.get()
+        assert new.version == 2
+        assert new.close.shape == (3, 4)
+        assert np.all(new.close == 200.0)
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=f"{shm_name}_1")
+        # 削除済みの版も、参照中の配列はそのまま読める
+        assert np.all(old_close == 100.0)
+        del old, old_close
+        writer.close()
+
+    def test_old_version_closed_after_release(self, shm_name):
+        """古い版は参照中の配列がなくなってから閉じる"""
+        writer = UniverseWriter(shm_name)
+        reader = UniverseReader(shm_name)
+        writer.publish(_data(100.0))
+        old_close = reader.get().close
+
+        writer.publish(_data(200.0))
+        reader.get()
+        assert len(reader._retired) == 1
+
+        del old_close
+        writer.publish(_data(300.0))
+        assert np.all(reader.get().close == 300.0)
+        assert reader._retired == []
+        writer.close()
+
+    def test_writer_restart_continues_version(self, shm_name):
+        """制御セグメントはリフレッシャーの再起動をまたいで残り、版の番号は続きから"""
+        writer = UniverseWriter(shm_name)
+        writer.publish(_data(100.0))
+        writer.close()
+
+        writer = UniverseWriter(shm_name)
+        assert writer.publish(_data(100.0)) == 2
+        assert UniverseReader(shm_name).get().version == 2
+        writer.close()
+
+    def test_attach_from_other_process(self, shm_name):
+        """別プロセスからアタッチでき、そのプロセスが終了してもセグメントは削除されない"""
+        writer = UniverseWriter(shm_name)
+        writer.publish(_data(100.0))
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            assert pool.apply(_sum_close, (shm_name,)) == 600.0
+        assert UniverseReader(shm_name).get().version == 1
+        writer.close()
+
+    def test_disabled(self, monkeypatch):
+        """UNIVERSE_ENABLED が無効ならアタッチしない"""
+        monkeypatch.setattr(universe, "get_settings", lambda: Settings(universe_enabled=False))
+        assert universe.get_universe() is None
@@ -24,7 +24,9 @@ export interface Stock {
 
 export interface StockListResponse {
   stocks: Stock[]
-  total: number
+  total: number | null
+  next_cursor: string | null
+  prev_cursor: string | null
 }
 
 export interface StockPrice {